@@ -3,11 +3,40 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from config import Config
 from flask_migrate import Migrate
+from sqlalchemy import event
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 migrate = Migrate()
 
+
+def _configure_sqlite(engine, config):
+    """
+    Set the SQLite PRAGMAs from the config on every new connection, so several
+    gunicorn workers can share the database file without "database is locked" errors
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        f"journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+        f"foreign_keys={'ON' if config['SQLITE_FOREIGN_KEYS'] else 'OFF'}",
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f'PRAGMA {pragma}')
+        finally:
+            cursor.close()
+
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -23,6 +52,8 @@ def create_app(config_class=Config):
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        _configure_sqlite(db.engine, app.config)
 
     from . import models
 
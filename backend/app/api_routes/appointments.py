@@ -1,5 +1,4 @@
 from flask import Blueprint, jsonify, request
-import json
 from app import db
 from app.models.appointment import Appointment
 from app.models.patient import Patient
@@ -64,7 +63,8 @@ def move_appointment():
         "target_employee_id": 2,  # For weekday appointments
         "source_area": "Nord",    # For weekend appointments (Nord, Mitte, Süd)
         "target_area": "Süd",     # For weekend appointments (Nord, Mitte, Süd)
-        "respect_replacement": true  # Whether to respect replacement chain
+        "respect_replacement": true,  # Whether to respect replacement chain
+        "incremental": false  # Cheapest insertion with cached legs; routes are only flagged for optimization
     }
     """
     try:
@@ -78,6 +78,7 @@ def move_appointment():
         source_area = data.get('source_area')
         target_area = data.get('target_area')
         respect_replacement = data.get('respect_replacement', True)
+        incremental = data.get('incremental', False)
 
         # Get the appointment and its patient
         appointment = Appointment.query.get_or_404(appointment_id)
@@ -104,7 +105,10 @@ def move_appointment():
             # Update appointment's area
             appointment.area = target_area
             
-            if source_route:
+            if source_route and incremental:
+                # Splice appointment out of source route (cached legs, no re-plan)
+                route_optimizer.remove_stop(source_route, appointment)
+            elif source_route:
                 # Remove appointment from source route
                 route_order = source_route.get_route_order()
                 if appointment.id in route_order:
@@ -129,7 +133,6 @@ def move_appointment():
                     target_route = Route(
                         employee_id=None,
                         weekday=weekday,
-                        route_order=json.dumps([]),
                         total_duration=0,
                         total_distance=0,
                         area=target_area,
@@ -138,17 +141,21 @@ def move_appointment():
                     db.session.add(target_route)
                     db.session.flush()
 
-                route_order = target_route.get_route_order()
-                if appointment.id not in route_order:
-                    route_order.append(appointment.id)
-                    target_route.set_route_order(route_order)
-                
-                # Optimize area route (Wochenende / Feiertag)
-                route_optimizer.optimize_route(
-                    weekday,
-                    area=target_area,
-                    calendar_week=appointment.calendar_week
-                )
+                if incremental:
+                    # Insert at cheapest position; full optimization is deferred
+                    route_optimizer.insert_stop(target_route, appointment)
+                else:
+                    route_order = target_route.get_route_order()
+                    if appointment.id not in route_order:
+                        route_order.append(appointment.id)
+                        target_route.set_route_order(route_order)
+                    
+                    # Optimize area route (Wochenende / Feiertag)
+                    route_optimizer.optimize_route(
+                        weekday,
+                        area=target_area,
+                        calendar_week=appointment.calendar_week
+                    )
         else:
             # Normaler Werktag – Zuweisung zwischen Mitarbeitern
             if not source_employee_id or not target_employee_id:
@@ -188,7 +195,10 @@ def move_appointment():
                 target_route_query = target_route_query.filter_by(calendar_week=appointment.calendar_week)
             target_route = target_route_query.first()
             
-            if source_route:
+            if source_route and incremental:
+                # Splice appointment out of source route (cached legs, no re-plan)
+                route_optimizer.remove_stop(source_route, appointment)
+            elif source_route:
                 # Remove appointment from source route
                 route_order = source_route.get_route_order()
                 if appointment.id in route_order:
@@ -198,7 +208,10 @@ def move_appointment():
                 # Plan source route
                 route_planner.plan_route(weekday, source_employee_id, calendar_week=appointment.calendar_week)
             
-            if target_route and appointment.visit_type in ('HB', 'NA'):
+            if target_route and appointment.visit_type in ('HB', 'NA') and incremental:
+                # Insert at cheapest position; full optimization is deferred
+                route_optimizer.insert_stop(target_route, appointment)
+            elif target_route and appointment.visit_type in ('HB', 'NA'):
                 # Only add HB and NA appointments to route order (exclude TK)
                 route_order = target_route.get_route_order()
                 route_order.append(appointment.id)
@@ -267,7 +280,6 @@ def assign_tour_area():
                 target_route = Route(
                     employee_id=None,
                     weekday=appointment.weekday,
-                    route_order=json.dumps([]),
                     total_duration=0,
                     total_distance=0,
                     area=target_area,
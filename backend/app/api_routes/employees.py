@@ -3,6 +3,7 @@ import os
 from app import db
 from app.models.employee import Employee
 from app.models.route import Route
+from app.models.route_stop import RouteStop
 from app.models.appointment import Appointment
 from app.models.employee_planning import EmployeePlanning
 from app.services.excel_import_service import ExcelImportService
@@ -88,6 +89,13 @@ def delete_employee(id):
     try:
         employee = Employee.query.get_or_404(id)
         
+        # Delete stops of the employee's routes and of the employee's appointments in other routes
+        route_ids = db.session.query(Route.id).filter_by(employee_id=id)
+        appointment_ids = db.session.query(Appointment.id).filter_by(employee_id=id)
+        RouteStop.query.filter(
+            RouteStop.route_id.in_(route_ids) | RouteStop.appointment_id.in_(appointment_ids)
+        ).delete(synchronize_session=False)
+
         # Delete related routes first
         Route.query.filter_by(employee_id=id).delete()
         
@@ -96,6 +104,9 @@ def delete_employee(id):
         
         # Delete related employee planning
         EmployeePlanning.query.filter_by(employee_id=id).delete()
+
+        # Remaining references (replacements, capacities, assignments, ...)
+        ExcelImportService.cleanup_employee_references(id)
         
         # Now delete the employee
         db.session.delete(employee)
@@ -126,9 +137,10 @@ def import_employees():
         added_employees = result['added']
         updated_employees = result['updated']
         removed_employees = result['removed']
+        kept_employees = result['kept']
         
         # Create detailed message
-        total_processed = len(added_employees) + len(updated_employees) + len(removed_employees)
+        total_processed = len(added_employees) + len(updated_employees) + len(removed_employees) + len(kept_employees)
         message_parts = []
         
         if added_employees:
@@ -137,6 +149,8 @@ def import_employees():
             message_parts.append(f"{len(updated_employees)} aktualisiert")
         if removed_employees:
             message_parts.append(f"{len(removed_employees)} entfernt")
+        if kept_employees:
+            message_parts.append(f"{len(kept_employees)} wegen Dienst-Historie behalten")
         
         if message_parts:
             message = f"Import erfolgreich: {', '.join(message_parts)}"
@@ -149,11 +163,13 @@ def import_employees():
                 "total_processed": total_processed,
                 "added": len(added_employees),
                 "updated": len(updated_employees),
-                "removed": len(removed_employees)
+                "removed": len(removed_employees),
+                "kept": len(kept_employees)
             },
             "added_employees": [emp.to_dict() for emp in added_employees],
             "updated_employees": [emp.to_dict() for emp in updated_employees],
-            "removed_employees": [emp.to_dict() for emp in removed_employees]
+            "removed_employees": [emp.to_dict() for emp in removed_employees],
+            "kept_employees": [emp.to_dict() for emp in kept_employees]
         }), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 400
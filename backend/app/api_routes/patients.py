@@ -58,6 +58,9 @@ def import_patients():
     1. Delete all existing patients and appointments
     2. Import new patients from the Excel file
     3. Create new appointments based on the imported data
+    
+    With "incremental": true (JSON body or query string) existing data is kept and only
+    the differences to the file are written; unchanged routes keep their planning.
     """
     # Get directory path from config
     directory_path = current_app.config.get('PATIENTS_IMPORT_PATH')
@@ -85,24 +88,26 @@ def import_patients():
     # Get the newest file
     newest_file = max(excel_files, key=lambda x: x[1])[0]
     
+    data = request.get_json(silent=True) or {}
+    incremental = data.get('incremental', request.args.get('incremental', 'false'))
+    if isinstance(incremental, str):
+        incremental = incremental.lower() == 'true'
+    
     try:
-        # Clear the database first
-        print(f"Clearing existing data...")
-        appointment_count = Appointment.query.count()
-        patient_count = Patient.query.count()
-        route_count = Route.query.count()
-        
-        # Löschen in der richtigen Reihenfolge (wegen Fremdschlüsselbeziehungen)
-        Route.query.delete()
-        Appointment.query.delete()
-        Patient.query.delete()
-        
-        db.session.commit()
-        print(f"Deleted {route_count} routes, {appointment_count} appointments and {patient_count} patients")
+        if not incremental:
+            # The import replaces all patient data in the same transaction as the new rows
+            appointment_count = Appointment.query.count()
+            patient_count = Patient.query.count()
+            route_count = Route.query.count()
         
         # Import the new data
-        print(f"Starting import from file: {newest_file}")
-        result = ExcelImportService.import_patients(newest_file)
+        print(f"Starting {'incremental ' if incremental else ''}import from file: {newest_file}")
+        result = ExcelImportService.import_patients(newest_file, incremental=bool(incremental))
+        changes = result.get('changes')
+        if changes:
+            patient_count = changes['patients']['deleted']
+            appointment_count = changes['appointments']['deleted']
+            route_count = changes['routes']['deleted']
         patients = result['patients']
         appointments = result['appointments']
         
@@ -113,6 +118,7 @@ def import_patients():
         
         # Get the number of created routes (from the result dictionary)
         routes = result.get('routes', [])
+        failed_routes = result.get('failed_routes', [])
         
         # Update last import time (use local timezone with timezone info)
         from datetime import timezone
@@ -126,6 +132,9 @@ def import_patients():
             "patient_count": len(patients),
             "appointment_count": len(appointments),
             "route_count": len(routes),
+            "failed_routes": failed_routes,
+            "incremental": bool(incremental),
+            "changes": changes,
             "deleted_count": {
                 "patients": patient_count,
                 "appointments": appointment_count,
@@ -1,14 +1,13 @@
 from flask import Blueprint, request, jsonify, send_file
 from datetime import datetime, timedelta, date
 import os
-from ..models.employee import Employee
 from ..models.appointment import Appointment
 from ..models.route import Route
 from ..services.route_planner import RoutePlanner
 from ..services.route_optimizer import RouteOptimizer
-from ..services.pdf_generator import PDFGenerator
-from ..services.aplano_sync import sync_employee_planning
+from ..services.pdf_export import build_week_pdfs, record_download, refresh_cached_pdfs, sync_week_planning
 from ..services.holiday_service import is_aw_area_assignment_day
+from ..services.auto_planning.roles import ROLE_NURSING, ROLE_DOCTOR
 from .. import db
 from ..models.patient import Patient
 
@@ -245,6 +244,74 @@ def optimize_routes():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@routes_bp.route('/optimize-pending', methods=['POST'])
+def optimize_pending_routes():
+    """
+    Fully optimize all routes that were changed incrementally (needs_optimization).
+    Optional JSON body: {
+        "weekday": "monday",  # Nur dieser Wochentag
+        "calendar_week": 38   # Nur diese Kalenderwoche
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        query = Route.query.filter(Route.needs_optimization.is_(True))
+        if data.get('weekday'):
+            query = query.filter(Route.weekday == data['weekday'].lower())
+        if data.get('calendar_week'):
+            query = query.filter(Route.calendar_week == data['calendar_week'])
+        routes = query.all()
+
+        optimized_count, failed_routes = route_optimizer.optimize_routes_batch(routes)
+        return jsonify({
+            'message': f'{optimized_count} routes optimized successfully',
+            'optimized_count': optimized_count,
+            'failed_routes': failed_routes
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@routes_bp.route('/rebalance', methods=['POST'])
+def rebalance_routes():
+    """
+    Propose a balanced distribution of all visits of a weekday over the employees of that day.
+    The proposal is only returned, routes are not changed.
+    Expected JSON body: {
+        "weekday": "monday",        # Wochentag (kleingeschrieben)
+        "calendar_week": 38,        # Kalenderwoche
+        "area": "Nordkreis",        # Gebiet (optional)
+        "role": "NURSING",          # NURSING oder DOCTOR (optional, Standard NURSING)
+        "employee_ids": [1, 2, 3]   # Nur diese Mitarbeiter (optional)
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        weekday = data.get('weekday', '').lower()
+        calendar_week = data.get('calendar_week')
+        role = (data.get('role') or ROLE_NURSING).upper()
+
+        if not weekday or not calendar_week:
+            return jsonify({'error': 'weekday and calendar_week are required'}), 400
+        if role not in (ROLE_NURSING, ROLE_DOCTOR):
+            return jsonify({'error': f'Invalid role: {role}'}), 400
+
+        proposal = route_optimizer.rebalance_weekday(
+            weekday,
+            calendar_week,
+            area=data.get('area'),
+            role=role,
+            employee_ids=data.get('employee_ids')
+        )
+        return jsonify(proposal)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @routes_bp.route('/download-pdf', methods=['GET'])
 def download_route_pdf():
     """
@@ -265,164 +332,21 @@ def download_route_pdf():
         if not calendar_week:
             return jsonify({'error': 'calendar_week is required'}), 400
         
-        # Ensure employee planning is synced for this calendar week,
-        # but don't abort download if sync is unavailable (e.g. missing API key/offline)
-        sync_warning = None
-        try:
-            sync_success = sync_employee_planning(calendar_week)
-            if not sync_success:
-                sync_warning = f'Failed to synchronize planning data for calendar week {calendar_week}'
-        except Exception as sync_error:
-            sync_warning = f'Failed to synchronize planning data for calendar week {calendar_week}: {sync_error}'
-
+        # Ensure employee planning is synced for this calendar week (skipped if the last sync,
+        # e.g. by the PDF refresh, is recent), but don't abort download if sync is unavailable
+        # (e.g. missing API key/offline)
+        sync_warning = sync_week_planning(calendar_week)
         if sync_warning:
             print(f"[download_route_pdf] Warning: {sync_warning}")
 
-        # Get all employees with their weekday routes for this calendar week
-        weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
-        
-        # Get all employees, ordered by function and area (Nordkreis first, then Südkreis)
-        employees = Employee.query.filter(
-            Employee.area.in_(['Nordkreis', 'Südkreis'])
-        ).order_by(
-            db.case(
-                (Employee.function == 'Pflegekraft', 1),
-                (Employee.function == 'PDL', 2),
-                (Employee.function == 'Arzt', 3),
-                (Employee.function == 'Honorararzt', 4),
-                (Employee.function == 'Physiotherapie', 5),
-                else_=99
-            ),
-            db.case(
-                (Employee.area == 'Nordkreis', 1),
-                (Employee.area == 'Südkreis', 2),
-                else_=99
-            )
-        ).all()
-        
-        # Build employee routes data structure
-        employee_routes_data = []
-        
-        for employee in employees:
-            # Get all weekday routes for this employee in this calendar week
-            routes = Route.query.filter(
-                Route.employee_id == employee.id,
-                Route.weekday.in_(weekdays),
-                Route.calendar_week == calendar_week
-            ).order_by(
-                # Custom order for weekdays
-                db.case(
-                    (Route.weekday == 'monday', 1),
-                    (Route.weekday == 'tuesday', 2),
-                    (Route.weekday == 'wednesday', 3),
-                    (Route.weekday == 'thursday', 4),
-                    (Route.weekday == 'friday', 5),
-                    else_=6
-                )
-            ).all()
-            
-            # Get all appointments for this employee in this calendar week
-            from app.models.appointment import Appointment
-            appointments = Appointment.query.filter(
-                Appointment.employee_id == employee.id,
-                Appointment.calendar_week == calendar_week
-            ).all()
-            
-            # Only add employees who have routes OR appointments
-            if routes or appointments:
-                employee_routes_data.append({
-                    'employee': employee,
-                    'routes': routes,
-                    'appointments': appointments
-                })
-                
-        # Check if any routes or appointments exist
-        if not employee_routes_data:
-            return jsonify({'error': f'No routes or appointments found for calendar week {calendar_week}'}), 404
-        
-        # Split employees into regular and doctors groups
-        regular_data = []
-        doctors_data = []
-        for emp_block in employee_routes_data:
-            func = (emp_block['employee'].function or '').strip()
-            if func in ['Arzt', 'Honorararzt']:
-                doctors_data.append(emp_block)
-            else:
-                regular_data.append(emp_block)
-
-        # Build weekend data (Saturday/Sunday routes only)
-        weekend_days = ['saturday', 'sunday']
-        weekend_employee_data = []
-        # Fetch all weekend routes regardless of employee (area-based)
-        weekend_routes = Route.query.filter(
-            Route.weekday.in_(weekend_days),
-            Route.calendar_week == calendar_week
-        ).order_by(
-            db.case(
-                (Route.weekday == 'saturday', 1),
-                (Route.weekday == 'sunday', 2),
-                else_=3
-            )
-        ).all()
-        # Group by area
-        area_to_routes = {}
-        for r in weekend_routes:
-            key = r.area or 'Unbekannt'
-            area_to_routes.setdefault(key, []).append(r)
-        for area, routes_in_area in area_to_routes.items():
-            # Get employee name if employee_id is set (from AW assignment)
-            employee_name = None
-            employee_id = None
-            # Check if any route in this area has an employee_id
-            for route in routes_in_area:
-                if route.employee_id:
-                    employee_id = route.employee_id
-                    employee = Employee.query.get(route.employee_id)
-                    if employee:
-                        employee_name = f"{employee.first_name} {employee.last_name}"
-                    break  # All routes in same area should have same employee_id
-            
-            # Build area label with employee name if available
-            area_label = f"AW {area}"
-            if employee_name:
-                area_label = f"AW {area}: {employee_name}"
-            
-            weekend_employee_data.append({
-                'group_id': f"area-{area}",
-                'area': area,
-                'area_label': area_label,
-                'routes': routes_in_area,
-                'appointments': []
-            })
-
-        # Generate all available PDFs and zip them
+        # Generate all available PDFs (unchanged ones come from the PDF cache) and zip them
         from io import BytesIO
         import zipfile
         from flask import Response
-        files_to_return = []
-
-        if regular_data:
-            pdf_buffer_regular = PDFGenerator.generate_calendar_week_pdf(
-                employee_routes_data=regular_data,
-                calendar_week=calendar_week,
-                selected_weekday=selected_weekday
-            )
-            files_to_return.append((f"PalliRoute_Routenplanung_Pflege_KW{calendar_week}.pdf", pdf_buffer_regular.getvalue()))
-
-        if doctors_data:
-            pdf_buffer_doctors = PDFGenerator.generate_calendar_week_pdf(
-                employee_routes_data=doctors_data,
-                calendar_week=calendar_week,
-                selected_weekday=selected_weekday
-            )
-            files_to_return.append((f"PalliRoute_Routenplanung_Aerzte_KW{calendar_week}.pdf", pdf_buffer_doctors.getvalue()))
-
-        if weekend_employee_data:
-            pdf_buffer_weekend = PDFGenerator.generate_weekend_pdf(
-                employee_routes_data=weekend_employee_data,
-                calendar_week=calendar_week
-            )
-            files_to_return.append((f"PalliRoute_Routenplanung_Wochenende_KW{calendar_week}.pdf", pdf_buffer_weekend.getvalue()))
+        files_to_return, cache_hits = build_week_pdfs(calendar_week, selected_weekday)
+        record_download(calendar_week, selected_weekday)
+        if cache_hits:
+            print(f"[download_route_pdf] {cache_hits}/{len(files_to_return)} PDFs for KW {calendar_week} served from cache")
 
         if not files_to_return:
             return jsonify({'error': f'No routes or appointments found for calendar week {calendar_week}'}), 404
@@ -458,4 +382,33 @@ def download_route_pdf():
         )
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500 
+
+
+@routes_bp.route('/pdf-cache/refresh', methods=['POST'])
+def refresh_pdf_cache():
+    """
+    Rebuild cached PDFs of recently downloaded calendar weeks whose data changed
+    (called periodically by the scheduler, so the next download is served from cache)
+    Optional JSON body:
+    - max_age_hours: Only weeks downloaded within this many hours (default PDF_CACHE_REFRESH_WINDOW_HOURS)
+    - max_seconds: Time budget; remaining weeks are deferred to the next call (default PDF_CACHE_REFRESH_MAX_SECONDS)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        max_age_hours = data.get('max_age_hours')
+        max_seconds = data.get('max_seconds')
+
+        results = refresh_cached_pdfs(
+            max_age_hours=float(max_age_hours) if max_age_hours is not None else None,
+            max_seconds=float(max_seconds) if max_seconds is not None else None
+        )
+        rebuilt = [result for result in results if result['rebuilt']]
+        deferred = [result for result in results if result.get('deferred')]
+        return jsonify({
+            'message': f'{len(rebuilt)} of {len(results)} cached PDF sets rebuilt, {len(deferred)} deferred',
+            'results': results
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -8,3 +8,4 @@ from . import shift_definitions
 from . import shift_instances
 from . import employee_capacities
 from . import assignments
+from . import planning_jobs
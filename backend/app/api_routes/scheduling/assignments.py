@@ -2,7 +2,7 @@ import re
 from io import BytesIO
 
 import pandas as pd
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from datetime import datetime, date
 from app import db
 from app.models.scheduling import Assignment, ShiftInstance, ShiftDefinition
@@ -404,47 +404,87 @@ def time_accounts_upload():
         return jsonify({'error': str(e)}), 500
 
 
+def _auto_plan_options(data):
+    """
+    Parse an auto-plan request body.
+
+    Returns (start_date, end_date, service_options); service_options are JSON-serializable
+    keyword arguments of AutoPlanningService, so they can also be stored with a planning job.
+    Raises ValueError for invalid input.
+    """
+    from app.services.auto_planning import SOLVER_PROFILES, DEFAULT_PENALTY_CHANGE
+
+    if not data:
+        raise ValueError('No data provided')
+    
+    required_fields = ['start_date', 'end_date']
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        raise ValueError(f'Missing required fields: {", ".join(missing_fields)}')
+    
+    start_date = data['start_date']
+    end_date = data['end_date']
+    
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    
+    solver_profile = data.get('solver_profile') or current_app.config.get('AUTO_PLANNING_SOLVER_PROFILE', 'balanced')
+    if solver_profile not in SOLVER_PROFILES:
+        raise ValueError(f'Invalid solver_profile. Must be one of: {", ".join(SOLVER_PROFILES)}')
+    # Warm start: existing assignments of the month and/or a previous result as solver hints
+    hint_assignments = [
+        [item['employee_id'], item['shift_instance_id']]
+        for item in data.get('hint_assignments') or []
+        if isinstance(item, dict) and 'employee_id' in item and 'shift_instance_id' in item
+    ]
+    options = {
+        'existing_assignments_handling': data.get('existing_assignments_handling', 'respect'),
+        'allow_overplanning': data.get('allow_overplanning', False),
+        'include_aplano': data.get('include_aplano', False),
+        'solver_profile': solver_profile,
+        'warm_start': data.get('warm_start', False),
+        'hint_assignments': hint_assignments or None,
+        'decompose': data.get('decompose', current_app.config.get('AUTO_PLANNING_DECOMPOSE', True)),
+    }
+    
+    penalty_change = data.get('penalty_change')
+    if penalty_change is None:
+        penalty_change = DEFAULT_PENALTY_CHANGE if data.get('minimal_change') else 0
+    try:
+        options['penalty_change'] = max(0, int(penalty_change))
+    except (TypeError, ValueError):
+        pass
+    num_workers = data.get('num_workers', current_app.config.get('AUTO_PLANNING_SOLVER_WORKERS'))
+    if num_workers is not None:
+        try:
+            options['num_workers'] = max(1, int(num_workers))
+        except (TypeError, ValueError):
+            pass
+    time_limit_seconds = data.get('time_limit_seconds')
+    if time_limit_seconds is not None:
+        try:
+            options['time_limit_seconds'] = float(time_limit_seconds)
+        except (TypeError, ValueError):
+            pass
+    
+    return start_date, end_date, options
+
+
 @scheduling_bp.route('/auto-plan', methods=['POST'])
 def auto_plan():
     """Run automatic planning for a date range"""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        required_fields = ['start_date', 'end_date']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
-        
-        start_date = data['start_date']
-        end_date = data['end_date']
-        
-        if isinstance(start_date, str):
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-        if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        try:
+            start_date, end_date, options = _auto_plan_options(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Import here to avoid circular dependency
         from app.services.auto_planning_service import AutoPlanningService
         
-        existing_handling = data.get('existing_assignments_handling', 'respect')
-        allow_overplanning = data.get('allow_overplanning', False)
-        include_aplano = data.get('include_aplano', False)
-        time_limit_seconds = data.get('time_limit_seconds')
-        
-        service = AutoPlanningService(
-            existing_assignments_handling=existing_handling,
-            allow_overplanning=allow_overplanning,
-            include_aplano=include_aplano
-        )
-        if time_limit_seconds is not None:
-            try:
-                service.time_limit_seconds = float(time_limit_seconds)
-            except (TypeError, ValueError):
-                pass
-        
+        service = AutoPlanningService(**options)
         result = service.plan(start_date, end_date)
         
         return jsonify(result), 200
@@ -0,0 +1,54 @@
+from flask import request, jsonify
+from app import db
+from app.services.planning_jobs import submit_planning_job, get_planning_job, cancel_planning_job, PlanningJobConflict
+from .assignments import _auto_plan_options
+from . import scheduling_bp
+
+
+@scheduling_bp.route('/auto-plan/jobs', methods=['POST'])
+def create_planning_job():
+    """Start automatic planning as background job (same body as /auto-plan)"""
+    try:
+        try:
+            start_date, end_date, options = _auto_plan_options(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            job = submit_planning_job(start_date, end_date, options)
+        except PlanningJobConflict as e:
+            return jsonify({'error': str(e), 'job_id': e.job.id, 'status': e.job.status}), 409
+
+        return jsonify({'job_id': job.id, 'status': job.status}), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@scheduling_bp.route('/auto-plan/jobs/<job_id>', methods=['GET'])
+def get_planning_job_status(job_id):
+    """Get status, progress and (when finished) the result of a planning job; polled by the UI"""
+    try:
+        job = get_planning_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Planning job not found'}), 404
+        return jsonify(job.to_dict()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@scheduling_bp.route('/auto-plan/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_planning_job_route(job_id):
+    """Stop a running planning job; the best solution found so far is saved"""
+    try:
+        job = cancel_planning_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Planning job not found'}), 404
+        return jsonify({'job_id': job.id, 'status': job.status, 'cancel_requested': job.cancel_requested}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
@@ -3,7 +3,10 @@ from . import employee
 from . import patient
 from . import appointment
 from . import route
+from . import route_stop
 from . import employee_planning
 from . import system_info
 from . import scheduling
 from . import pflegeheim
+from . import travel_time
+from . import geocode_cache
@@ -34,6 +34,12 @@ class Appointment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_appointments_employee_weekday_week', 'employee_id', 'weekday', 'calendar_week'),
+        db.Index('ix_appointments_patient_id', 'patient_id'),
+        db.Index('ix_appointments_origin_employee_id', 'origin_employee_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
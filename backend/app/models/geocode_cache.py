@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+
+class GeocodeCacheEntry(db.Model):
+    """Geocoding result of a normalized address; latitude/longitude NULL = address not found."""
+    __tablename__ = 'geocode_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    street = db.Column(db.String(200), nullable=False)  # normalized (lower case, single spaces)
+    zip_code = db.Column(db.String(20), nullable=False)
+    city = db.Column(db.String(100), nullable=False)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    provider = db.Column(db.String(20), nullable=False)  # e.g. "google"
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('street', 'zip_code', 'city', name='unique_geocode_address'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'street': self.street,
+            'zip_code': self.zip_code,
+            'city': self.city,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'provider': self.provider,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -1,6 +1,7 @@
 from app import db
 from datetime import datetime
 import json
+from .route_stop import RouteStop
 
 class Route(db.Model):
     __tablename__ = 'routes'
@@ -8,23 +9,88 @@ class Route(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=True)  # Nullable for weekend routes
     weekday = db.Column(db.String(20), nullable=False)
-    route_order = db.Column(db.Text, nullable=False)  # JSON Array of appointment ids
     total_duration = db.Column(db.Integer, nullable=False)  # in minutes
     total_distance = db.Column(db.Float, nullable=True)  # in kilometers
     polyline = db.Column(db.Text, nullable=True)  # Encoded polyline of the route
+    schedule = db.Column(db.Text, nullable=True)  # JSON Array of {appointment_id, eta, lateness} in route order
+    total_lateness = db.Column(db.Integer, nullable=True)  # Minutes late at fixed appointment times
+    fingerprint = db.Column(db.String(64), nullable=True)  # Hash of the inputs of the last planning (stops in route order)
+    optimized_fingerprint = db.Column(db.String(64), nullable=True)  # Hash of the inputs of the last optimization (stop set)
+    needs_optimization = db.Column(db.Boolean, nullable=True, default=False)  # Stops changed incrementally since last optimization
     area = db.Column(db.String(50), nullable=False)  # Nordkreis, Südkreis, etc.
     calendar_week = db.Column(db.Integer, nullable=True)  # Denormalized for easier filtering
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Stops in route order (route_stops table), loaded together with the routes
+    stops = db.relationship(
+        'RouteStop', back_populates='route', order_by='RouteStop.position',
+        cascade='all, delete-orphan', passive_deletes=True, lazy='selectin'
+    )
+    
+    __table_args__ = (
+        db.Index('ix_routes_employee_weekday_week', 'employee_id', 'weekday', 'calendar_week'),
+        db.Index('ix_routes_area_weekday_week', 'area', 'weekday', 'calendar_week'),
+    )
     
     def set_route_order(self, appointment_ids):
-        self.route_order = json.dumps(appointment_ids)
-        
+        """
+        Replace the stops by the given appointment ids in this order (repeated ids are skipped).
+        Stops that stay on the route keep their row; leg and ETA values are kept only if the
+        previous stop is unchanged.
+        """
+        existing = {}
+        previous_ids = {}
+        previous_id = None
+        for stop in self.stops:
+            existing.setdefault(stop.appointment_id, stop)
+            previous_ids[stop.appointment_id] = previous_id
+            previous_id = stop.appointment_id
+
+        stops = []
+        seen = set()
+        previous_id = None
+        for appointment_id in appointment_ids:
+            if appointment_id in seen:
+                continue
+            seen.add(appointment_id)
+            stop = existing.pop(appointment_id, None)
+            if stop is None:
+                stop = RouteStop(appointment_id=appointment_id)
+            elif previous_ids.get(appointment_id) != previous_id:
+                stop.leg_distance = None
+                stop.leg_duration = None
+                stop.eta = None
+            stop.position = len(stops)
+            stops.append(stop)
+            previous_id = appointment_id
+        self.stops = stops
+
     def get_route_order(self):
-        if self.route_order:
-            return json.loads(self.route_order)
+        return [stop.appointment_id for stop in self.stops]
+
+    def set_stop_legs(self, legs=None, schedule=None):
+        """
+        Store per-stop leg distance/duration and ETA of a planned route: legs maps appointment
+        ids to the leg arriving at that stop (meters/seconds), schedule holds the ETAs.
+        Without arguments the values are cleared.
+        """
+        etas = {entry['appointment_id']: entry['eta'] for entry in schedule or []}
+        for stop in self.stops:
+            leg = (legs or {}).get(stop.appointment_id)
+            eta = etas.get(stop.appointment_id)
+            stop.leg_distance = leg.distance / 1000 if leg else None
+            stop.leg_duration = round(leg.duration / 60) if leg else None
+            stop.eta = datetime.strptime(eta, '%H:%M').time() if eta else None
+
+    def set_schedule(self, schedule):
+        self.schedule = json.dumps(schedule) if schedule else None
+
+    def get_schedule(self):
+        if self.schedule:
+            return json.loads(self.schedule)
         return []
-        
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -34,6 +100,9 @@ class Route(db.Model):
             'total_duration': self.total_duration,
             'total_distance': self.total_distance,
             'polyline': self.polyline,
+            'schedule': self.get_schedule(),
+            'total_lateness': self.total_lateness,
+            'needs_optimization': bool(self.needs_optimization),
             'area': self.area,
             'calendar_week': self.calendar_week,
             'created_at': self.created_at.isoformat(),
@@ -0,0 +1,33 @@
+from app import db
+
+
+class RouteStop(db.Model):
+    """One appointment of a route at its position; leg values describe the drive from the previous stop (or start)."""
+    __tablename__ = 'route_stops'
+
+    id = db.Column(db.Integer, primary_key=True)
+    route_id = db.Column(db.Integer, db.ForeignKey('routes.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # 0-based order within the route
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id', ondelete='CASCADE'), nullable=False)
+    leg_distance = db.Column(db.Float, nullable=True)  # in kilometers, NULL until the route is planned
+    leg_duration = db.Column(db.Integer, nullable=True)  # in minutes, NULL until the route is planned
+    eta = db.Column(db.Time, nullable=True)  # Planned arrival time
+
+    route = db.relationship('Route', back_populates='stops')
+    appointment = db.relationship('Appointment')
+
+    __table_args__ = (
+        db.Index('ix_route_stops_route_position', 'route_id', 'position'),
+        db.Index('ix_route_stops_appointment_id', 'appointment_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'route_id': self.route_id,
+            'position': self.position,
+            'appointment_id': self.appointment_id,
+            'leg_distance': self.leg_distance,
+            'leg_duration': self.leg_duration,
+            'eta': self.eta.strftime('%H:%M') if self.eta else None
+        }
@@ -3,3 +3,4 @@ from .shift_instance import ShiftInstance
 from .employee_capacity import EmployeeCapacity
 from .assignment import Assignment
 
+from .planning_job import PlanningJob
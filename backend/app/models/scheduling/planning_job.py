@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+
+from app import db
+
+
+class PlanningJob(db.Model):
+    """Asynchronous auto-planning run (POST /api/scheduling/auto-plan/jobs)."""
+    __tablename__ = "planning_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+
+    status = db.Column(db.String(20), nullable=False, default="QUEUED")  # QUEUED | RUNNING | COMPLETED | FAILED
+    params = db.Column(db.Text, nullable=False)  # JSON: start_date, end_date, service options
+    progress = db.Column(db.Text, nullable=True)  # JSON: SolverProgress.snapshot()
+    result = db.Column(db.Text, nullable=True)  # JSON: AutoPlanningService.plan() result
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Heartbeat while running
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": json.loads(self.params) if self.params else None,
+            "progress": json.loads(self.progress) if self.progress else None,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -24,5 +24,7 @@ class ShiftInstance(db.Model):
             "date",
             name="unique_shift_per_day",
         ),
+        db.Index("ix_shift_instances_date", "date"),
+        db.Index("ix_shift_instances_month", "month"),
     )
 
@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+
+class TravelTime(db.Model):
+    """Cached driving distance/duration between two (rounded) coordinates."""
+    __tablename__ = 'travel_times'
+
+    id = db.Column(db.Integer, primary_key=True)
+    origin = db.Column(db.String(40), nullable=False)  # "lat,lng" rounded
+    destination = db.Column(db.String(40), nullable=False)  # "lat,lng" rounded
+    departure_bucket = db.Column(db.String(16), nullable=False)  # e.g. "wd-08" (weekday, 8 o'clock)
+    distance = db.Column(db.Integer, nullable=False)  # in meters
+    duration = db.Column(db.Integer, nullable=False)  # in seconds
+    polyline = db.Column(db.Text, nullable=True)  # Encoded polyline of this leg (if known)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('origin', 'destination', 'departure_bucket', name='unique_travel_time_pair'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'origin': self.origin,
+            'destination': self.destination,
+            'departure_bucket': self.departure_bucket,
+            'distance': self.distance,
+            'duration': self.duration,
+            'polyline': self.polyline,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -4,8 +4,16 @@ CP-SAT Auto-Planning: monthly duty scheduling (on-call and weekend shifts).
 
 from .roles import employee_role
 from .data_loader import load_planning_context, PlanningContext
-from .model_builder import build_model, PlanningModel
-from .solver import run_solver
+from .model_builder import (
+    build_model,
+    PlanningModel,
+    DEFAULT_PENALTY_CHANGE,
+    weekend_fairness_target,
+    weekend_week_sequence,
+    rb_nursing_week_sequence,
+)
+from .decomposition import split_context
+from .solver import run_solver, run_solvers, SolverResult, SolverProgress, SOLVER_PROFILES, DEFAULT_SOLVER_PROFILE, SOLVED_STATUSES
 from .assignment_writer import write_assignments
 
 __all__ = [
@@ -14,6 +22,17 @@ __all__ = [
     'PlanningContext',
     'build_model',
     'PlanningModel',
+    'DEFAULT_PENALTY_CHANGE',
+    'weekend_fairness_target',
+    'weekend_week_sequence',
+    'rb_nursing_week_sequence',
+    'split_context',
     'run_solver',
+    'run_solvers',
+    'SolverResult',
+    'SolverProgress',
+    'SOLVER_PROFILES',
+    'DEFAULT_SOLVER_PROFILE',
+    'SOLVED_STATUSES',
     'write_assignments',
 ]
@@ -3,7 +3,7 @@ Write solver assignments to the database (RESPECT vs OVERWRITE).
 """
 
 import logging
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 from app import db
 from app.models.scheduling import Assignment
@@ -17,12 +17,15 @@ def write_assignments(
     start_date,
     end_date,
     existing_assignments_handling: str,
+    shift_instance_ids: Optional[Iterable[int]] = None,
 ) -> int:
     """
     Persist assignments to DB. Each item is (employee_id, shift_instance_id).
 
     - OVERWRITE: delete all SOLVER assignments in [start_date, end_date], then insert new ones.
     - RESPECT: only insert assignments that are not already present (do not delete existing).
+
+    shift_instance_ids limits OVERWRITE to these shifts (e.g. only the solved components).
     """
     logger.info('write_assignments: %s assignments, mode=%s', len(assignments), existing_assignments_handling)
     if existing_assignments_handling.lower() == 'overwrite':
@@ -34,7 +37,10 @@ def write_assignments(
         deleted = db.session.query(Assignment).filter(
             Assignment.source == SOURCE_SOLVER,
             Assignment.shift_instance_id.in_(shift_ids_query),
-        ).delete(synchronize_session=False)
+        )
+        if shift_instance_ids is not None:
+            deleted = deleted.filter(Assignment.shift_instance_id.in_(list(shift_instance_ids)))
+        deleted = deleted.delete(synchronize_session=False)
         db.session.commit()
         logger.info('write_assignments: deleted %s existing SOLVER assignments in date range', deleted)
     created = 0
@@ -117,6 +117,8 @@ class PlanningContext:
     shift_id_to_idx: Dict[int, int] = field(default_factory=dict)
     # (employee_id, date) pairs where employee is absent and must not be assigned
     absent_dates: Set[Tuple[int, date]] = field(default_factory=set)
+    # (e_idx, s_idx) of a previous plan for the planning month: solver hint and reference for minimal change
+    hint_assignments: Set[Tuple[int, int]] = field(default_factory=set)
 
 
 def load_planning_context(
@@ -125,10 +127,17 @@ def load_planning_context(
     existing_assignments_handling: str,
     absent_dates: Optional[Set[Tuple[int, date]]] = None,
     external_fixed_assignments: Optional[List[Dict[str, Any]]] = None,
+    hint_from_existing: bool = False,
+    hint_assignments: Optional[List[Tuple[int, int]]] = None,
 ) -> PlanningContext:
     """
     Load planning context for the given date range.
     Derives planning month from start_date/end_date; includes previous month for W2/W3.
+
+    Hints (warm start): the planning month's SOLVER/MANUAL assignments (hint_from_existing, only
+    where they are not fixed by RESPECT) and hint_assignments ((employee_id, shift_instance_id),
+    e.g. a previous solver result) become ctx.hint_assignments. Unlike fixed assignments the
+    solver may deviate from them.
     """
     # Planning month: use start_date month
     planning_month = start_date.strftime('%Y-%m')
@@ -245,6 +254,7 @@ def load_planning_context(
     #   Solver-Fix durch den Aplano-Match ersetzt (DB-Zeilen bleiben unverändert).
     # RESPECT/OVERWRITE gilt nur für den ausgewählten Planungsmonat.
     fixed_assignments: Set[Tuple[int, int]] = set()
+    hints: Set[Tuple[int, int]] = set()
     existing = (
         db.session.query(Assignment)
         .join(ShiftInstance)
@@ -266,6 +276,8 @@ def load_planning_context(
         elif existing_assignments_handling.lower() == 'respect':
             # Planungsmonat: nur bei RESPECT fixieren
             fixed_assignments.add((e_idx, s_idx))
+        elif hint_from_existing:
+            hints.add((e_idx, s_idx))
 
     if external_fixed_assignments:
         # Lookup für Shift-Matching aus Aplano-Historie:
@@ -335,6 +347,15 @@ def load_planning_context(
                 fixed_assignments.discard(pair)
             fixed_assignments.add((e_idx, chosen_s_idx))
 
+    # Hints aus einem früheren Solver-Ergebnis (nur Planungsmonat; unbekannte MA/Schichten ignorieren)
+    for employee_id, shift_instance_id in hint_assignments or []:
+        e_idx = employee_id_to_idx.get(employee_id)
+        s_idx = shift_id_to_idx.get(shift_instance_id)
+        if e_idx is None or s_idx is None:
+            continue
+        if ctx_start <= shift_infos[s_idx].date <= ctx_end:
+            hints.add((e_idx, s_idx))
+
     ctx = PlanningContext(
         planning_month=planning_month,
         start_date=ctx_start,
@@ -348,5 +369,6 @@ def load_planning_context(
         employee_id_to_idx=employee_id_to_idx,
         shift_id_to_idx=shift_id_to_idx,
         absent_dates=absent_dates if absent_dates is not None else set(),
+        hint_assignments=hints,
     )
     return ctx
@@ -0,0 +1,86 @@
+"""
+Split a planning context into independent components.
+
+Variables exist only for candidate (employee, shift) pairs (same role, not absent, capacity > 0).
+Apart from H1 (one employee per shift) every constraint and soft rule belongs to a single
+employee, so employees that never compete for a shift do not interact. The connected components
+of the employee–shift graph (typically NURSING and DOCTOR, and areas if no employee can take
+shifts of another area) can be built and solved as separate models; the sum of their
+objectives equals the objective of the full model as long as the rules that look at the whole
+horizon (W2/W3 weekend sequence, W4 target) are taken from the full context, see build_model.
+"""
+
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+from .data_loader import PlanningContext
+from .model_builder import candidate_pairs
+
+
+def _components(n_employees: int, pairs: List[Tuple[int, int]]) -> List[List[int]]:
+    """Groups of employee indices connected through shared candidate shifts (union-find)."""
+    parent = list(range(n_employees))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_employee_of_shift: Dict[int, int] = {}
+    for e_idx, s_idx in pairs:
+        other = first_employee_of_shift.setdefault(s_idx, e_idx)
+        root_a, root_b = find(e_idx), find(other)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    groups: Dict[int, List[int]] = {}
+    for e_idx in sorted({e_idx for e_idx, _ in pairs}):
+        groups.setdefault(find(e_idx), []).append(e_idx)
+    return list(groups.values())
+
+
+def _sub_context(ctx: PlanningContext, employee_indices: List[int], shift_indices: List[int]) -> PlanningContext:
+    """Context restricted to the given employees and shifts, re-indexed from 0."""
+    e_map = {old: new for new, old in enumerate(employee_indices)}
+    s_map = {old: new for new, old in enumerate(shift_indices)}
+    employees = [replace(ctx.employees[old], index=new) for old, new in e_map.items()]
+    shifts = [replace(ctx.shifts[old], index=new) for old, new in s_map.items()]
+
+    def remap(keys):
+        return {(e_map[e_idx], s_map[s_idx]) for e_idx, s_idx in keys if e_idx in e_map and s_idx in s_map}
+
+    return replace(
+        ctx,
+        employees=employees,
+        shifts=shifts,
+        capacity_max={e.id: ctx.capacity_max[e.id] for e in employees if e.id in ctx.capacity_max},
+        fixed_assignments=remap(ctx.fixed_assignments),
+        employee_id_to_idx={e.id: e.index for e in employees},
+        shift_id_to_idx={s.id: s.index for s in shifts},
+        hint_assignments=remap(ctx.hint_assignments),
+    )
+
+
+def split_context(ctx: PlanningContext) -> List[PlanningContext]:
+    """
+    Independent components of ctx, largest (most candidate pairs) first.
+
+    Employees and shifts without any candidate pair are left out (they have no variables).
+    With a single component ctx itself is returned.
+    """
+    pairs = candidate_pairs(ctx)
+    groups = _components(len(ctx.employees), pairs)
+    if len(groups) <= 1:
+        return [ctx]
+
+    component_of_employee = {e_idx: c for c, group in enumerate(groups) for e_idx in group}
+    shifts_of_component: List[set] = [set() for _ in groups]
+    pair_counts = [0] * len(groups)
+    for e_idx, s_idx in pairs:
+        c = component_of_employee[e_idx]
+        shifts_of_component[c].add(s_idx)
+        pair_counts[c] += 1
+
+    order = sorted(range(len(groups)), key=lambda c: pair_counts[c], reverse=True)
+    return [_sub_context(ctx, groups[c], sorted(shifts_of_component[c])) for c in order]
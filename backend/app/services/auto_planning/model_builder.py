@@ -2,10 +2,12 @@
 Build OR-Tools CP-SAT model: variables x(e,s), hard constraints H1–H7, soft constraints W1–W4, objective.
 """
 
+import logging
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
-from datetime import timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from ortools.sat.python import cp_model
 
@@ -21,6 +23,12 @@ CAPACITY_SHIFT_FILTER = {
     'AW_NURSING': ('AW', 'NURSING', 'NONE'),
 }
 
+logger = logging.getLogger(__name__)
+
+# Minimal change (warm start): default penalty per hinted assignment that is not kept.
+# Above the soft rules (W1–W6, area, distance), below the fill bonus, so open shifts are still filled.
+DEFAULT_PENALTY_CHANGE = 200
+
 
 @dataclass
 class PlanningModel:
@@ -31,6 +39,64 @@ class PlanningModel:
     # list of (e_idx, s_idx) that have a variable (for iteration)
     pairs: List[Tuple[int, int]] = field(default_factory=list)
     context: PlanningContext = field(default=None)
+    # Model construction report: seconds per stage, total seconds, variable and constraint counts
+    build_stats: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _VariableIndex:
+    """Lookups of x by employee, shift, date and shift group, built once per model."""
+    # e_idx -> {s_idx: var}
+    by_employee: Dict[int, Dict[int, cp_model.IntVar]] = field(default_factory=lambda: defaultdict(dict))
+    # s_idx -> [var]
+    by_shift: Dict[int, List[cp_model.IntVar]] = field(default_factory=lambda: defaultdict(list))
+    # (e_idx, date) -> [var]
+    by_employee_date: Dict[Tuple[int, date], List[cp_model.IntVar]] = field(default_factory=lambda: defaultdict(list))
+    # capacity type -> shift indices in planning month
+    capacity_shifts: Dict[str, List[int]] = field(default_factory=dict)
+    # (calendar_week, category) -> weekend shift indices
+    weekend_shifts: Dict[Tuple[int, str], List[int]] = field(default_factory=lambda: defaultdict(list))
+
+    def employee_vars(self, e_idx: int, s_indices: Iterable[int]) -> List[cp_model.IntVar]:
+        """Variables of employee e_idx for the given shifts (shifts without variable are skipped)."""
+        e_vars = self.by_employee.get(e_idx, {})
+        return [e_vars[s_idx] for s_idx in s_indices if s_idx in e_vars]
+
+
+def _build_variable_index(
+    x: Dict[Tuple[int, int], cp_model.IntVar],
+    shifts: List[ShiftInfo],
+    planning_month: str,
+) -> _VariableIndex:
+    index = _VariableIndex()
+    for (e_idx, s_idx), var in x.items():
+        index.by_employee[e_idx][s_idx] = var
+        index.by_shift[s_idx].append(var)
+        index.by_employee_date[(e_idx, shifts[s_idx].date)].append(var)
+    for cap_type in CAPACITY_SHIFT_FILTER:
+        index.capacity_shifts[cap_type] = _get_shifts_for_capacity(shifts, planning_month, cap_type)
+    for s in shifts:
+        if s.is_weekend:
+            index.weekend_shifts[(s.calendar_week, s.category)].append(s.index)
+    return index
+
+
+def _add_presence_indicator(model: cp_model.CpModel, variables: List[cp_model.IntVar], name: str) -> cp_model.IntVar:
+    """Bool b with b == 1 iff at least one of variables is 1 (unconstrained if variables is empty)."""
+    indicator = model.NewBoolVar(name)
+    if variables:
+        model.Add(sum(variables) >= 1).OnlyEnforceIf(indicator)
+        model.Add(sum(variables) == 0).OnlyEnforceIf(indicator.Not())
+    return indicator
+
+
+def _add_and(model: cp_model.CpModel, a: cp_model.IntVar, b: cp_model.IntVar, name: str) -> cp_model.IntVar:
+    """Bool a AND b using linear constraints (avoid AddMultiplicationEquality for booleans)."""
+    both = model.NewBoolVar(name)
+    model.Add(both <= a)
+    model.Add(both <= b)
+    model.Add(both >= a + b - 1)
+    return both
 
 
 def _shift_matches_capacity(s: ShiftInfo, cap_type: str) -> bool:
@@ -133,18 +199,22 @@ def _weekend_then_monday_rb_pairs(shifts: List[ShiftInfo]) -> List[Tuple[List[in
     Weekend shifts = AW or RB_WEEKEND on that Sat/Sun. Monday RB = RB_WEEKDAY on the Monday after.
     Used to penalize: employee had weekend duty -> avoid RB on the following Monday (prefer from Tuesday).
     """
-    sundays = sorted({s.date for s in shifts if s.date.weekday() == 6})
+    shifts_by_date: Dict[date, List[ShiftInfo]] = defaultdict(list)
+    for s in shifts:
+        shifts_by_date[s.date].append(s)
+    # Sunday of every weekend with a shift on Saturday or Sunday (a component may lack one of the days)
+    sundays = sorted({d + timedelta(days=6 - d.weekday()) for d in shifts_by_date if d.weekday() >= 5})
     result: List[Tuple[List[int], List[int]]] = []
     for sun_date in sundays:
         sat_date = sun_date - timedelta(days=1)
         mon_date = sun_date + timedelta(days=1)
-        weekend_indices = [
-            s.index for s in shifts
-            if s.category in ('AW', 'RB_WEEKEND') and (s.date == sat_date or s.date == sun_date)
-        ]
+        weekend_indices = sorted(
+            s.index for s in shifts_by_date.get(sat_date, []) + shifts_by_date.get(sun_date, [])
+            if s.category in ('AW', 'RB_WEEKEND')
+        )
         monday_rb_indices = [
-            s.index for s in shifts
-            if s.category == 'RB_WEEKDAY' and s.date == mon_date
+            s.index for s in shifts_by_date.get(mon_date, [])
+            if s.category == 'RB_WEEKDAY'
         ]
         if weekend_indices and monday_rb_indices:
             result.append((weekend_indices, monday_rb_indices))
@@ -157,27 +227,72 @@ def _friday_rb_weekend_rb_night_pairs(shifts: List[ShiftInfo]) -> List[Tuple[Lis
     Friday = the Friday before that Saturday. Used to reward: same employee has Friday RB and
     RB Nacht on that weekend (and vice versa).
     """
-    saturdays = sorted({s.date for s in shifts if s.date.weekday() == 5})
+    shifts_by_date: Dict[date, List[ShiftInfo]] = defaultdict(list)
+    for s in shifts:
+        shifts_by_date[s.date].append(s)
+    # Saturday of every weekend with a shift on Saturday or Sunday
+    saturdays = sorted({d - timedelta(days=d.weekday() - 5) for d in shifts_by_date if d.weekday() >= 5})
     result: List[Tuple[List[int], List[int]]] = []
     for sat_date in saturdays:
         friday_date = sat_date - timedelta(days=1)
         sun_date = sat_date + timedelta(days=1)
         friday_rb_indices = [
-            s.index for s in shifts
-            if s.category == 'RB_WEEKDAY' and s.role == 'NURSING' and s.date == friday_date
+            s.index for s in shifts_by_date.get(friday_date, [])
+            if s.category == 'RB_WEEKDAY' and s.role == 'NURSING'
         ]
-        weekend_night_indices = [
-            s.index for s in shifts
+        weekend_night_indices = sorted(
+            s.index for s in shifts_by_date.get(sat_date, []) + shifts_by_date.get(sun_date, [])
             if s.category == 'RB_WEEKEND'
             and s.role == 'NURSING'
             and s.time_of_day == 'NIGHT'
-            and (s.date == sat_date or s.date == sun_date)
-        ]
+        )
         if friday_rb_indices and weekend_night_indices:
             result.append((friday_rb_indices, weekend_night_indices))
     return result
 
 
+def candidate_pairs(ctx: PlanningContext) -> List[Tuple[int, int]]:
+    """
+    (e_idx, s_idx) pairs that get a variable: role match, employee not absent on the shift date
+    and capacity of the shift's category not 0.
+    """
+    # 0 Kapazität in einer Kategorie = kein Zugriff auf Schichten dieser Kategorie (gilt auch bei Überplanung)
+    absent_dates = getattr(ctx, 'absent_dates', set())
+    shift_cap_types = [_get_capacity_type_for_shift(s) for s in ctx.shifts]
+    pairs: List[Tuple[int, int]] = []
+    for e in ctx.employees:
+        caps = ctx.capacity_max.get(e.id, {})
+        for s in ctx.shifts:
+            if e.role != s.role:
+                continue
+            if (e.id, s.date) in absent_dates:
+                continue
+            cap_type = shift_cap_types[s.index]
+            if cap_type is not None and caps.get(cap_type, 0) == 0:
+                continue  # 0 heißt 0: MA darf diese Kategorie nicht überplant werden
+            pairs.append((e.index, s.index))
+    return pairs
+
+
+def weekend_week_sequence(ctx: PlanningContext) -> List[int]:
+    """W2: calendar weeks with weekend shifts, in order."""
+    return sorted(set(s.calendar_week for s in ctx.shifts if s.is_weekend))
+
+
+def rb_nursing_week_sequence(ctx: PlanningContext) -> List[int]:
+    """W3: calendar weeks with RB nursing weekend shifts, in order."""
+    return sorted(set(
+        s.calendar_week for s in ctx.shifts
+        if s.is_weekend and s.category == 'RB_WEEKEND' and s.role == 'NURSING'
+    ))
+
+
+def weekend_fairness_target(ctx: PlanningContext) -> int:
+    """W4 target: weekend shifts of the planning month per employee (rounded down)."""
+    total_slots = sum(1 for s in ctx.shifts if s.month == ctx.planning_month and s.is_weekend)
+    return total_slots // len(ctx.employees) if ctx.employees else 0
+
+
 def build_model(
     ctx: PlanningContext,
     allow_overplanning: bool,
@@ -190,10 +305,21 @@ def build_model(
     penalty_distance_per_km: int = 3,
     penalty_weekend_then_monday_rb: int = 70,
     bonus_friday_weekend_rb_coupling: int = 60,  # Belohnung wenn gleiche Person Fr RB + Wo RB Nacht
+    penalty_change: int = 0,  # Minimal-Change: Strafe je verworfener Hint-Zuweisung (0 = aus)
+    fairness_target: Optional[int] = None,  # W4-Sollwert; None = aus ctx (bei Teilmodellen aus dem Gesamtkontext)
+    weekend_weeks: Optional[List[int]] = None,  # W2-Wochenfolge; None = aus ctx
+    rb_nursing_weeks: Optional[List[int]] = None,  # W3-Wochenfolge; None = aus ctx
 ) -> PlanningModel:
     """
     Build CP-SAT model with variables and all constraints.
     Only planning-month shifts are used for H4 capacity; all shifts (incl. prev month) for H6/H7 and soft.
+    Constraints look up variables in a _VariableIndex built once after the variables, so model
+    construction grows with the number of variables instead of employees² × shifts².
+    ctx.hint_assignments are passed to CP-SAT as solution hint; with penalty_change > 0 every
+    hinted assignment that is not kept costs penalty_change (minimal change to the hint).
+    fairness_target, weekend_weeks and rb_nursing_weeks override the W4 target and the
+    sequence of weekends compared by W2/W3, so a component of a split context (see
+    decomposition.split_context) is scored like the full model even if it has no shift on some weekend.
     """
     model = cp_model.CpModel()
     employees = ctx.employees
@@ -201,27 +327,36 @@ def build_model(
     planning_month = ctx.planning_month
     fixed = ctx.fixed_assignments
 
-    # --- Variables: x[(e_idx, s_idx)] only for compatible (role match); skip if employee absent on shift date ---
-    # 0 Kapazität in einer Kategorie = kein Zugriff auf Schichten dieser Kategorie (gilt auch bei Überplanung)
-    absent_dates = getattr(ctx, 'absent_dates', set())
+    stage_seconds: Dict[str, float] = {}
+    stage_start = time.perf_counter()
+
+    def stage_done(name: str) -> None:
+        nonlocal stage_start
+        now = time.perf_counter()
+        stage_seconds[name] = round(now - stage_start, 4)
+        stage_start = now
+
+    # --- Variables: x[(e_idx, s_idx)] for every candidate pair (see candidate_pairs) ---
     x: Dict[Tuple[int, int], cp_model.IntVar] = {}
-    for e in employees:
-        caps = ctx.capacity_max.get(e.id, {})
-        for s in shifts:
-            if e.role != s.role:
-                continue
-            if (e.id, s.date) in absent_dates:
-                continue
-            cap_type = _get_capacity_type_for_shift(s)
-            if cap_type is not None and caps.get(cap_type, 0) == 0:
-                continue  # 0 heißt 0: MA darf diese Kategorie nicht überplant werden
-            key = (e.index, s.index)
-            x[key] = model.NewBoolVar(f'x_{e.index}_{s.index}')
+    for (e_idx, s_idx) in candidate_pairs(ctx):
+        x[(e_idx, s_idx)] = model.NewBoolVar(f'x_{e_idx}_{s_idx}')
     pairs = list(x.keys())
 
+    # Warm start: hint the previous plan's assignments. Only the 1s are hinted — a complete 0/1 hint
+    # slowed the search down in tests. Hinted assignments without variable (e.g. employee now absent)
+    # are dropped; that is where the solver has to change the plan.
+    hints = getattr(ctx, 'hint_assignments', set())
+    for key in hints:
+        if key in x:
+            model.AddHint(x[key], 1)
+    stage_done('variables')
+
+    index = _build_variable_index(x, shifts, planning_month)
+    stage_done('index')
+
     # --- H1: Pro Schicht max. 1 Mitarbeiter; bei Overplanning: jede Schicht im Planungsmonat genau 1 ---
     for s_idx in range(len(shifts)):
-        vars_s = [x[(e, s_idx)] for (e, s) in pairs if s == s_idx]
+        vars_s = index.by_shift.get(s_idx)
         if not vars_s:
             continue
         if allow_overplanning and shifts[s_idx].month == planning_month:
@@ -230,11 +365,8 @@ def build_model(
             model.Add(sum(vars_s) <= 1)
 
     # --- H2: Each employee at most one shift per day ---
-    for e_idx in range(len(employees)):
-        for d in set(s.date for s in shifts):
-            vars_ed = [x[(e_idx, s_idx)] for (e_idx_p, s_idx) in pairs if e_idx_p == e_idx and shifts[s_idx].date == d]
-            if vars_ed:
-                model.Add(sum(vars_ed) <= 1)
+    for vars_ed in index.by_employee_date.values():
+        model.Add(sum(vars_ed) <= 1)
 
     # --- H4: Capacity (planning month only); only for shifts in planning month ---
     if not allow_overplanning:
@@ -244,10 +376,10 @@ def build_model(
             for cap_type, max_count in caps.items():
                 if max_count < 0:
                     continue
-                s_indices = _get_shifts_for_capacity(shifts, planning_month, cap_type)
+                s_indices = index.capacity_shifts.get(cap_type)
                 if not s_indices:
                     continue
-                vars_cap = [x[(e.index, s_idx)] for (ei, s_idx) in pairs if ei == e.index and s_idx in s_indices]
+                vars_cap = index.employee_vars(e.index, s_indices)
                 if vars_cap:
                     model.Add(sum(vars_cap) <= max_count)
 
@@ -258,17 +390,8 @@ def build_model(
             model.Add(x[key] == 1)
 
     # --- H6: AW weekend coupling: same employee for Sat and Sun, same area ---
-    aw_pairs = _aw_weekend_pairs(shifts)
-    for (s_sat_idx, s_sun_idx) in aw_pairs:
-        for e in employees:
-            k_sat = (e.index, s_sat_idx)
-            k_sun = (e.index, s_sun_idx)
-            if k_sat in x and k_sun in x:
-                model.Add(x[k_sat] == x[k_sun])
-
     # --- H6b: RB weekend coupling: same employee for Sat and Sun (same area, same time_of_day) ---
-    rb_sat_sun_pairs = _rb_weekend_sat_sun_pairs(shifts)
-    for (s_sat_idx, s_sun_idx) in rb_sat_sun_pairs:
+    for (s_sat_idx, s_sun_idx) in _aw_weekend_pairs(shifts) + _rb_weekend_sat_sun_pairs(shifts):
         for e in employees:
             k_sat = (e.index, s_sat_idx)
             k_sun = (e.index, s_sun_idx)
@@ -283,6 +406,7 @@ def build_model(
             kb = (e.index, s_b)
             if ka in x and kb in x:
                 model.Add(x[ka] + x[kb] <= 1)
+    stage_done('hard_constraints')
 
     # --- Objective: weighted sum of soft violations ---
     objective_terms: List = []
@@ -303,7 +427,7 @@ def build_model(
         for cw, s_indices in rb_weekday_shifts_by_week.items():
             if len(s_indices) < 2:
                 continue
-            vars_ew = [x[(e.index, s_idx)] for (ei, s_idx) in pairs if ei == e.index and s_idx in s_indices]
+            vars_ew = index.employee_vars(e.index, s_indices)
             if len(vars_ew) < 2:
                 continue
             # aux = 1 if sum >= 2
@@ -314,123 +438,68 @@ def build_model(
 
     # W2: Weekend rotation (AW -> free -> RB -> free): penalize same type two weekends in a row
     # We need weekend "type" per employee: 0=free, 1=AW, 2=RB. Then penalize when type[w] == type[w-1] and not free.
-    weekend_weeks = sorted(set(s.calendar_week for s in shifts if s.is_weekend))
+    if weekend_weeks is None:
+        weekend_weeks = weekend_week_sequence(ctx)
     if len(weekend_weeks) >= 2:
         for e in employees:
             for i in range(1, len(weekend_weeks)):
                 cw_prev, cw_curr = weekend_weeks[i - 1], weekend_weeks[i]
-                shifts_prev = [s for s in shifts if s.calendar_week == cw_prev and s.is_weekend]
-                shifts_curr = [s for s in shifts if s.calendar_week == cw_curr and s.is_weekend]
-                aw_prev = [s.index for s in shifts_prev if s.category == 'AW']
-                aw_curr = [s.index for s in shifts_curr if s.category == 'AW']
-                rb_prev = [s.index for s in shifts_prev if s.category == 'RB_WEEKEND']
-                rb_curr = [s.index for s in shifts_curr if s.category == 'RB_WEEKEND']
-                # has_aw_prev = sum x[e,s] for s in aw_prev >= 1
-                has_aw_prev = model.NewBoolVar(f'w2_aw_prev_{e.index}_{cw_prev}')
-                if aw_prev:
-                    vars_aw_prev = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in aw_prev]
-                    if vars_aw_prev:
-                        model.Add(sum(vars_aw_prev) >= 1).OnlyEnforceIf(has_aw_prev)
-                        model.Add(sum(vars_aw_prev) == 0).OnlyEnforceIf(has_aw_prev.Not())
-                else:
-                    model.Add(has_aw_prev == 0)
-                has_aw_curr = model.NewBoolVar(f'w2_aw_curr_{e.index}_{cw_curr}')
-                if aw_curr:
-                    vars_aw_curr = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in aw_curr]
-                    if vars_aw_curr:
-                        model.Add(sum(vars_aw_curr) >= 1).OnlyEnforceIf(has_aw_curr)
-                        model.Add(sum(vars_aw_curr) == 0).OnlyEnforceIf(has_aw_curr.Not())
-                else:
-                    model.Add(has_aw_curr == 0)
-                has_rb_prev = model.NewBoolVar(f'w2_rb_prev_{e.index}_{cw_prev}')
-                if rb_prev:
-                    vars_rb_prev = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in rb_prev]
-                    if vars_rb_prev:
-                        model.Add(sum(vars_rb_prev) >= 1).OnlyEnforceIf(has_rb_prev)
-                        model.Add(sum(vars_rb_prev) == 0).OnlyEnforceIf(has_rb_prev.Not())
-                else:
-                    model.Add(has_rb_prev == 0)
-                has_rb_curr = model.NewBoolVar(f'w2_rb_curr_{e.index}_{cw_curr}')
-                if rb_curr:
-                    vars_rb_curr = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in rb_curr]
-                    if vars_rb_curr:
-                        model.Add(sum(vars_rb_curr) >= 1).OnlyEnforceIf(has_rb_curr)
-                        model.Add(sum(vars_rb_curr) == 0).OnlyEnforceIf(has_rb_curr.Not())
-                else:
-                    model.Add(has_rb_curr == 0)
-                # AND using linear constraints (avoid AddMultiplicationEquality for booleans)
-                repeat_aw = model.NewBoolVar(f'w2_repeat_aw_{e.index}_{cw_curr}')
-                model.Add(repeat_aw <= has_aw_prev)
-                model.Add(repeat_aw <= has_aw_curr)
-                model.Add(repeat_aw >= has_aw_prev + has_aw_curr - 1)
-                objective_terms.append(repeat_aw * penalty_w2)
-                repeat_rb = model.NewBoolVar(f'w2_repeat_rb_{e.index}_{cw_curr}')
-                model.Add(repeat_rb <= has_rb_prev)
-                model.Add(repeat_rb <= has_rb_curr)
-                model.Add(repeat_rb >= has_rb_prev + has_rb_curr - 1)
-                objective_terms.append(repeat_rb * penalty_w2)
+                for category, label in (('AW', 'aw'), ('RB_WEEKEND', 'rb')):
+                    s_prev = index.weekend_shifts.get((cw_prev, category), [])
+                    s_curr = index.weekend_shifts.get((cw_curr, category), [])
+                    has_prev = _add_presence_indicator(
+                        model, index.employee_vars(e.index, s_prev), f'w2_{label}_prev_{e.index}_{cw_prev}'
+                    )
+                    if not s_prev:
+                        model.Add(has_prev == 0)
+                    has_curr = _add_presence_indicator(
+                        model, index.employee_vars(e.index, s_curr), f'w2_{label}_curr_{e.index}_{cw_curr}'
+                    )
+                    if not s_curr:
+                        model.Add(has_curr == 0)
+                    repeat = _add_and(model, has_prev, has_curr, f'w2_repeat_{label}_{e.index}_{cw_curr}')
+                    objective_terms.append(repeat * penalty_w2)
 
     # W3: RB nursing weekend Tag/Nacht alternation: penalize same time_of_day two weekends in a row
-    rb_nursing_weekends: List[Tuple[int, List[int], List[int]]] = []
-    for cw in weekend_weeks:
-        day_idxs = [s.index for s in shifts if s.calendar_week == cw and s.category == 'RB_WEEKEND' and s.role == 'NURSING' and s.time_of_day == 'DAY']
-        night_idxs = [s.index for s in shifts if s.calendar_week == cw and s.category == 'RB_WEEKEND' and s.role == 'NURSING' and s.time_of_day == 'NIGHT']
-        if day_idxs or night_idxs:
-            rb_nursing_weekends.append((cw, day_idxs, night_idxs))
+    rb_nursing_by_week_tod: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+    for s in shifts:
+        if s.category == 'RB_WEEKEND' and s.role == 'NURSING':
+            rb_nursing_by_week_tod[(s.calendar_week, s.time_of_day)].append(s.index)
+    if rb_nursing_weeks is None:
+        rb_nursing_weeks = rb_nursing_week_sequence(ctx)
+    rb_nursing_weekends: List[Tuple[int, List[int], List[int]]] = [
+        (cw, rb_nursing_by_week_tod.get((cw, 'DAY'), []), rb_nursing_by_week_tod.get((cw, 'NIGHT'), []))
+        for cw in rb_nursing_weeks
+    ]
+    if not rb_nursing_by_week_tod:
+        rb_nursing_weekends = []  # z.B. Teilmodell der Ärzte
     for e in employees:
         for i in range(1, len(rb_nursing_weekends)):
             cw_prev, day_prev, night_prev = rb_nursing_weekends[i - 1]
             cw_curr, day_curr, night_curr = rb_nursing_weekends[i]
-            had_day_prev = model.NewBoolVar(f'w3_day_prev_{e.index}_{cw_prev}')
-            had_night_prev = model.NewBoolVar(f'w3_night_prev_{e.index}_{cw_prev}')
-            if day_prev:
-                vd = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in day_prev]
-                if vd:
-                    model.Add(sum(vd) >= 1).OnlyEnforceIf(had_day_prev)
-                    model.Add(sum(vd) == 0).OnlyEnforceIf(had_day_prev.Not())
-            else:
-                model.Add(had_day_prev == 0)
-            if night_prev:
-                vn = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in night_prev]
-                if vn:
-                    model.Add(sum(vn) >= 1).OnlyEnforceIf(had_night_prev)
-                    model.Add(sum(vn) == 0).OnlyEnforceIf(had_night_prev.Not())
-            else:
-                model.Add(had_night_prev == 0)
-            has_day_curr = model.NewBoolVar(f'w3_day_curr_{e.index}_{cw_curr}')
-            has_night_curr = model.NewBoolVar(f'w3_night_curr_{e.index}_{cw_curr}')
-            if day_curr:
-                vd = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in day_curr]
-                if vd:
-                    model.Add(sum(vd) >= 1).OnlyEnforceIf(has_day_curr)
-                    model.Add(sum(vd) == 0).OnlyEnforceIf(has_day_curr.Not())
-            else:
-                model.Add(has_day_curr == 0)
-            if night_curr:
-                vn = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in night_curr]
-                if vn:
-                    model.Add(sum(vn) >= 1).OnlyEnforceIf(has_night_curr)
-                    model.Add(sum(vn) == 0).OnlyEnforceIf(has_night_curr.Not())
-            else:
-                model.Add(has_night_curr == 0)
-            same_day = model.NewBoolVar(f'w3_same_day_{e.index}_{cw_curr}')
-            model.Add(same_day <= had_day_prev)
-            model.Add(same_day <= has_day_curr)
-            model.Add(same_day >= had_day_prev + has_day_curr - 1)
+            indicators = {}
+            for name, cw, s_indices in (
+                ('day_prev', cw_prev, day_prev),
+                ('night_prev', cw_prev, night_prev),
+                ('day_curr', cw_curr, day_curr),
+                ('night_curr', cw_curr, night_curr),
+            ):
+                indicators[name] = _add_presence_indicator(
+                    model, index.employee_vars(e.index, s_indices), f'w3_{name}_{e.index}_{cw}'
+                )
+                if not s_indices:
+                    model.Add(indicators[name] == 0)
+            same_day = _add_and(model, indicators['day_prev'], indicators['day_curr'], f'w3_same_day_{e.index}_{cw_curr}')
             objective_terms.append(same_day * penalty_w3)
-            same_night = model.NewBoolVar(f'w3_same_night_{e.index}_{cw_curr}')
-            model.Add(same_night <= had_night_prev)
-            model.Add(same_night <= has_night_curr)
-            model.Add(same_night >= had_night_prev + has_night_curr - 1)
+            same_night = _add_and(model, indicators['night_prev'], indicators['night_curr'], f'w3_same_night_{e.index}_{cw_curr}')
             objective_terms.append(same_night * penalty_w3)
 
     # W4: Fairness — penalize excess over target share of weekend shifts
-    planning_shifts = [s for s in shifts if s.month == planning_month and s.is_weekend]
+    planning_shifts = [s.index for s in shifts if s.month == planning_month and s.is_weekend]
     if planning_shifts and employees:
-        total_slots = len(planning_shifts)
-        target_approx = total_slots // len(employees) if len(employees) else 0
+        target_approx = weekend_fairness_target(ctx) if fairness_target is None else fairness_target
         for e in employees:
-            vars_e = [x[(e.index, s_idx)] for (ei, s_idx) in pairs if ei == e.index and shifts[s_idx].month == planning_month and shifts[s_idx].is_weekend]
+            vars_e = index.employee_vars(e.index, planning_shifts)
             if not vars_e:
                 continue
             count_e = sum(vars_e)
@@ -442,20 +511,13 @@ def build_model(
     weekend_monday_pairs = _weekend_then_monday_rb_pairs(shifts)
     for weekend_indices, monday_rb_indices in weekend_monday_pairs:
         for e in employees:
-            vars_weekend = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in weekend_indices]
-            vars_monday_rb = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in monday_rb_indices]
+            vars_weekend = index.employee_vars(e.index, weekend_indices)
+            vars_monday_rb = index.employee_vars(e.index, monday_rb_indices)
             if not vars_weekend or not vars_monday_rb:
                 continue
-            has_weekend = model.NewBoolVar(f'w5_weekend_{e.index}_{weekend_indices[0]}')
-            model.Add(sum(vars_weekend) >= 1).OnlyEnforceIf(has_weekend)
-            model.Add(sum(vars_weekend) == 0).OnlyEnforceIf(has_weekend.Not())
-            has_monday_rb = model.NewBoolVar(f'w5_mon_rb_{e.index}_{monday_rb_indices[0]}')
-            model.Add(sum(vars_monday_rb) >= 1).OnlyEnforceIf(has_monday_rb)
-            model.Add(sum(vars_monday_rb) == 0).OnlyEnforceIf(has_monday_rb.Not())
-            both = model.NewBoolVar(f'w5_both_{e.index}_{weekend_indices[0]}')
-            model.Add(both <= has_weekend)
-            model.Add(both <= has_monday_rb)
-            model.Add(both >= has_weekend + has_monday_rb - 1)
+            has_weekend = _add_presence_indicator(model, vars_weekend, f'w5_weekend_{e.index}_{weekend_indices[0]}')
+            has_monday_rb = _add_presence_indicator(model, vars_monday_rb, f'w5_mon_rb_{e.index}_{monday_rb_indices[0]}')
+            both = _add_and(model, has_weekend, has_monday_rb, f'w5_both_{e.index}_{weekend_indices[0]}')
             objective_terms.append(both * penalty_weekend_then_monday_rb)
 
     # W6: Freitag RB <-> Wochenende RB Nacht koppeln: gleiche Person bevorzugen (Belohnung)
@@ -463,48 +525,48 @@ def build_model(
     nursing_employees = [e for e in employees if e.role == 'NURSING']
     for friday_rb_indices, weekend_night_indices in friday_weekend_pairs:
         for e in nursing_employees:
-            vars_friday = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in friday_rb_indices]
-            vars_weekend_night = [x[(e.index, s)] for (ei, s) in pairs if ei == e.index and s in weekend_night_indices]
+            vars_friday = index.employee_vars(e.index, friday_rb_indices)
+            vars_weekend_night = index.employee_vars(e.index, weekend_night_indices)
             if not vars_friday or not vars_weekend_night:
                 continue
-            has_friday_rb = model.NewBoolVar(f'w6_fr_rb_{e.index}_{friday_rb_indices[0]}')
-            model.Add(sum(vars_friday) >= 1).OnlyEnforceIf(has_friday_rb)
-            model.Add(sum(vars_friday) == 0).OnlyEnforceIf(has_friday_rb.Not())
-            has_weekend_night = model.NewBoolVar(f'w6_wo_night_{e.index}_{weekend_night_indices[0]}')
-            model.Add(sum(vars_weekend_night) >= 1).OnlyEnforceIf(has_weekend_night)
-            model.Add(sum(vars_weekend_night) == 0).OnlyEnforceIf(has_weekend_night.Not())
-            both = model.NewBoolVar(f'w6_couple_{e.index}_{friday_rb_indices[0]}')
-            model.Add(both <= has_friday_rb)
-            model.Add(both <= has_weekend_night)
-            model.Add(both >= has_friday_rb + has_weekend_night - 1)
+            has_friday_rb = _add_presence_indicator(model, vars_friday, f'w6_fr_rb_{e.index}_{friday_rb_indices[0]}')
+            has_weekend_night = _add_presence_indicator(
+                model, vars_weekend_night, f'w6_wo_night_{e.index}_{weekend_night_indices[0]}'
+            )
+            both = _add_and(model, has_friday_rb, has_weekend_night, f'w6_couple_{e.index}_{friday_rb_indices[0]}')
             objective_terms.append(-bonus_friday_weekend_rb_coupling * both)
 
     # Area mismatch (soft): prefer matching employee area to shift area (Nord/Süd only).
     # For shifts with area "Mitte" (e.g. AW Mitte) no preference — any employee (Nord/Süd) is fine.
+    # Distance to tour start (soft): for shifts with area (AW/Tour Nord/Mitte/Süd), prefer assigning
+    # the employee whose home is closest to that area's start point.
+    distance_cache: Dict[Tuple[int, str], Optional[float]] = {}
     for (e_idx, s_idx) in pairs:
-        emp_area = employees[e_idx].area
+        emp = employees[e_idx]
         shift_area = shifts[s_idx].area
         if (
-            emp_area is not None
+            emp.area is not None
             and shift_area
             and shift_area != "Mitte"
-            and emp_area != shift_area
+            and emp.area != shift_area
         ):
             objective_terms.append(penalty_area_mismatch * x[(e_idx, s_idx)])
-
-    # Distance to tour start (soft): for shifts with area (AW/Tour Nord/Mitte/Süd), prefer assigning
-    # the employee whose home is closest to that area's start point.
-    for (e_idx, s_idx) in pairs:
-        shift_area = shifts[s_idx].area
         if not shift_area:
             continue
-        emp = employees[e_idx]
-        dist_km = distance_km_to_area_start(emp.latitude, emp.longitude, shift_area)
+        if (e_idx, shift_area) not in distance_cache:
+            distance_cache[(e_idx, shift_area)] = distance_km_to_area_start(emp.latitude, emp.longitude, shift_area)
+        dist_km = distance_cache[(e_idx, shift_area)]
         if dist_km is not None and penalty_distance_per_km > 0:
             coeff = int(round(penalty_distance_per_km * dist_km))
             if coeff > 0:
                 objective_terms.append(coeff * x[(e_idx, s_idx)])
 
+    # Minimal change: penalize every hinted assignment that is not kept
+    if penalty_change > 0:
+        for key in hints:
+            if key in x:
+                objective_terms.append(penalty_change * (1 - x[key]))
+
     # Overplanning: Kapazitäten als weiche Constraints — Überschreitung bestrafen, Solver hält sie möglichst ein
     if allow_overplanning:
         for e in employees:
@@ -513,19 +575,34 @@ def build_model(
             for cap_type, max_count in caps.items():
                 if max_count < 0:
                     continue
-                s_indices = _get_shifts_for_capacity(shifts, planning_month, cap_type)
+                s_indices = index.capacity_shifts.get(cap_type)
                 if not s_indices or max_count == 0:
                     continue
-                vars_cap = [x[(e.index, s_idx)] for (ei, s_idx) in pairs if ei == e.index and s_idx in s_indices]
+                vars_cap = index.employee_vars(e.index, s_indices)
                 if not vars_cap:
                     continue
                 over = model.NewIntVar(0, len(vars_cap), f'over_{e.index}_{cap_type}')
                 model.Add(over >= sum(vars_cap) - max_count)
                 objective_terms.append(over * penalty_overplanning)
+    stage_done('soft_constraints')
 
     if objective_terms:
         model.Minimize(sum(objective_terms))
     else:
         model.Minimize(0)
-
-    return PlanningModel(model=model, x=x, pairs=pairs, context=ctx)
\ No newline at end of file
+    stage_done('objective')
+
+    proto = model.Proto()
+    build_stats = {
+        'seconds': stage_seconds,
+        'total_seconds': round(sum(stage_seconds.values()), 4),
+        'variables': len(proto.variables),
+        'constraints': len(proto.constraints),
+    }
+    logger.info(
+        'Model built in %.2fs (%s variables, %s constraints): %s',
+        build_stats['total_seconds'], build_stats['variables'], build_stats['constraints'],
+        ', '.join(f'{name} {seconds:.2f}s' for name, seconds in stage_seconds.items()),
+    )
+
+    return PlanningModel(model=model, x=x, pairs=pairs, context=ctx, build_stats=build_stats)
@@ -2,35 +2,349 @@
 Run CP-SAT solver and extract assignment list from solution.
 """
 
-from typing import List, Optional, Tuple
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
 from ortools.sat.python import cp_model
 
 from .model_builder import PlanningModel
 
+DEFAULT_SOLVER_PROFILE = 'balanced'
+
+# Named CP-SAT parameter sets. num_workers None = one worker per CPU core (capped by max_workers).
+# default_time_limit is used when the caller does not pass a time limit.
+# linearization_level 2 (full LP relaxation) in all profiles: with the many weighted indicator terms
+# the objective bound hardly moves at level 0/1, so the search never reaches the gap limit.
+SOLVER_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Schnelles Ergebnis (z. B. Vorschau): wenige Worker, kaum Presolve, 5 % Lücke zum Bound reicht
+    'fast': {
+        'default_time_limit': 10.0,
+        'num_workers': 4,
+        'max_workers': 4,
+        'relative_gap_limit': 0.05,
+        'linearization_level': 2,
+        'symmetry_level': 0,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 1,
+        'cp_model_probing_level': 0,
+        'random_seed': 0,
+    },
+    # Standard: Portfolio über alle Kerne, stoppt bei 1 % Lücke
+    'balanced': {
+        'default_time_limit': 30.0,
+        'num_workers': None,
+        'max_workers': 8,
+        'relative_gap_limit': 0.01,
+        'linearization_level': 2,
+        'symmetry_level': 2,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 3,
+        'cp_model_probing_level': 2,
+        'random_seed': 0,
+    },
+    # Gründlich (z. B. nachts): volle Symmetrie-Erkennung, läuft bis zum Optimum oder Zeitlimit
+    'thorough': {
+        'default_time_limit': 120.0,
+        'num_workers': None,
+        'max_workers': 16,
+        'relative_gap_limit': 0.0,
+        'linearization_level': 2,
+        'symmetry_level': 4,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 5,
+        'cp_model_probing_level': 2,
+        'random_seed': 0,
+    },
+}
+
+
+@dataclass
+class SolverResult:
+    """Solver outcome: status, objective, assignments and the search statistics."""
+    status: str  # OPTIMAL, FEASIBLE, INFEASIBLE, MODEL_INVALID, UNKNOWN
+    objective_value: float
+    # (employee_id, shift_instance_id) for each x[e,s]=1
+    assignments: List[Tuple[int, int]] = field(default_factory=list)
+    best_bound: Optional[float] = None
+    # Relative gap |objective - bound| / max(1, |objective|); 0.0 when proven optimal
+    gap: Optional[float] = None
+    wall_time_seconds: float = 0.0
+    profile: str = DEFAULT_SOLVER_PROFILE
+    # Effective CP-SAT parameters (name -> value)
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    # Per component (run_solvers with more than one model): size, workers, status, objective, bound, time
+    components: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class SolverProgress:
+    """
+    Progress of a running planning, shared between the solver threads and a monitor thread.
+
+    The solution callback records every improving solution (objective, bound, elapsed time);
+    cancel() stops the search early, the best solution so far is then returned as FEASIBLE.
+    When several component models are solved at once (run_solvers), objective and bound are the
+    sums over the components, available once every component has reported.
+    """
+
+    HISTORY_SIZE = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._solvers: List[cp_model.CpSolver] = []
+        self._started: Optional[float] = None
+        self._objectives: Dict[int, float] = {}
+        self._bounds: Dict[int, float] = {}
+        self.cancelled = threading.Event()
+        self.phase = 'queued'  # queued | loading | building | solving | writing | done
+        self.components = 1
+        self.solutions = 0
+        self.objective: Optional[float] = None
+        self.best_bound: Optional[float] = None
+        self.history: List[Dict[str, float]] = []
+
+    def attach(self, solver: cp_model.CpSolver) -> bool:
+        """
+        Register a solver before Solve(); returns False if the run is already cancelled.
+
+        Checked under the lock, so a cancel() either sees this solver or is seen here. CP-SAT
+        ignores StopSearch() until Solve() has started, so the callbacks check the flag again.
+        """
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            self._solvers.append(solver)
+            if self._started is None:
+                self._started = time.perf_counter()
+            return True
+
+    def detach(self, solver: cp_model.CpSolver) -> None:
+        with self._lock:
+            self._solvers.remove(solver)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled.set()
+            for solver in self._solvers:
+                solver.StopSearch()
+
+    def _total(self, values: Dict[int, float]) -> Optional[float]:
+        return sum(values.values()) if len(values) >= self.components else None
+
+    def record_solution(self, objective: float, bound: float, component: int = 0) -> None:
+        with self._lock:
+            self.solutions += 1
+            self._objectives[component] = objective
+            self._bounds[component] = bound
+            self.objective = self._total(self._objectives)
+            self.best_bound = self._total(self._bounds)
+            if self.objective is None:
+                return
+            self.history.append({
+                'objective': self.objective,
+                'bound': self.best_bound,
+                'elapsed_seconds': round(self._elapsed(), 2),
+            })
+            del self.history[:-self.HISTORY_SIZE]
+
+    def record_bound(self, bound: float, component: int = 0) -> None:
+        with self._lock:
+            self._bounds[component] = bound
+            self.best_bound = self._total(self._bounds)
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._started if self._started is not None else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state for status endpoints"""
+        with self._lock:
+            gap = None
+            if self.objective is not None and self.best_bound is not None:
+                gap = round(abs(self.objective - self.best_bound) / max(1.0, abs(self.objective)), 4)
+            return {
+                'phase': self.phase,
+                'solutions': self.solutions,
+                'objective': self.objective,
+                'best_bound': self.best_bound,
+                'gap': gap,
+                'elapsed_seconds': round(self._elapsed(), 2),
+                'history': list(self.history),
+            }
+
+
+class _ProgressCallback(cp_model.CpSolverSolutionCallback):
+    """Publishes each improving solution to a SolverProgress."""
+
+    def __init__(self, progress: SolverProgress, component: int = 0):
+        super().__init__()
+        self._progress = progress
+        self._component = component
+
+    def on_solution_callback(self) -> None:
+        self._progress.record_solution(self.ObjectiveValue(), self.BestObjectiveBound(), self._component)
+        if self._progress.cancelled.is_set():
+            self.StopSearch()
+
+
+def solver_parameters(
+    profile: str = DEFAULT_SOLVER_PROFILE,
+    time_limit_seconds: Optional[float] = None,
+    num_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Resolve a profile to concrete CP-SAT parameters.
+
+    Raises ValueError for unknown profiles. num_workers overrides the profile's worker count.
+    """
+    if profile not in SOLVER_PROFILES:
+        raise ValueError(f"Unknown solver profile '{profile}' (expected one of: {', '.join(SOLVER_PROFILES)})")
+    settings = dict(SOLVER_PROFILES[profile])
+    max_workers = settings.pop('max_workers')
+    default_time_limit = settings.pop('default_time_limit')
+    if num_workers is None:
+        num_workers = settings['num_workers'] or min(os.cpu_count() or 1, max_workers)
+    settings['num_workers'] = max(1, int(num_workers))
+    if time_limit_seconds is None:
+        time_limit_seconds = default_time_limit
+    if time_limit_seconds > 0:
+        settings['max_time_in_seconds'] = float(time_limit_seconds)
+    return settings
+
 
 def run_solver(
     planning_model: PlanningModel,
-    time_limit_seconds: Optional[float] = 30.0,
-) -> Tuple[str, float, List[Tuple[int, int]]]:
+    time_limit_seconds: Optional[float] = None,
+    profile: str = DEFAULT_SOLVER_PROFILE,
+    num_workers: Optional[int] = None,
+    progress: Optional[SolverProgress] = None,
+    component: int = 0,
+) -> SolverResult:
     """
-    Solve the model and return (status, objective_value, list of (employee_id, shift_instance_id)).
+    Solve the model with the given solver profile and return the SolverResult.
 
-    Status: OPTIMAL, FEASIBLE, INFEASIBLE, MODEL_INVALID, UNKNOWN.
     Assignments are (context.employees[e_idx].id, context.shifts[s_idx].id) for each x[e,s]=1.
+    With progress, improving solutions and bounds are published to it (as the given component)
+    and progress.cancel() stops the search (status FEASIBLE with the best solution so far,
+    UNKNOWN without one).
     """
+    parameters = solver_parameters(profile, time_limit_seconds, num_workers)
     solver = cp_model.CpSolver()
-    if time_limit_seconds is not None and time_limit_seconds > 0:
-        solver.parameters.max_time_in_seconds = time_limit_seconds
-    status = solver.Solve(planning_model.model)
+    for name, value in parameters.items():
+        setattr(solver.parameters, name, value)
+    if progress is None:
+        status = solver.Solve(planning_model.model)
+    elif not progress.attach(solver):
+        # Cancelled before the search started
+        return SolverResult(status='UNKNOWN', objective_value=0.0, profile=profile, parameters=parameters)
+    else:
+        def on_bound(bound: float) -> None:
+            progress.record_bound(bound, component)
+            if progress.cancelled.is_set():
+                # cancel() may have come before Solve() could take StopSearch()
+                solver.StopSearch()
+
+        solver.best_bound_callback = on_bound
+        try:
+            status = solver.Solve(planning_model.model, _ProgressCallback(progress, component))
+        finally:
+            progress.detach(solver)
     status_name = solver.StatusName(status)
-    objective_value = float(solver.ObjectiveValue()) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else 0.0
-    assignments: List[Tuple[int, int]] = []
+    result = SolverResult(
+        status=status_name,
+        objective_value=0.0,
+        wall_time_seconds=solver.WallTime(),
+        profile=profile,
+        parameters=parameters,
+    )
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.objective_value = float(solver.ObjectiveValue())
+        result.best_bound = float(solver.BestObjectiveBound())
+        result.gap = abs(result.objective_value - result.best_bound) / max(1.0, abs(result.objective_value))
         ctx = planning_model.context
         for (e_idx, s_idx) in planning_model.pairs:
             if solver.Value(planning_model.x[(e_idx, s_idx)]) == 1:
                 employee_id = ctx.employees[e_idx].id
                 shift_instance_id = ctx.shifts[s_idx].id
-                assignments.append((employee_id, shift_instance_id))
-    return status_name, objective_value, assignments
+                result.assignments.append((employee_id, shift_instance_id))
+        if progress is not None:
+            # Final bound (the bound callback may lag behind the end of the search)
+            progress.record_bound(result.best_bound, component)
+    return result
+
+
+SOLVED_STATUSES = ('OPTIMAL', 'FEASIBLE')
+
+
+def _merge_status(statuses: List[str]) -> str:
+    # Infeasible component -> full model infeasible; otherwise usable as soon as one component has a solution
+    for status in ('MODEL_INVALID', 'INFEASIBLE'):
+        if status in statuses:
+            return status
+    if all(status == 'OPTIMAL' for status in statuses):
+        return 'OPTIMAL'
+    return 'FEASIBLE' if any(status in SOLVED_STATUSES for status in statuses) else 'UNKNOWN'
+
+
+def run_solvers(
+    planning_models: List[PlanningModel],
+    time_limit_seconds: Optional[float] = None,
+    profile: str = DEFAULT_SOLVER_PROFILE,
+    num_workers: Optional[int] = None,
+    progress: Optional[SolverProgress] = None,
+) -> SolverResult:
+    """
+    Solve independent component models (decomposition.split_context) at the same time and merge them.
+
+    Every component runs in its own thread with the full time limit and stops on its own gap
+    limit, so small components finish early. CP-SAT releases the GIL while solving, so the
+    searches run in parallel; the profile's workers are shared in proportion to the number of
+    variables. The merged result is OPTIMAL only if every component is and FEASIBLE if at least
+    one component has a solution (e.g. another one was stopped before its first solution). Objective,
+    bound and assignments cover the solved components only; components[i]['status'] tells which.
+    """
+    if len(planning_models) == 1:
+        return run_solver(planning_models[0], time_limit_seconds, profile, num_workers, progress)
+
+    total_workers = solver_parameters(profile, time_limit_seconds, num_workers)['num_workers']
+    total_pairs = sum(len(m.pairs) for m in planning_models) or 1
+    workers = [max(1, round(total_workers * len(m.pairs) / total_pairs)) for m in planning_models]
+    if progress is not None:
+        progress.components = len(planning_models)
+
+    with ThreadPoolExecutor(max_workers=len(planning_models)) as executor:
+        futures = [
+            executor.submit(run_solver, m, time_limit_seconds, profile, n, progress, c)
+            for c, (m, n) in enumerate(zip(planning_models, workers))
+        ]
+        results = [future.result() for future in futures]
+
+    merged = SolverResult(
+        status=_merge_status([r.status for r in results]),
+        objective_value=0.0,
+        wall_time_seconds=max(r.wall_time_seconds for r in results),
+        profile=profile,
+        parameters={**results[0].parameters, 'num_workers': sum(r.parameters['num_workers'] for r in results)},
+    )
+    for m, r in zip(planning_models, results):
+        merged.components.append({
+            'roles': sorted({e.role for e in m.context.employees}),
+            'employees': len(m.context.employees),
+            'shifts': len(m.context.shifts),
+            'variables': len(m.pairs),
+            'num_workers': r.parameters['num_workers'],
+            'status': r.status,
+            'objective_value': r.objective_value,
+            'best_bound': r.best_bound,
+            'wall_time_seconds': round(r.wall_time_seconds, 2),
+        })
+    if merged.status in SOLVED_STATUSES:
+        solved = [r for r in results if r.status in SOLVED_STATUSES]
+        merged.objective_value = sum(r.objective_value for r in solved)
+        merged.best_bound = sum(r.best_bound for r in solved)
+        merged.gap = abs(merged.objective_value - merged.best_bound) / max(1.0, abs(merged.objective_value))
+        for r in solved:
+            merged.assignments.extend(r.assignments)
+    return merged
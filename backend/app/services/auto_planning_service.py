@@ -28,8 +28,15 @@ _RE_APLANO_NIGHT = re.compile(r'\b(nacht|nightschicht|night)\b', re.I)
 from .auto_planning import (
     load_planning_context,
     build_model,
-    run_solver,
+    split_context,
+    weekend_fairness_target,
+    weekend_week_sequence,
+    rb_nursing_week_sequence,
+    run_solvers,
     write_assignments,
+    DEFAULT_SOLVER_PROFILE,
+    SOLVED_STATUSES,
+    SolverProgress,
 )
 
 logger = logging.getLogger(__name__)
@@ -50,7 +57,13 @@ class AutoPlanningService:
         existing_assignments_handling: str = 'respect',
         allow_overplanning: bool = False,
         include_aplano: bool = False,
-        time_limit_seconds: float = 30.0,
+        time_limit_seconds: Optional[float] = None,  # None = Zeitlimit des Solver-Profils
+        solver_profile: str = DEFAULT_SOLVER_PROFILE,  # fast | balanced | thorough
+        num_workers: Optional[int] = None,  # None = Worker-Anzahl des Solver-Profils
+        warm_start: bool = False,  # Bestehende Zuweisungen des Planungsmonats als Solver-Hint
+        hint_assignments: Optional[List[Tuple[int, int]]] = None,  # (employee_id, shift_instance_id), z. B. früheres Ergebnis
+        penalty_change: int = 0,  # Minimal-Change: Strafe je geänderter Hint-Zuweisung (0 = aus)
+        decompose: bool = True,  # Unabhängige Teilprobleme (z. B. Pflege/Ärzte) als eigene Modelle parallel lösen
         penalty_w1: int = 100,
         penalty_w2: int = 150,  # Wochenend-Rotation (AW/RB → frei → …) wichtiger als andere weiche Regeln
         penalty_w3: int = 60,
@@ -63,6 +76,12 @@ class AutoPlanningService:
         self.allow_overplanning = allow_overplanning
         self.include_aplano = include_aplano
         self.time_limit_seconds = time_limit_seconds
+        self.solver_profile = solver_profile
+        self.num_workers = num_workers
+        self.warm_start = warm_start
+        self.hint_assignments = hint_assignments
+        self.penalty_change = penalty_change
+        self.decompose = decompose
         self.penalty_w1 = penalty_w1
         self.penalty_w2 = penalty_w2
         self.penalty_w3 = penalty_w3
@@ -276,10 +295,14 @@ class AutoPlanningService:
         )
         return out
 
-    def plan(self, start_date: date, end_date: date) -> Dict[str, Any]:
+    def plan(self, start_date: date, end_date: date, progress: Optional[SolverProgress] = None) -> Dict[str, Any]:
         """
         Run CP-SAT planning for the given date range (planning month derived from start_date).
+        With progress, the current phase and each improving solution are published to it and
+        progress.cancel() ends the search early with the best solution so far.
         """
+        if progress is not None:
+            progress.phase = 'loading'
         absent_dates: Set[Tuple[int, date]] = set()
         external_fixed_assignments: List[Dict[str, Any]] = []
         if self.include_aplano:
@@ -307,6 +330,8 @@ class AutoPlanningService:
                 existing_assignments_handling=self.existing_assignments_handling,
                 absent_dates=absent_dates if absent_dates else None,
                 external_fixed_assignments=external_fixed_assignments if external_fixed_assignments else None,
+                hint_from_existing=self.warm_start,
+                hint_assignments=self.hint_assignments,
             )
         except Exception as e:
             logger.exception('Failed to load planning context')
@@ -347,17 +372,38 @@ class AutoPlanningService:
 
         try:
             logger.info('Building CP-SAT model...')
-            planning_model = build_model(
-                ctx=ctx,
-                allow_overplanning=self.allow_overplanning,
-                penalty_w1=self.penalty_w1,
-                penalty_w2=self.penalty_w2,
-                penalty_w3=self.penalty_w3,
-                penalty_fairness=self.penalty_fairness,
-                penalty_overplanning=self.penalty_overplanning,
-                penalty_distance_per_km=self.penalty_distance_per_km,
-                bonus_friday_weekend_rb_coupling=self.bonus_friday_weekend_rb_coupling,
-            )
+            if progress is not None:
+                progress.phase = 'building'
+            # Komponenten ohne gemeinsame Schicht-Kandidaten teilen keine Constraints → eigene Modelle
+            contexts = split_context(ctx) if self.decompose else [ctx]
+            # Wochenbezogene Regeln (W2–W4) immer aus dem Gesamtkontext, auch für Teilmodelle
+            fairness_target = weekend_fairness_target(ctx)
+            weekend_weeks = weekend_week_sequence(ctx)
+            rb_nursing_weeks = rb_nursing_week_sequence(ctx)
+            planning_models = [
+                build_model(
+                    ctx=component_ctx,
+                    allow_overplanning=self.allow_overplanning,
+                    penalty_w1=self.penalty_w1,
+                    penalty_w2=self.penalty_w2,
+                    penalty_w3=self.penalty_w3,
+                    penalty_fairness=self.penalty_fairness,
+                    penalty_overplanning=self.penalty_overplanning,
+                    penalty_distance_per_km=self.penalty_distance_per_km,
+                    bonus_friday_weekend_rb_coupling=self.bonus_friday_weekend_rb_coupling,
+                    penalty_change=self.penalty_change,
+                    fairness_target=fairness_target,
+                    weekend_weeks=weekend_weeks,
+                    rb_nursing_weeks=rb_nursing_weeks,
+                )
+                for component_ctx in contexts
+            ]
+            if len(planning_models) > 1:
+                logger.info(
+                    'Planning split into %s independent components: %s',
+                    len(planning_models),
+                    ', '.join(f'{len(m.context.employees)} MA/{len(m.pairs)} Variablen' for m in planning_models),
+                )
         except Exception as e:
             logger.exception('Failed to build CP-SAT model')
             result = {
@@ -375,10 +421,15 @@ class AutoPlanningService:
         import time
         t0 = time.perf_counter()
         try:
-            logger.info('Running solver...')
-            status_name, objective_value, assignments = run_solver(
-                planning_model,
+            logger.info('Running solver (profile %s)...', self.solver_profile)
+            if progress is not None:
+                progress.phase = 'solving'
+            solver_result = run_solvers(
+                planning_models,
                 time_limit_seconds=self.time_limit_seconds,
+                profile=self.solver_profile,
+                num_workers=self.num_workers,
+                progress=progress,
             )
         except Exception as e:
             logger.exception('Solver failed')
@@ -394,6 +445,33 @@ class AutoPlanningService:
             logger.warning('Auto-planning aborted: %s', result.get('message'))
             return result
         runtime_seconds = time.perf_counter() - t0
+        status_name = solver_result.status
+        objective_value = solver_result.objective_value
+        assignments = solver_result.assignments
+        solver_info = {
+            'solver_profile': solver_result.profile,
+            'solver_parameters': solver_result.parameters,
+            'best_bound': solver_result.best_bound,
+            'gap': round(solver_result.gap, 4) if solver_result.gap is not None else None,
+        }
+        # Komponenten ohne Lösung (z. B. vor der ersten Lösung gestoppt) behalten ihre bisherigen Zuweisungen
+        unsolved_models = []
+        if solver_result.components:
+            solver_info['components'] = solver_result.components
+            unsolved_models = [
+                m for m, c in zip(planning_models, solver_result.components)
+                if c['status'] not in SOLVED_STATUSES
+            ]
+            solver_info['unsolved_components'] = len(unsolved_models)
+        if ctx.hint_assignments:
+            # Stabilität gegenüber dem Hint: wie viele Hint-Zuweisungen nicht übernommen wurden
+            hinted = {(ctx.employees[e_idx].id, ctx.shifts[s_idx].id) for (e_idx, s_idx) in ctx.hint_assignments}
+            solver_info['hinted_assignments'] = len(hinted)
+            solver_info['changed_assignments'] = len(hinted - set(assignments))
+        logger.info(
+            'Solver %s after %.1fs: objective %s, bound %s, gap %s',
+            status_name, runtime_seconds, objective_value, solver_result.best_bound, solver_info['gap'],
+        )
 
         if status_name == 'INFEASIBLE':
             result = {
@@ -403,6 +481,7 @@ class AutoPlanningService:
                 'solver_status': status_name,
                 'objective_value': None,
                 'runtime_seconds': round(runtime_seconds, 2),
+                **solver_info,
                 'error': 'INFEASIBLE',
             }
             logger.warning('Auto-planning: %s', result['message'])
@@ -425,6 +504,7 @@ class AutoPlanningService:
                 'solver_status': status_name,
                 'objective_value': objective_value,
                 'runtime_seconds': round(runtime_seconds, 2),
+                **solver_info,
             }
             logger.warning('Auto-planning: %s', result['message'])
             return result
@@ -438,6 +518,14 @@ class AutoPlanningService:
             (eid, sid) for (eid, sid) in assignments
             if sid in planning_month_shift_ids
         ]
+        overwrite_shift_ids = None
+        if unsolved_models:
+            unsolved_shift_ids = {s.id for m in unsolved_models for s in m.context.shifts}
+            overwrite_shift_ids = planning_month_shift_ids - unsolved_shift_ids
+            logger.warning(
+                'Auto-planning: %s of %s components without solution; their %s shifts keep their assignments',
+                len(unsolved_models), len(planning_models), len(unsolved_shift_ids),
+            )
         logger.info(
             'Solver: %s assignments total, %s shifts in planning month, %s assignments to write',
             len(assignments), len(planning_month_shift_ids), len(assignments_planning_month),
@@ -456,11 +544,14 @@ class AutoPlanningService:
 
         try:
             logger.info('Writing assignments to database...')
+            if progress is not None:
+                progress.phase = 'writing'
             assignments_created = write_assignments(
                 assignments=assignments_planning_month,
                 start_date=ctx.start_date,
                 end_date=ctx.end_date,
                 existing_assignments_handling=self.existing_assignments_handling,
+                shift_instance_ids=overwrite_shift_ids,
             )
         except Exception as e:
             logger.exception('Failed to write assignments')
@@ -472,16 +563,22 @@ class AutoPlanningService:
                 'solver_status': status_name,
                 'objective_value': objective_value,
                 'runtime_seconds': round(runtime_seconds, 2),
+                **solver_info,
                 'error': str(e),
             }
             logger.warning('Auto-planning aborted: %s', result.get('message'))
             return result
 
         return {
-            'message': 'Planning completed successfully',
+            'message': (
+                'Planning completed successfully' if not unsolved_models
+                else f'Planning completed; {len(unsolved_models)} of {len(planning_models)} components without solution (not changed)'
+            ),
             'assignments_created': assignments_created,
             'total_planned': len(assignments_planning_month),
             'solver_status': status_name,
             'objective_value': objective_value,
             'runtime_seconds': round(runtime_seconds, 2),
+            'model_build_seconds': round(sum(m.build_stats.get('total_seconds', 0.0) for m in planning_models), 2),
+            **solver_info,
         }
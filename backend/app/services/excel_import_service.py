@@ -1,21 +1,35 @@
 from typing import List, Dict, Any, Tuple, Optional
 import pandas as pd
-import re  # Modul für reguläre Ausdrücke hinzugefügt
-from datetime import datetime, time
+from datetime import date, datetime
 from io import BytesIO
 import os
 import time as time_module
 import googlemaps
+from sqlalchemy import insert, inspect as sa_inspect
+from sqlalchemy.orm import joinedload
 from ..models.employee import Employee
 from ..models.patient import Patient
 from ..models.appointment import Appointment, VISIT_TYPE_DURATIONS
 from ..models.route import Route
+from ..models.route_stop import RouteStop
 from ..models.employee_planning import EmployeePlanning
 from ..models.scheduling import Assignment, ShiftInstance, ShiftDefinition, EmployeeCapacity
 from ..models.pflegeheim import Pflegeheim
 from .. import db
-import json
-from .route_optimizer import RouteOptimizer
+from .route_optimizer import RouteOptimizer, AW_TOUR_AREAS
+from .geocode_cache import GeocodeCache, normalize_address
+from .sheet_parsing import (
+    alias_list_column,
+    calendar_week_column,
+    optional_number_column,
+    optional_text_column,
+    phone_column,
+    text_column,
+    time_info_column,
+    tour_area_column,
+    visit_type_column,
+    zip_code_column
+)
 from .holiday_service import (
     date_for_iso_week_and_weekday,
     default_planning_year,
@@ -23,92 +37,152 @@ from .holiday_service import (
 )
 from datetime import date
 
+# Fields compared when an incremental import matches an existing row
+_PATIENT_SYNC_FIELDS = ('zip_code', 'city', 'latitude', 'longitude', 'phone1', 'phone2', 'area')
+_APPOINTMENT_SYNC_FIELDS = (
+    'employee_id', 'origin_employee_id', 'tour_employee_id', 'time',
+    'visit_type', 'duration', 'info', 'area', 'calendar_week'
+)
+
+
+def _patient_key(patient: Patient) -> Tuple:
+    """Natural key of a patient row (same match the appointment import uses)"""
+    return (patient.first_name, patient.last_name, patient.street, patient.calendar_week)
+
+
+def _route_key(route: Route) -> Tuple:
+    """Natural key of a route: AW tour-area routes by area, all others by employee"""
+    if route.employee_id is None or route.area in AW_TOUR_AREAS:
+        return ('area', route.area, route.weekday, route.calendar_week)
+    return ('employee', route.employee_id, route.weekday, route.calendar_week)
+
+
+class _ImportDiff:
+    """
+    State of an incremental patient import: existing patients by natural key, ids of rows
+    whose content changed, routes that have to be planned again and the change counts.
+    """
+
+    def __init__(self):
+        self.patients: Dict[Tuple, List[Patient]] = {}
+        for patient in Patient.query.order_by(Patient.id).all():
+            self.patients.setdefault(_patient_key(patient), []).append(patient)
+        self.changed_patient_ids = set()
+        self.changed_appointment_ids = set()
+        self.routes_to_plan: List[Route] = []
+        self.counts = {
+            table: {'inserted': 0, 'updated': 0, 'deleted': 0}
+            for table in ('patients', 'appointments', 'routes')
+        }
+
+    def count(self, table: str, change: str, amount: int = 1):
+        self.counts[table][change] += amount
+
+
 class ExcelImportService:
-    # Class-level cache for geocoding to avoid redundant API calls
-    _geocode_cache: Dict[str, Tuple[float, float]] = {}
-    
+    @staticmethod
+    def _geocode_remote(street: str, zip_code: str, city: str) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Geocode an address using Google Maps Geocoding API (no cache, no database access)
+        Returns (latitude, longitude) or (None, None) if Google finds no result; raises on request errors
+        """
+        address = f"{street}, {zip_code} {city}, Germany"
+
+        # Get API key from environment variable
+        api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set. Geocoding will not work.")
+
+        # Initialize Google Maps client
+        gmaps = googlemaps.Client(key=api_key)
+
+        # Call the Google Maps Geocoding API
+        geocode_result = gmaps.geocode(address)
+
+        # Check if the request was successful and has results
+        if geocode_result and len(geocode_result) > 0:
+            location = geocode_result[0]['geometry']['location']
+            return location['lat'], location['lng']
+
+        print(f"  Warning: Failed to geocode address: {address}")
+        return None, None
+
     @staticmethod
     def geocode_address(street: str, zip_code: str, city: str) -> Tuple[Optional[float], Optional[float]]:
         """
-        Geocode an address using Google Maps Geocoding API with caching
+        Geocode an address using Google Maps Geocoding API with caching (geocode_cache table)
         Returns a tuple of (latitude, longitude) or (None, None) if geocoding fails
         """
-        # Format the address
-        address = f"{street}, {zip_code} {city}, Germany"
-        cache_key = address.lower().strip()
-        
+        cache_key = normalize_address(street, zip_code, city)
+        cached = GeocodeCache.get_many([cache_key])
+        if cache_key in cached:
+            return cached[cache_key]
+
         try:
-            # Check if address is already in cache
-            if cache_key in ExcelImportService._geocode_cache:
-                cached_result = ExcelImportService._geocode_cache[cache_key]
-                return cached_result
-            
-            # Get API key from environment variable
-            api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
-            if not api_key:
-                print("Warning: GOOGLE_MAPS_API_KEY environment variable not set. Geocoding will not work.")
-                return None, None
-            
-            # Initialize Google Maps client
-            gmaps = googlemaps.Client(key=api_key)
-            
-            # Call the Google Maps Geocoding API
-            geocode_result = gmaps.geocode(address)
-            
-            # Check if the request was successful and has results
-            if geocode_result and len(geocode_result) > 0:
-                location = geocode_result[0]['geometry']['location']
-                latitude = location['lat']
-                longitude = location['lng']
-                
-                # Store result in cache
-                ExcelImportService._geocode_cache[cache_key] = (latitude, longitude)
-                
-                return latitude, longitude
-            else:
-                print(f"  Warning: Failed to geocode address: {address}")
-                return None, None
-                
+            latlng = ExcelImportService._geocode_remote(street, zip_code, city)
         except Exception as e:
             print(f"  Error geocoding address: {e}")
             return None, None
 
+        # Store result in cache (also "not found", see GEOCODE_NEGATIVE_TTL_HOURS)
+        GeocodeCache.store({cache_key: latlng})
+        return latlng
+
     @staticmethod
     def batch_geocode_addresses(address_tuples, max_workers=10):
         """
-        Geocode multiple addresses in parallel using ThreadPoolExecutor.
+        Geocode multiple addresses: cached results are read in the calling thread,
+        only unknown addresses are geocoded in parallel using ThreadPoolExecutor.
         address_tuples: List of (street, zip_code, city)
         Returns: Dict with (street, zip_code, city) as key and (lat, lng) as value
         """
         from concurrent.futures import ThreadPoolExecutor, as_completed
-        results = {}
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_address = {
-                executor.submit(ExcelImportService.geocode_address, street, zip_code, city): (street, zip_code, city)
-                for (street, zip_code, city) in address_tuples
-            }
-            for future in as_completed(future_to_address):
-                address = future_to_address[future]
-                try:
-                    latlng = future.result()
-                    results[address] = latlng
-                except Exception as exc:
-                    print(f"  Error in geocoding for {address}: {exc}")
-                    results[address] = (None, None)
-        return results
+        cache_keys = {address: normalize_address(*address) for address in address_tuples}
+        cached = GeocodeCache.get_many(cache_keys.values())
+
+        # One request per normalized address
+        to_geocode = {}
+        for address, cache_key in cache_keys.items():
+            if cache_key not in cached:
+                to_geocode.setdefault(cache_key, address)
+
+        fetched = {}
+        if to_geocode:
+            print(f"  Geocoding {len(to_geocode)} new addresses ({len(cached)} cached)")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_key = {
+                    executor.submit(ExcelImportService._geocode_remote, *address): cache_key
+                    for cache_key, address in to_geocode.items()
+                }
+                for future in as_completed(future_to_key):
+                    cache_key = future_to_key[future]
+                    try:
+                        fetched[cache_key] = future.result()
+                    except Exception as exc:
+                        # Request errors are not cached, the address is retried next time
+                        print(f"  Error in geocoding for {to_geocode[cache_key]}: {exc}")
+            GeocodeCache.store(fetched)
+
+        return {
+            address: cached.get(cache_key) or fetched.get(cache_key) or (None, None)
+            for address, cache_key in cache_keys.items()
+        }
     
     @staticmethod
-    def delete_patient_data():
+    def delete_patient_data(commit: bool = True):
         """
         Deletes only patient-related data, keeps employees and their planning
+        commit=False leaves the deletion to the caller's transaction (patient import)
         """
         try:
             # Delete in correct order to maintain referential integrity
+            RouteStop.query.delete()
             Route.query.delete()
             Appointment.query.delete()
             Patient.query.delete()
             # Note: Employees and EmployeePlanning are NOT deleted
-            db.session.commit()
+            if commit:
+                db.session.commit()
             print("Successfully deleted patient data from database")
         except Exception as e:
             db.session.rollback()
@@ -128,11 +202,22 @@ class ExcelImportService:
             raise Exception(f"Error deleting planning for employee {employee_id}: {str(e)}")
 
     @staticmethod
-    def cleanup_employee_references(employee_id):
+    def past_assignment_count(employee_id) -> int:
+        """Shift assignments of the employee before the current month (duty history)"""
+        month_start = date.today().replace(day=1)
+        return Assignment.query.join(ShiftInstance, Assignment.shift_instance_id == ShiftInstance.id).filter(
+            Assignment.employee_id == employee_id,
+            ShiftInstance.date < month_start
+        ).count()
+
+    @staticmethod
+    def cleanup_employee_references(employee_id, keep_history=False):
         """
         Clean up references to an employee before deletion:
         - Set employee_id to NULL in routes
         - Set employee_id, origin_employee_id, and tour_employee_id to NULL in appointments
+        - Delete the employee's capacities and shift assignments (foreign keys are enforced);
+          with keep_history only the assignments from the current month on
         """
         try:
             # Update routes: set employee_id to NULL
@@ -159,6 +244,18 @@ class ExcelImportService:
             replacement_updated = EmployeePlanning.query.filter_by(replacement_id=employee_id).update({'replacement_id': None})
             if replacement_updated > 0:
                 print(f"  Set replacement_id to NULL in {replacement_updated} planning entries")
+
+            # Capacities and assignments belong to the employee (foreign keys are enforced)
+            capacities_deleted = EmployeeCapacity.query.filter_by(employee_id=employee_id).delete()
+            assignments_query = Assignment.query.filter(Assignment.employee_id == employee_id)
+            if keep_history:
+                current_shifts = db.session.query(ShiftInstance.id).filter(
+                    ShiftInstance.date >= date.today().replace(day=1)
+                )
+                assignments_query = assignments_query.filter(Assignment.shift_instance_id.in_(current_shifts))
+            assignments_deleted = assignments_query.delete(synchronize_session=False)
+            if capacities_deleted or assignments_deleted:
+                print(f"  Deleted {capacities_deleted} capacities and {assignments_deleted} assignments")
             
         except Exception as e:
             raise Exception(f"Error cleaning up employee references: {str(e)}")
@@ -239,14 +336,35 @@ class ExcelImportService:
             
             print(f"Found {len(existing_employees)} existing employees in database")
             
-            # 1. Adressen extrahieren und deduplizieren
-            address_tuples = []
-            for _, row in df.iterrows():
-                street = str(row['Strasse']).strip()
-                zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-                city = str(row['Ort']).strip()
-                address_tuples.append((street, zip_code, city))
-            unique_address_tuples = list(set(address_tuples))
+            # Spalten einmal normalisieren, die Schleife unten baut nur noch Objekte
+            first_names = text_column(df['Vorname'])
+            last_names = text_column(df['Nachname'])
+            streets = text_column(df['Strasse'])
+            zip_codes = zip_code_column(df['PLZ'])
+            cities = text_column(df['Ort'])
+            functions = text_column(df['Funktion'])
+            areas = text_column(df['Gebiet'])
+            stellenumfang_values = df['Stellenumfang'].astype(str).str.replace('%', '', regex=False).tolist()
+            alias_series = pd.Series(None, index=df.index, dtype=object)
+            for alias_column in ('Aliasse', 'Alias'):
+                if alias_column in df.columns:
+                    alias_series = df[alias_column].where(df[alias_column].notna(), alias_series)
+            aliases = optional_text_column(alias_series)
+            capacity_columns = {
+                'rb_nursing_weekday': 'Rufbereitschaft Pflege unter der Woche',
+                'rb_nursing_weekend': 'Rufbereitschaft Pflege Wochenende',
+                'rb_doctors_weekday': 'Rufbereitschaft Ärzte unter der Woche',
+                'rb_doctors_weekend': 'Rufbereitschaft Ärzte Wochenende',
+                'aw_nursing': 'Wochenenddienste Pflege'
+            }
+            capacity_values = {
+                capacity_key: optional_number_column(df[column])
+                for capacity_key, column in capacity_columns.items()
+                if column in df.columns
+            }
+
+            # 1. Adressen deduplizieren
+            unique_address_tuples = list(set(zip(streets, zip_codes, cities)))
 
             # 2. Batch-Geocoding
             geocode_results = ExcelImportService.batch_geocode_addresses(unique_address_tuples, max_workers=10)
@@ -256,69 +374,40 @@ class ExcelImportService:
             updated_employees = []
             excel_employee_keys = set()
             
-            for idx, row in df.iterrows():
+            for i, idx in enumerate(df.index):
                 try:
-                    stellenumfang = str(row['Stellenumfang']).replace('%', '')
-                    work_hours = float(stellenumfang)
+                    work_hours = float(stellenumfang_values[i])
                     if work_hours < 0 or work_hours > 100:
                         raise ValueError(f"Stellenumfang muss zwischen 0 und 100 sein, ist aber {work_hours}")
 
-                    area = str(row['Gebiet']).strip()
+                    area = areas[i]
                     if area not in valid_areas:
                         raise ValueError(f"Ungültiges Gebiet '{area}'. Muss einer der folgenden Werte sein: {', '.join(valid_areas)}")
 
-                    street = str(row['Strasse']).strip()
-                    zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-                    city = str(row['Ort']).strip()
+                    street = streets[i]
+                    zip_code = zip_codes[i]
+                    city = cities[i]
                     latitude, longitude = geocode_results.get((street, zip_code, city), (None, None))
 
-                    function = str(row['Funktion']).strip()
+                    function = functions[i]
                     if function not in valid_functions:
                         raise ValueError(f"Ungültige Funktion '{function}'. Muss einer der folgenden Werte sein: {', '.join(valid_functions)}")
 
                     # Handle alias field (optional) - support both "Alias" and "Aliasse" column names
-                    alias = None
-                    if 'Alias' in df.columns and pd.notna(row['Alias']):
-                        alias = str(row['Alias']).strip()
-                    elif 'Aliasse' in df.columns and pd.notna(row['Aliasse']):
-                        alias = str(row['Aliasse']).strip()
+                    alias = aliases[i]
 
                     # Note: RB/AW capacity fields are now managed via EmployeeCapacity model
                     # These fields are read but not directly set on Employee anymore
                     # Capacity data should be imported separately via the scheduling API
                     capacity_data = {}
-                    if 'Rufbereitschaft Pflege unter der Woche' in df.columns and pd.notna(row['Rufbereitschaft Pflege unter der Woche']):
-                        try:
-                            capacity_data['rb_nursing_weekday'] = int(float(row['Rufbereitschaft Pflege unter der Woche']))
-                        except (ValueError, TypeError):
-                            raise ValueError(f"Ungültiger Wert für 'Rufbereitschaft Pflege unter der Woche' in Zeile {idx + 2}. Erwartet: Zahl")
-                    
-                    if 'Rufbereitschaft Pflege Wochenende' in df.columns and pd.notna(row['Rufbereitschaft Pflege Wochenende']):
-                        try:
-                            capacity_data['rb_nursing_weekend'] = int(float(row['Rufbereitschaft Pflege Wochenende']))
-                        except (ValueError, TypeError):
-                            raise ValueError(f"Ungültiger Wert für 'Rufbereitschaft Pflege Wochenende' in Zeile {idx + 2}. Erwartet: Zahl")
-                    
-                    if 'Rufbereitschaft Ärzte unter der Woche' in df.columns and pd.notna(row['Rufbereitschaft Ärzte unter der Woche']):
-                        try:
-                            capacity_data['rb_doctors_weekday'] = int(float(row['Rufbereitschaft Ärzte unter der Woche']))
-                        except (ValueError, TypeError):
-                            raise ValueError(f"Ungültiger Wert für 'Rufbereitschaft Ärzte unter der Woche' in Zeile {idx + 2}. Erwartet: Zahl")
-                    
-                    if 'Rufbereitschaft Ärzte Wochenende' in df.columns and pd.notna(row['Rufbereitschaft Ärzte Wochenende']):
-                        try:
-                            capacity_data['rb_doctors_weekend'] = int(float(row['Rufbereitschaft Ärzte Wochenende']))
-                        except (ValueError, TypeError):
-                            raise ValueError(f"Ungültiger Wert für 'Rufbereitschaft Ärzte Wochenende' in Zeile {idx + 2}. Erwartet: Zahl")
-                    
-                    if 'Wochenenddienste Pflege' in df.columns and pd.notna(row['Wochenenddienste Pflege']):
-                        try:
-                            capacity_data['aw_nursing'] = int(float(row['Wochenenddienste Pflege']))
-                        except (ValueError, TypeError):
-                            raise ValueError(f"Ungültiger Wert für 'Wochenenddienste Pflege' in Zeile {idx + 2}. Erwartet: Zahl")
-
-                    first_name = str(row['Vorname']).strip()
-                    last_name = str(row['Nachname']).strip()
+                    for capacity_key, (numbers, invalid) in capacity_values.items():
+                        if invalid[i]:
+                            raise ValueError(f"Ungültiger Wert für '{capacity_columns[capacity_key]}' in Zeile {idx + 2}. Erwartet: Zahl")
+                        if numbers[i] is not None:
+                            capacity_data[capacity_key] = int(numbers[i])
+
+                    first_name = first_names[i]
+                    last_name = last_names[i]
                     employee_key = f"{first_name.lower()}_{last_name.lower()}"
                     excel_employee_keys.add(employee_key)
                     
@@ -373,7 +462,10 @@ class ExcelImportService:
                     removed_employees.append(emp)
                     print(f"Removing employee: {emp.first_name} {emp.last_name}")
             
-            # Delete planning entries and employees that are not in Excel
+            # Delete planning entries and employees that are not in Excel. Employees with shift
+            # assignments in past months are kept (without capacities and future assignments), so
+            # the duty history is not lost when someone is missing from one sheet
+            kept_employees = []
             for emp in removed_employees:
                 # Check if employee has active references before deletion
                 has_routes = Route.query.filter_by(employee_id=emp.id).count() > 0
@@ -386,10 +478,18 @@ class ExcelImportService:
                 if has_routes or has_appointments:
                     print(f"  Warning: Employee {emp.first_name} {emp.last_name} has active references in routes/appointments. References will be set to NULL.")
                 
+                past_assignments = ExcelImportService.past_assignment_count(emp.id)
+
                 # Clean up all references to this employee before deletion
-                ExcelImportService.cleanup_employee_references(emp.id)
+                ExcelImportService.cleanup_employee_references(emp.id, keep_history=past_assignments > 0)
                 ExcelImportService.delete_planning_for_employee(emp.id)
+                if past_assignments:
+                    print(f"  Keeping employee {emp.first_name} {emp.last_name}: {past_assignments} shift assignments "
+                          f"in past months (capacities and future assignments removed)")
+                    kept_employees.append(emp)
+                    continue
                 db.session.delete(emp)
+            removed_employees = [emp for emp in removed_employees if emp not in kept_employees]
             
             db.session.commit()
             
@@ -432,12 +532,14 @@ class ExcelImportService:
                 new_employees_only = [emp for emp, _ in added_employees]
                 ExcelImportService._create_planning_entries_for_employees(new_employees_only)
             
-            print(f"Import complete: {len(added_employees)} added, {len(updated_employees)} updated, {len(removed_employees)} removed")
+            print(f"Import complete: {len(added_employees)} added, {len(updated_employees)} updated, "
+                  f"{len(removed_employees)} removed, {len(kept_employees)} kept (shift history)")
             
             return {
                 'added': [emp for emp, _ in added_employees],
                 'updated': [emp for emp, _ in updated_employees],
-                'removed': removed_employees
+                'removed': removed_employees,
+                'kept': kept_employees
             }
 
         except Exception as e:
@@ -461,26 +563,24 @@ class ExcelImportService:
             existing_pflegeheime = Pflegeheim.query.all()
             existing_by_name = {p.name.strip().lower(): p for p in existing_pflegeheime}
 
-            address_tuples = []
-            for _, row in df.iterrows():
-                street = str(row['Straße']).strip()
-                zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-                city = str(row['Ort']).strip()
-                address_tuples.append((street, zip_code, city))
-            unique_address_tuples = list(set(address_tuples))
+            names = text_column(df['Name'])
+            streets = text_column(df['Straße'])
+            zip_codes = zip_code_column(df['PLZ'])
+            cities = text_column(df['Ort'])
+            unique_address_tuples = list(set(zip(streets, zip_codes, cities)))
             geocode_results = ExcelImportService.batch_geocode_addresses(unique_address_tuples, max_workers=10)
 
             added = []
             updated = []
             excel_names = set()
 
-            for idx, row in df.iterrows():
-                name = str(row['Name']).strip()
+            for i, idx in enumerate(df.index):
+                name = names[i]
                 if not name:
                     raise ValueError(f"Name ist leer in Zeile {idx + 2}")
-                street = str(row['Straße']).strip()
-                zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-                city = str(row['Ort']).strip()
+                street = streets[i]
+                zip_code = zip_codes[i]
+                city = cities[i]
                 latitude, longitude = geocode_results.get((street, zip_code, city), (None, None))
                 excel_names.add(name.lower())
 
@@ -508,9 +608,11 @@ class ExcelImportService:
             raise Exception(f"Fehler beim Importieren der Pflegeheime: {str(e)}")
 
     @staticmethod
-    def _process_single_sheet(df: pd.DataFrame, sheet_name: str, employees: List[Employee]) -> Dict[str, List[Any]]:
+    def _process_single_sheet(df: pd.DataFrame, sheet_name: str, employees: List[Employee], diff: Optional['_ImportDiff'] = None) -> Dict[str, List[Any]]:
         """
         Process a single sheet: create patients, appointments, and routes for that sheet
+        With diff (incremental import), rows are matched against existing patients and appointments
+        and only the differences are written; routes are returned unsaved for _sync_routes.
         """
         required_columns = [
             'Gebiet', 'Touren', 'Nachname', 'Vorname', 'Ort', 'PLZ', 'Strasse', 'KW',
@@ -527,27 +629,37 @@ class ExcelImportService:
         # Load replacement information for this sheet
         print(f"  Loading replacement information for sheet {sheet_name}...")
         replacement_assignments = {}
-        for emp in employees:
-            planning_entries = EmployeePlanning.query.filter_by(employee_id=emp.id).all()
-            for entry in planning_entries:
-                if entry.replacement_id:
-                    key = (entry.weekday, entry.calendar_week)
-                    if key not in replacement_assignments:
-                        replacement_assignments[key] = {}
-                    replacement_assignments[key][emp.id] = entry.replacement_id
-                    print(f"    Found replacement: {emp.first_name} {emp.last_name} -> {entry.replacement.first_name} {entry.replacement.last_name} on {entry.weekday} (KW {entry.calendar_week})")
+        planning_entries = EmployeePlanning.query.options(
+            joinedload(EmployeePlanning.employee), joinedload(EmployeePlanning.replacement)
+        ).filter(
+            EmployeePlanning.employee_id.in_([emp.id for emp in employees]),
+            EmployeePlanning.replacement_id.isnot(None)
+        ).order_by(EmployeePlanning.employee_id, EmployeePlanning.id).all() if employees else []
+        for entry in planning_entries:
+            emp = entry.employee
+            key = (entry.weekday, entry.calendar_week)
+            if key not in replacement_assignments:
+                replacement_assignments[key] = {}
+            replacement_assignments[key][emp.id] = entry.replacement_id
+            print(f"    Found replacement: {emp.first_name} {emp.last_name} -> {entry.replacement.first_name} {entry.replacement.last_name} on {entry.weekday} (KW {entry.calendar_week})")
         
+        persist = diff is None
+
         # 1. Create patients for this sheet
         print(f"  Step 1: Creating patients from sheet {sheet_name}...")
-        patients = ExcelImportService._create_patients_from_sheet(df, sheet_name)
+        patients = ExcelImportService._create_patients_from_sheet(df, sheet_name, persist=persist)
+        if diff is not None:
+            patients = ExcelImportService._sync_patients(patients, diff)
         
         # 2. Create appointments for this sheet's patients
         print(f"  Step 2: Creating appointments for sheet {sheet_name}...")
-        appointments = ExcelImportService._create_appointments_from_sheet(df, patients, employees, sheet_name, replacement_assignments)
+        appointments = ExcelImportService._create_appointments_from_sheet(df, patients, employees, sheet_name, replacement_assignments, persist=persist)
+        if diff is not None:
+            appointments = ExcelImportService._sync_appointments(appointments, patients, diff)
         
         # 3. Create routes for this sheet's appointments
         print(f"  Step 3: Creating routes for sheet {sheet_name}...")
-        routes = ExcelImportService._create_routes_from_sheet(appointments, employees)
+        routes = ExcelImportService._create_routes_from_sheet(appointments, employees, persist=persist)
         
         return {
             'patients': patients,
@@ -555,125 +667,6 @@ class ExcelImportService:
             'routes': routes
         }
 
-    @staticmethod
-    def _normalize_zip_code(value) -> str:
-        """
-        Normalize ZIP/PLZ values that may come in as numbers (e.g. 51597.0).
-        Returns a stripped string; numeric values are converted via int and zero-padded to 5 digits.
-        """
-        # Treat pandas NA values as empty
-        if pd.isna(value):
-            return ""
-
-        # Strings: handle numeric-like strings such as "51597.0"
-        if isinstance(value, str):
-            s = value.strip()
-            if not s:
-                return ""
-            # If it's purely numeric or numeric with .0, normalize via float->int
-            if re.fullmatch(r"\d+(\.0+)?", s):
-                try:
-                    return f"{int(float(s)):05d}"
-                except (ValueError, OverflowError):
-                    return s
-            return s
-
-        # Numeric types: convert to int and pad to 5 digits
-        if isinstance(value, (int, float)):
-            try:
-                return f"{int(value):05d}"
-            except (ValueError, OverflowError):
-                return str(value)
-
-        # Fallback: convert to string and strip
-        return str(value).strip()
-
-    @staticmethod
-    def _is_no_visit_day_cell(value) -> bool:
-        """
-        True if the weekday column means „kein Termin“: leere Zelle, fehlender Wert (NaN),
-        oder Platzhalter wie „--“. Nicht betroffen: der Besuchstyp-Code „NA“ (Neuaufnahme)
-        in befüllten Zellen – der wird normal geparst.
-        """
-        if pd.isna(value):
-            return True
-        s = str(value).strip()
-        if not s:
-            return True
-        # Häufige Excel-Platzhalter für „kein Besuch“
-        if s in ("--", "–", "—", "−"):
-            return True
-        return False
-
-    @staticmethod
-    def _normalize_phone_value(value):
-        """
-        Normalize phone number values that may come in as numbers (e.g. 0225198765.0).
-        Returns a string or None; numeric values are converted via int to remove '.0'.
-        """
-        if pd.isna(value):
-            return None
-
-        if isinstance(value, str):
-            s = value.strip()
-            if not s:
-                return None
-            # Handle numeric-like strings with optional .0
-            if re.fullmatch(r"\d+(\.0+)?", s):
-                try:
-                    return str(int(float(s)))
-                except (ValueError, OverflowError):
-                    return s
-            return s
-
-        if isinstance(value, (int, float)):
-            try:
-                return str(int(value))
-            except (ValueError, OverflowError):
-                return str(value)
-
-        return str(value).strip()
-
-    @staticmethod
-    def _parse_calendar_week(value) -> Optional[int]:
-        """
-        Normalize calendar week (KW) values that may come in as numbers or strings like '12.0'.
-        Returns an int (1–53) or None if the value is empty/NA.
-        Range validation (1–53) is done by the caller.
-        """
-        if pd.isna(value):
-            return None
-
-        if isinstance(value, str):
-            s = value.strip()
-            if not s:
-                return None
-            try:
-                num = float(s)
-            except (ValueError, TypeError):
-                raise
-        else:
-            try:
-                num = float(value)
-            except (ValueError, TypeError):
-                raise
-
-        return int(num)
-
-    @staticmethod
-    def _parse_touren_wochenende_area(row, has_aw_tour_column: bool, aw_tour_column: str) -> Optional[str]:
-        """Parse Nord/Mitte/Süd from Touren-Wochenende column; None if unset."""
-        if not has_aw_tour_column or aw_tour_column not in row or pd.isna(row.get(aw_tour_column)):
-            return None
-        raw = str(row[aw_tour_column]).strip().lower()
-        if "nord" in raw:
-            return "Nord"
-        if "mitte" in raw:
-            return "Mitte"
-        if "süd" in raw or "sued" in raw:
-            return "Süd"
-        return None
-
     @staticmethod
     def _is_aw_style_area_appointment(app: Appointment) -> bool:
         """HB/NA without employee: weekend or NRW weekday public holiday."""
@@ -694,31 +687,38 @@ class ExcelImportService:
             return False
 
     @staticmethod
-    def _create_patients_from_sheet(df: pd.DataFrame, sheet_name: str) -> List[Patient]:
+    def _create_patients_from_sheet(df: pd.DataFrame, sheet_name: str, persist: bool = True) -> List[Patient]:
         """
         Create patients from a single sheet
+        persist=False returns unsaved patients (incremental import matches them against the database)
         """
-        # Extract and deduplicate patient addresses for geocoding
-        patient_address_tuples = []
-        for _, row in df.iterrows():
-            street = str(row['Strasse']).strip()
-            zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-            city = str(row['Ort']).strip()
-            patient_address_tuples.append((street, zip_code, city))
-        unique_patient_address_tuples = list(set(patient_address_tuples))
+        # Normalize all columns at once, the loop below only validates and builds objects
+        first_names = text_column(df['Vorname'])
+        last_names = text_column(df['Nachname'])
+        streets = text_column(df['Strasse'])
+        zip_codes = zip_code_column(df['PLZ'])
+        cities = text_column(df['Ort'])
+        areas_raw = optional_text_column(df['Gebiet'])
+        phones1 = phone_column(df['Telefon'])
+        phones2 = phone_column(df['Telefon2'])
+        calendar_weeks, invalid_weeks = calendar_week_column(df['KW'])
+        kw_raw = df['KW'].tolist()
+
+        # Deduplicate patient addresses for geocoding
+        unique_patient_address_tuples = list(set(zip(streets, zip_codes, cities)))
         
         # Batch geocoding for this sheet
         geocode_results = ExcelImportService.batch_geocode_addresses(unique_patient_address_tuples, max_workers=10)
         
         # Create patients
         patients = []
-        for idx, row in df.iterrows():
+        for i, idx in enumerate(df.index):
             # Validate required fields
-            first_name = str(row['Vorname']).strip()
-            last_name = str(row['Nachname']).strip()
-            street = str(row['Strasse']).strip()
-            zip_code = ExcelImportService._normalize_zip_code(row['PLZ'])
-            city = str(row['Ort']).strip()
+            first_name = first_names[i]
+            last_name = last_names[i]
+            street = streets[i]
+            zip_code = zip_codes[i]
+            city = cities[i]
             
             # Check required fields are not empty
             if not first_name:
@@ -739,7 +739,7 @@ class ExcelImportService:
             latitude, longitude = geocode_results.get((street, zip_code, city), (None, None))
             
             # Process area field with substring matching
-            area_raw = str(row['Gebiet']).strip() if pd.notna(row['Gebiet']) else ""
+            area_raw = areas_raw[i] or ""
             
             # Check if area field is empty
             if not area_raw:
@@ -755,14 +755,8 @@ class ExcelImportService:
                 raise ValueError(f"Ungültiges Gebiet '{area_raw}' für Patient {first_name} {last_name} in Zeile {idx + 2} im Sheet '{sheet_name}'. Erwartet: 'Nordkreis' oder 'Südkreis'")
             
             # Validate calendar week (KW)
-            calendar_week = None
-            if pd.notna(row['KW']):
-                try:
-                    calendar_week = ExcelImportService._parse_calendar_week(row['KW'])
-                    if calendar_week is None or calendar_week < 1 or calendar_week > 53:
-                        raise ValueError(f"Ungültige Kalenderwoche {calendar_week} für Patient {first_name} {last_name} in Zeile {idx + 2} im Sheet '{sheet_name}'. Muss zwischen 1 und 53 sein")
-                except (ValueError, TypeError):
-                    raise ValueError(f"Ungültige Kalenderwoche '{row['KW']}' für Patient {first_name} {last_name} in Zeile {idx + 2} im Sheet '{sheet_name}'. Muss eine Zahl zwischen 1 und 53 sein")
+            if invalid_weeks[i]:
+                raise ValueError(f"Ungültige Kalenderwoche '{kw_raw[i]}' für Patient {first_name} {last_name} in Zeile {idx + 2} im Sheet '{sheet_name}'. Muss eine Zahl zwischen 1 und 53 sein")
             
             patient = Patient(
                 first_name=first_name,
@@ -772,25 +766,28 @@ class ExcelImportService:
                 city=city,
                 latitude=latitude,
                 longitude=longitude,
-                phone1=ExcelImportService._normalize_phone_value(row['Telefon']),
-                phone2=ExcelImportService._normalize_phone_value(row['Telefon2']),
-                calendar_week=calendar_week,
+                phone1=phones1[i],
+                phone2=phones2[i],
+                calendar_week=calendar_weeks[i],
                 area=patient_area
             )
             patients.append(patient)
         
+        if not persist:
+            return patients
+
         # Save patients to get IDs
         print(f"    Saving {len(patients)} patients from sheet {sheet_name}...")
-        db.session.add_all(patients)
-        db.session.commit()
+        ExcelImportService._bulk_insert(patients)
         print(f"    Saved {len(patients)} patients successfully")
         
         return patients
 
     @staticmethod
-    def _create_appointments_from_sheet(df: pd.DataFrame, patients: List[Patient], employees: List[Employee], sheet_name: str, replacement_assignments: Dict) -> List[Appointment]:
+    def _create_appointments_from_sheet(df: pd.DataFrame, patients: List[Patient], employees: List[Employee], sheet_name: str, replacement_assignments: Dict, persist: bool = True) -> List[Appointment]:
         """
         Create appointments for patients from a single sheet
+        persist=False returns unsaved appointments (incremental import matches them against the database)
         """
         appointments = []
         weekdays = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag']
@@ -816,20 +813,37 @@ class ExcelImportService:
         aw_tour_column = 'Touren-Wochenende'
         has_aw_tour_column = aw_tour_column in df.columns
         
-        for idx, row in df.iterrows():
-            # Find the patient for this row (exact match including calendar_week)
-            if pd.notna(row['KW']):
-                try:
-                    row_calendar_week = ExcelImportService._parse_calendar_week(row['KW'])
-                except (ValueError, TypeError):
-                    row_calendar_week = None
+        # Normalize all columns at once, the loop below only builds appointments
+        row_count = len(df.index)
+        row_keys = zip(
+            text_column(df['Vorname']), text_column(df['Nachname']), text_column(df['Strasse']),
+            calendar_week_column(df['KW'])[0]
+        )
+        touren = optional_text_column(df['Touren'])
+        aw_tour_areas = tour_area_column(df[aw_tour_column]) if has_aw_tour_column else [None] * row_count
+        day_columns = {}
+        for weekday in weekdays + weekend_days:
+            visit_types, invalid_visit_info = visit_type_column(df[weekday])
+            time_column = f"Uhrzeit/Info {weekday}"
+            if time_column in df.columns:
+                time_infos, appointment_times = time_info_column(df[time_column])
+            else:
+                time_infos, appointment_times = [None] * row_count, [None] * row_count
+            responsible_column = f"Zuständige {weekday}"
+            if has_responsible_columns and responsible_column in df.columns:
+                responsible = alias_list_column(df[responsible_column])
             else:
-                row_calendar_week = None
-            patient = next((p for p in patients if 
-                           p.last_name == str(row['Nachname']).strip() and
-                           p.first_name == str(row['Vorname']).strip() and
-                           p.street == str(row['Strasse']).strip() and
-                           p.calendar_week == row_calendar_week), None)
+                responsible = [[]] * row_count
+            day_columns[weekday] = (visit_types, invalid_visit_info, time_infos, appointment_times, responsible)
+        
+        # Exact match including calendar_week; the first patient wins for duplicate rows
+        patients_by_key = {}
+        for p in patients:
+            patients_by_key.setdefault((p.first_name, p.last_name, p.street, p.calendar_week), p)
+        
+        for i, (idx, row_key) in enumerate(zip(df.index, row_keys)):
+            # Find the patient for this row
+            patient = patients_by_key.get(row_key)
             if not patient:
                 print(f"    Warning: Patient not found for row {idx} in sheet {sheet_name}")
                 continue
@@ -837,7 +851,7 @@ class ExcelImportService:
             print(f"    Processing patient {patient.first_name} {patient.last_name} (KW {patient.calendar_week})")
             
             # Default employee assignment from 'Touren' column
-            mitarbeiter_nachname_raw = str(row['Touren']).strip() if pd.notna(row['Touren']) else None
+            mitarbeiter_nachname_raw = touren[i]
             if not mitarbeiter_nachname_raw:
                 raise ValueError(f"Touren-Spalte ist leer für Patient {patient.first_name} {patient.last_name} in Zeile {idx + 2} im Sheet '{sheet_name}'")
             
@@ -854,21 +868,14 @@ class ExcelImportService:
             
             # Create weekday appointments
             for weekday in weekdays:
-                weekday_value = row[weekday]
-                visit_type = None
+                visit_types, invalid_visit_info, time_infos, appointment_times, responsible = day_columns[weekday]
+                visit_type = visit_types[i]
                 duration = 0
-                if not ExcelImportService._is_no_visit_day_cell(weekday_value):
-                    visit_info = str(weekday_value).strip().upper()
-                    if "HB" in visit_info:
-                        visit_type = "HB"
-                    elif "NA" in visit_info:
-                        visit_type = "NA"
-                    elif "TK" in visit_info:
-                        visit_type = "TK"
-                    else:
-                        # Validate that only valid visit types are used
-                        valid_visit_types = ["HB", "NA", "TK"]
-                        raise ValueError(f"Ungültiger Besuchstyp '{visit_info}' für Patient {patient.first_name} {patient.last_name} am {weekday} in Zeile {idx + 2} im Sheet '{sheet_name}'. Erlaubte Werte: {', '.join(valid_visit_types)}")
+                if invalid_visit_info[i] is not None:
+                    # Validate that only valid visit types are used
+                    valid_visit_types = ["HB", "NA", "TK"]
+                    raise ValueError(f"Ungültiger Besuchstyp '{invalid_visit_info[i]}' für Patient {patient.first_name} {patient.last_name} am {weekday} in Zeile {idx + 2} im Sheet '{sheet_name}'. Erlaubte Werte: {', '.join(valid_visit_types)}")
+                if visit_type is not None:
                     duration = VISIT_TYPE_DURATIONS.get(visit_type, 0)
                 
                 weekday_map = {
@@ -880,19 +887,9 @@ class ExcelImportService:
                 }
                 english_weekday = weekday_map.get(weekday, weekday.lower())
 
-                # Parse time info (shared for all appointments of this weekday)
-                time_info_column = f"Uhrzeit/Info {weekday}"
-                time_info = None
-                if time_info_column in row and not pd.isna(row[time_info_column]):
-                    time_info = str(row[time_info_column])
-                appointment_time = None
-                if time_info and ':' in time_info:
-                    try:
-                        time_parts = time_info.split(':')
-                        hour, minute = int(time_parts[0]), int(time_parts[1])
-                        appointment_time = time(hour, minute)
-                    except (ValueError, IndexError):
-                        pass
+                # Time info (shared for all appointments of this weekday)
+                time_info = time_infos[i]
+                appointment_time = appointment_times[i]
 
                 # NRW public holiday (Mon–Fri): same as weekend tour (Touren-Wochenende area, no employee)
                 if visit_type is not None and patient.calendar_week is not None:
@@ -901,9 +898,7 @@ class ExcelImportService:
                             patient.calendar_week, english_weekday, default_planning_year()
                         )
                         if is_weekday_holiday(hol_date):
-                            area_hol = ExcelImportService._parse_touren_wochenende_area(
-                                row, has_aw_tour_column, aw_tour_column
-                            )
+                            area_hol = aw_tour_areas[i]
                             if area_hol is None:
                                 area_hol = "Nicht zugewiesen"
                             appointments.append(
@@ -926,15 +921,7 @@ class ExcelImportService:
                         pass
 
                 # Parse responsible employees - support multiple aliases separated by comma
-                responsible_column = f"Zuständige {weekday}"
-                responsible_aliases = []
-                
-                if has_responsible_columns and responsible_column in df.columns:
-                    responsible_alias_raw = row.get(responsible_column)
-                    if pd.notna(responsible_alias_raw) and str(responsible_alias_raw).strip() != "":
-                        # Split by comma and strip whitespace from each alias
-                        alias_strings = [alias.strip() for alias in str(responsible_alias_raw).split(',')]
-                        responsible_aliases = [alias for alias in alias_strings if alias]  # Remove empty strings
+                responsible_aliases = list(responsible[i])
                 
                 # If no responsible aliases found, use default employee (single entry)
                 if not responsible_aliases:
@@ -1003,50 +990,24 @@ class ExcelImportService:
             # Create weekend appointments if available
             if weekend_days:
                 for weekday in weekend_days:
-                    weekday_value = row[weekday]
-                    visit_type = None
+                    visit_types, invalid_visit_info, time_infos, appointment_times, _ = day_columns[weekday]
+                    visit_type = visit_types[i]
                     duration = 0
-                    if not ExcelImportService._is_no_visit_day_cell(weekday_value):
-                        visit_info = str(weekday_value).strip().upper()
-                        if "HB" in visit_info:
-                            visit_type = "HB"
-                        elif "NA" in visit_info:
-                            visit_type = "NA"
-                        elif "TK" in visit_info:
-                            visit_type = "TK"
-                        else:
-                            # Validate that only valid visit types are used
-                            valid_visit_types = ["HB", "NA", "TK"]
-                            raise ValueError(
-                                f"Ungültiger Besuchstyp '{visit_info}' für Patient {patient.first_name} {patient.last_name} am {weekday} in Zeile {idx + 2} im Sheet '{sheet_name}'. Erlaubte Werte: {', '.join(valid_visit_types)}"
-                            )
+                    if invalid_visit_info[i] is not None:
+                        # Validate that only valid visit types are used
+                        valid_visit_types = ["HB", "NA", "TK"]
+                        raise ValueError(
+                            f"Ungültiger Besuchstyp '{invalid_visit_info[i]}' für Patient {patient.first_name} {patient.last_name} am {weekday} in Zeile {idx + 2} im Sheet '{sheet_name}'. Erlaubte Werte: {', '.join(valid_visit_types)}"
+                        )
+                    if visit_type is not None:
                         duration = VISIT_TYPE_DURATIONS.get(visit_type, 0)
                     
                     # AW-Fläche aus Touren-Wochenende
-                    aw_tour_area = None
-                    if has_aw_tour_column and aw_tour_column in row and pd.notna(row[aw_tour_column]):
-                        aw_tour_area_raw = str(row[aw_tour_column]).strip()
-                        aw_tour_area_raw_lower = aw_tour_area_raw.lower()
-                        if "nord" in aw_tour_area_raw_lower:
-                            aw_tour_area = "Nord"
-                        elif "mitte" in aw_tour_area_raw_lower:
-                            aw_tour_area = "Mitte"
-                        elif "süd" in aw_tour_area_raw_lower or "sued" in aw_tour_area_raw_lower:
-                            aw_tour_area = "Süd"
+                    aw_tour_area = aw_tour_areas[i]
                     
-                    # Parse time info
-                    time_info_column = f"Uhrzeit/Info {weekday}"
-                    time_info = None
-                    if time_info_column in row and not pd.isna(row[time_info_column]):
-                        time_info = str(row[time_info_column])
-                    appointment_time = None
-                    if time_info and ':' in time_info:
-                        try:
-                            time_parts = time_info.split(':')
-                            hour, minute = int(time_parts[0]), int(time_parts[1])
-                            appointment_time = time(hour, minute)
-                        except (ValueError, IndexError):
-                            pass
+                    # Time info
+                    time_info = time_infos[i]
+                    appointment_time = appointment_times[i]
                     
                     # AW-Termin (Sa/So)
                     weekday_map = {
@@ -1075,18 +1036,21 @@ class ExcelImportService:
                         )
                         appointments.append(appointment)
         
+        if not persist:
+            return appointments
+
         # Save appointments
         print(f"    Saving {len(appointments)} appointments from sheet {sheet_name}...")
-        db.session.add_all(appointments)
-        db.session.commit()
+        ExcelImportService._bulk_insert(appointments)
         print(f"    Saved {len(appointments)} appointments successfully")
         
         return appointments
 
     @staticmethod
-    def _create_routes_from_sheet(appointments: List[Appointment], employees: List[Employee]) -> List[Route]:
+    def _create_routes_from_sheet(appointments: List[Appointment], employees: List[Employee], persist: bool = True) -> List[Route]:
         """
         Create routes for appointments from a single sheet
+        persist=False returns unsaved routes (incremental import matches them against the database)
         """
         routes = []
         
@@ -1115,12 +1079,12 @@ class ExcelImportService:
             new_route = Route(
                 employee_id=employee_id,
                 weekday=weekday,
-                route_order=json.dumps(appointment_ids),
                 total_duration=0,
                 total_distance=0,
                 area=route_area,
                 calendar_week=route_calendar_week
             )
+            new_route.set_route_order(appointment_ids)
             routes.append(new_route)
         
         # Gruppierung AW-Flächentermine (Wochenende + NRW-Feiertag Mo–Fr)
@@ -1146,83 +1110,59 @@ class ExcelImportService:
             new_route = Route(
                 employee_id=None,
                 weekday=weekday,
-                route_order=json.dumps(appointment_ids),
                 total_duration=0,
                 total_distance=0,
                 area=area,
                 calendar_week=route_calendar_week
             )
+            new_route.set_route_order(appointment_ids)
             routes.append(new_route)
         
         # Save routes
-        if routes:
+        if routes and persist:
             print(f"    Saving {len(routes)} routes...")
-            db.session.add_all(routes)
-            db.session.commit()
+            ExcelImportService._bulk_insert_routes(routes)
             print(f"    Saved {len(routes)} routes successfully")
         
         return routes
 
     @staticmethod
-    def _create_empty_routes(employees: List[Employee], calendar_weeks: List[int]) -> List[Route]:
+    def _empty_route_candidates(employees: List[Employee], calendar_weeks: List[int]) -> List[Tuple[Route, str]]:
         """
-        Create empty routes for all employees for all weekdays for all calendar weeks
+        Unsaved empty routes every import provides: Mo–Fr per employee, AW tour areas on
+        Sa/So and on NRW public holidays. Returns (route, description) pairs.
         """
-        empty_routes = []
+        candidates = []
         english_weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
-        
-        # Create empty routes for each calendar week
+        tour_area_labels = ['Nord', 'Mitte', 'Süd']
+        english_weekend_days = ['saturday', 'sunday']
+        plan_year = default_planning_year()
+
         for calendar_week in calendar_weeks:
-            print(f"    Creating empty routes for KW {calendar_week}...")
-            
             for employee in employees:
                 for weekday in english_weekdays:
-                    # Check if route already exists for this employee, weekday, and calendar_week
-                    existing_route = Route.query.filter_by(
+                    route = Route(
                         employee_id=employee.id,
                         weekday=weekday,
-                        calendar_week=calendar_week
-                    ).first()
-                    
-                    if not existing_route:
-                        print(f"      Creating empty route for employee {employee.first_name} {employee.last_name} on {weekday} (KW {calendar_week})")
-                        new_route = Route(
-                            employee_id=employee.id,
-                            weekday=weekday,
-                            route_order=json.dumps([]),
-                            total_duration=0,
-                            total_distance=0,
-                            area=employee.area or '',
-                            calendar_week=calendar_week  # Set specific calendar_week
-                        )
-                        empty_routes.append(new_route)
-            
+                        total_duration=0,
+                        total_distance=0,
+                        area=employee.area or '',
+                        calendar_week=calendar_week  # Set specific calendar_week
+                    )
+                    candidates.append((route, f"empty route for employee {employee.first_name} {employee.last_name} on {weekday} (KW {calendar_week})"))
+
             # Leere AW-Flächenrouten Sa/So
-            tour_area_labels = ['Nord', 'Mitte', 'Süd']
-            english_weekend_days = ['saturday', 'sunday']
-            plan_year = default_planning_year()
-            
             for area in tour_area_labels:
                 for weekday in english_weekend_days:
-                    existing_route = Route.query.filter_by(
+                    route = Route(
                         employee_id=None,
                         weekday=weekday,
+                        total_duration=0,
+                        total_distance=0,
                         area=area,
-                        calendar_week=calendar_week
-                    ).first()
-                    
-                    if not existing_route:
-                        print(f"      Creating empty AW tour-area route for {area} on {weekday} (KW {calendar_week})")
-                        new_route = Route(
-                            employee_id=None,
-                            weekday=weekday,
-                            route_order=json.dumps([]),
-                            total_duration=0,
-                            total_distance=0,
-                            area=area,
-                            calendar_week=calendar_week  # Set specific calendar_week
-                        )
-                        empty_routes.append(new_route)
+                        calendar_week=calendar_week  # Set specific calendar_week
+                    )
+                    candidates.append((route, f"empty AW tour-area route for {area} on {weekday} (KW {calendar_week})"))
 
             # Empty area routes for NRW public holidays (Mon–Fri), same as weekend AW slots
             for weekday in english_weekdays:
@@ -1233,69 +1173,275 @@ class ExcelImportService:
                 if not is_weekday_holiday(d):
                     continue
                 for area in tour_area_labels:
-                    existing_route = Route.query.filter_by(
+                    route = Route(
                         employee_id=None,
                         weekday=weekday,
+                        total_duration=0,
+                        total_distance=0,
                         area=area,
-                        calendar_week=calendar_week
-                    ).first()
-                    if not existing_route:
-                        print(
-                            f"      Creating empty holiday-AW route for area {area} on {weekday} (KW {calendar_week})"
-                        )
-                        new_route = Route(
-                            employee_id=None,
-                            weekday=weekday,
-                            route_order=json.dumps([]),
-                            total_duration=0,
-                            total_distance=0,
-                            area=area,
-                            calendar_week=calendar_week,
-                        )
-                        empty_routes.append(new_route)
+                        calendar_week=calendar_week,
+                    )
+                    candidates.append((route, f"empty holiday-AW route for area {area} on {weekday} (KW {calendar_week})"))
+
+        return candidates
+
+    @staticmethod
+    def _create_empty_routes(employees: List[Employee], calendar_weeks: List[int]) -> List[Route]:
+        """
+        Create empty routes for all employees for all weekdays for all calendar weeks
+        """
+        empty_routes = []
+        if not calendar_weeks:
+            return empty_routes
+        print(f"    Creating empty routes for KW {', '.join(map(str, calendar_weeks))}...")
+
+        # Employee routes exist per employee/weekday/week, area routes per area/weekday/week
+        def slot(employee_id, area, weekday, calendar_week):
+            if employee_id is not None:
+                return (employee_id, None, weekday, calendar_week)
+            return (None, area, weekday, calendar_week)
+
+        existing_slots = {
+            slot(*row) for row in db.session.query(
+                Route.employee_id, Route.area, Route.weekday, Route.calendar_week
+            ).filter(Route.calendar_week.in_(calendar_weeks))
+        }
+
+        for route, description in ExcelImportService._empty_route_candidates(employees, calendar_weeks):
+            if slot(route.employee_id, route.area, route.weekday, route.calendar_week) not in existing_slots:
+                print(f"      Creating {description}")
+                empty_routes.append(route)
         
         if empty_routes:
             print(f"    Saving {len(empty_routes)} empty routes...")
-            db.session.add_all(empty_routes)
-            db.session.commit()
+            ExcelImportService._bulk_insert_routes(empty_routes)
             print(f"    Saved {len(empty_routes)} empty routes successfully")
         
         return empty_routes
 
     @staticmethod
-    def _plan_all_routes(routes: List[Route]):
+    def _bulk_insert(objects: List[Any]) -> List[Any]:
         """
-        Optimize and plan all routes using the route optimizer
+        Insert new instances of one model with a single executemany-style INSERT ... RETURNING
+        and assign the generated primary keys to them. The instances are not added to the
+        session (load them again to modify them); the caller commits.
+        Columns that are None on every instance are left out, so column defaults apply.
         """
-        route_optimizer = RouteOptimizer()
-        planned_routes = 0
-        failed_routes = 0
+        if not objects:
+            return objects
+        model = type(objects[0])
+        table = model.__table__
+        columns = [
+            (attr.key, attr.columns[0].key) for attr in sa_inspect(model).column_attrs
+            if not attr.columns[0].primary_key
+            and any(getattr(obj, attr.key) is not None for obj in objects)
+        ]
+        rows = [{column: getattr(obj, key) for key, column in columns} for obj in objects]
+        # Core insert: the ORM bulk path splits the batch wherever rows have None in other columns.
+        # SQLAlchemy can only keep RETURNING in parameter order on SQLite by inserting row by row;
+        # SQLite numbers the rows of an insert in order, so sorting the returned keys is enough.
+        sqlite = db.session.get_bind().dialect.name == 'sqlite'
+        result = db.session.execute(insert(table).returning(table.c.id, sort_by_parameter_order=not sqlite), rows)
+        primary_keys = list(result.scalars())
+        if sqlite:
+            primary_keys.sort()
+        for obj, primary_key in zip(objects, primary_keys):
+            obj.id = primary_key
+        return objects
 
-        # Optimize ALL routes (including empty ones) for ALL calendar weeks
-        weekday_routes = [r for r in routes if r.employee_id is not None]
-        for route in weekday_routes:
-            try:
-                route_status = "with appointments" if route.get_route_order() else "empty"
-                print(f"    Optimizing route for employee {route.employee_id} on {route.weekday} (KW {route.calendar_week}) - {route_status}")
-                route_optimizer.optimize_route(route.weekday, route.employee_id, calendar_week=route.calendar_week)
-                planned_routes += 1
-            except Exception as e:
-                print(f"    Failed to optimize route for employee {route.employee_id} on {route.weekday} (KW {route.calendar_week}): {str(e)}")
-                failed_routes += 1
+    @staticmethod
+    def _bulk_insert_routes(routes: List[Route]) -> List[Route]:
+        """Bulk-insert new routes, then their stops (see _bulk_insert)"""
+        ExcelImportService._bulk_insert(routes)
+        stops = []
+        for route in routes:
+            for stop in route.stops:
+                stop.route_id = route.id
+                stops.append(stop)
+        ExcelImportService._bulk_insert(stops)
+        return routes
 
-        # AW-Flächenrouten (ohne employee_id)
-        aw_tour_routes = [r for r in routes if r.employee_id is None]
-        for route in aw_tour_routes:
-            try:
-                route_status = "with appointments" if route.get_route_order() else "empty"
-                print(f"    Optimizing AW tour-area route for {route.area} on {route.weekday} (KW {route.calendar_week}) - {route_status}")
-                route_optimizer.optimize_route(route.weekday, area=route.area, calendar_week=route.calendar_week)
-                planned_routes += 1
-            except Exception as e:
-                print(f"    Failed to optimize AW tour-area route for {route.area} on {route.weekday} (KW {route.calendar_week}): {str(e)}")
-                failed_routes += 1
+    @staticmethod
+    def _copy_changed_fields(target, source, fields) -> bool:
+        """Copy differing field values from source to target, returns whether anything changed"""
+        changed = False
+        for field in fields:
+            value = getattr(source, field)
+            if getattr(target, field) != value:
+                setattr(target, field, value)
+                changed = True
+        return changed
+
+    @staticmethod
+    def _sync_patients(patients: List[Patient], diff: _ImportDiff) -> List[Patient]:
+        """
+        Match the sheet's patients against existing ones by name, street and calendar week.
+        Matches are updated in place, the rest is inserted. Returns the persistent patients.
+        """
+        synced = []
+        new_patients = []
+        for patient in patients:
+            candidates = diff.patients.get(_patient_key(patient))
+            if candidates:
+                existing = candidates.pop(0)
+                if ExcelImportService._copy_changed_fields(existing, patient, _PATIENT_SYNC_FIELDS):
+                    diff.changed_patient_ids.add(existing.id)
+                    diff.count('patients', 'updated')
+                synced.append(existing)
+            else:
+                new_patients.append(patient)
+                synced.append(patient)
 
-        print(f"Route optimization complete: {planned_routes} routes optimized successfully, {failed_routes} routes failed")
+        db.session.flush()
+        ExcelImportService._bulk_insert(new_patients)
+        diff.count('patients', 'inserted', len(new_patients))
+        print(f"    Patients: {len(new_patients)} new, {len(patients) - len(new_patients)} existing")
+        return synced
+
+    @staticmethod
+    def _sync_appointments(appointments: List[Appointment], patients: List[Patient], diff: _ImportDiff) -> List[Appointment]:
+        """
+        Match the sheet's appointments against the existing appointments of the same patient
+        and weekday (in id order). Matches are updated in place, missing ones inserted and
+        surplus ones deleted. Returns the persistent appointments.
+        """
+        existing_by_slot: Dict[Tuple, List[Appointment]] = {}
+        patient_ids = [p.id for p in patients]
+        if patient_ids:
+            existing_appointments = Appointment.query.filter(
+                Appointment.patient_id.in_(patient_ids)
+            ).order_by(Appointment.id).all()
+            for app in existing_appointments:
+                existing_by_slot.setdefault((app.patient_id, app.weekday), []).append(app)
+
+        synced = []
+        new_appointments = []
+        for app in appointments:
+            candidates = existing_by_slot.get((app.patient_id, app.weekday))
+            if candidates:
+                existing = candidates.pop(0)
+                if ExcelImportService._copy_changed_fields(existing, app, _APPOINTMENT_SYNC_FIELDS):
+                    diff.changed_appointment_ids.add(existing.id)
+                    diff.count('appointments', 'updated')
+                elif existing.patient_id in diff.changed_patient_ids:
+                    # Address or coordinates changed: routes with this stop need new travel times
+                    diff.changed_appointment_ids.add(existing.id)
+                synced.append(existing)
+            else:
+                new_appointments.append(app)
+                synced.append(app)
+
+        surplus = [app for apps in existing_by_slot.values() for app in apps]
+        if surplus:
+            RouteStop.query.filter(
+                RouteStop.appointment_id.in_([app.id for app in surplus])
+            ).delete(synchronize_session=False)
+        for app in surplus:
+            diff.changed_appointment_ids.add(app.id)
+            db.session.delete(app)
+        db.session.flush()
+        ExcelImportService._bulk_insert(new_appointments)
+        diff.count('appointments', 'inserted', len(new_appointments))
+        diff.count('appointments', 'deleted', len(surplus))
+        print(f"    Appointments: {len(new_appointments)} new, {len(surplus)} removed, {len(appointments) - len(new_appointments)} existing")
+        return synced
+
+    @staticmethod
+    def _delete_unmatched_patients(diff: _ImportDiff):
+        """Delete existing patients (and their appointments) that are no longer in the file"""
+        stale_ids = [patient.id for patients in diff.patients.values() for patient in patients]
+        if not stale_ids:
+            return
+        stale_appointment_ids = db.session.query(Appointment.id).filter(Appointment.patient_id.in_(stale_ids))
+        RouteStop.query.filter(
+            RouteStop.appointment_id.in_(stale_appointment_ids)
+        ).delete(synchronize_session=False)
+        deleted_appointments = Appointment.query.filter(
+            Appointment.patient_id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+        Patient.query.filter(Patient.id.in_(stale_ids)).delete(synchronize_session=False)
+        diff.count('appointments', 'deleted', deleted_appointments)
+        diff.count('patients', 'deleted', len(stale_ids))
+        diff.patients = {}
+        print(f"    Deleted {len(stale_ids)} patients and {deleted_appointments} appointments no longer in the file")
+
+    @staticmethod
+    def _sync_routes(routes: List[Route], employees: List[Employee], calendar_weeks: List[int], diff: _ImportDiff) -> List[Route]:
+        """
+        Match the routes built from the file against existing routes by employee (or AW area),
+        weekday and calendar week. A route keeps its stored order as long as it visits the same
+        appointments; routes with other stops or changed appointments are queued for planning.
+        Existing routes without a counterpart are emptied, or deleted if no import would create them.
+        """
+        expected = {_route_key(route): route for route in routes}
+        empty_keys = {
+            _route_key(route)
+            for route, _ in ExcelImportService._empty_route_candidates(employees, calendar_weeks)
+        }
+
+        synced = []
+        seen_keys = set()
+        deleted = 0
+        for route in Route.query.order_by(Route.id).all():
+            key = _route_key(route)
+            if route.employee_id is not None and route.area in AW_TOUR_AREAS:
+                # Step 7 assigns the AW employee again, like after a full import
+                route.employee_id = None
+
+            if key in seen_keys:
+                db.session.delete(route)
+                deleted += 1
+                continue
+            seen_keys.add(key)
+
+            new_route = expected.pop(key, None)
+            current_order = route.get_route_order()
+            if new_route is not None:
+                new_order = new_route.get_route_order()
+                route.area = new_route.area
+                if set(current_order) != set(new_order):
+                    route.set_route_order(new_order)
+                    diff.count('routes', 'updated')
+                    diff.routes_to_plan.append(route)
+                elif diff.changed_appointment_ids.intersection(current_order):
+                    diff.routes_to_plan.append(route)
+                synced.append(route)
+            elif key in empty_keys:
+                if current_order:
+                    route.set_route_order([])
+                    diff.count('routes', 'updated')
+                    diff.routes_to_plan.append(route)
+                synced.append(route)
+            else:
+                db.session.delete(route)
+                deleted += 1
+
+        new_routes = list(expected.values())
+        if new_routes:
+            db.session.add_all(new_routes)
+            diff.routes_to_plan.extend(new_routes)
+            synced.extend(new_routes)
+        diff.count('routes', 'inserted', len(new_routes))
+        diff.count('routes', 'deleted', deleted)
+        db.session.flush()
+        print(f"    Routes: {len(new_routes)} new, {deleted} removed, {len(diff.routes_to_plan) - len(new_routes)} existing to re-plan")
+        return synced
+
+    @staticmethod
+    def _plan_all_routes(routes: List[Route]) -> List[Dict[str, Any]]:
+        """
+        Optimize and plan all routes (weekday and AW tour-area routes) in one batch
+        Returns: failed routes with error message
+        """
+        route_optimizer = RouteOptimizer()
+        weekday_count = sum(1 for r in routes if r.employee_id is not None)
+        empty_count = sum(1 for r in routes if not r.get_route_order())
+        print(f"    Optimizing {weekday_count} weekday routes and {len(routes) - weekday_count} AW tour-area routes ({empty_count} empty)")
+
+        planned_routes, failed_routes = route_optimizer.optimize_routes_batch(routes)
+
+        print(f"Route optimization complete: {planned_routes} routes optimized successfully, {len(failed_routes)} routes failed")
+        return failed_routes
 
     @staticmethod
     def _update_weekend_routes_from_aw_assignments(calendar_weeks: List[int]):
@@ -1398,11 +1544,15 @@ class ExcelImportService:
             print(f"    No weekend routes updated (no matching AW assignments found)")
 
     @staticmethod
-    def import_patients(file_path) -> Dict[str, List[Any]]:
+    def import_patients(file_path, incremental: bool = False) -> Dict[str, List[Any]]:
         """
         Import patients and their appointments from Excel file (supports multiple sheets)
         Each sheet is processed separately to ensure proper calendar week handling
         
+        incremental=True keeps existing rows: patients, appointments and routes are matched
+        against the file, only differences are written and only changed routes are planned.
+        The result then contains 'changes' with inserted/updated/deleted counts per table.
+        
         Neuer Importablauf:
         1. Alle Sheets aus der Excel-Datei laden
         2. Mitarbeiter einmal laden (sind kalenderwochenunabhängig)
@@ -1412,11 +1562,21 @@ class ExcelImportService:
            - Routen für diese Termine erstellen
         4. Leere Routen für alle Mitarbeiter erstellen
         5. Alle Routen planen
+        Löschen und Einfügen (als Bulk-Inserts) werden in einer Transaktion vor der Planung
+        committet, damit während der Google-/OR-Tools-Planung keine Schreibsperre gehalten wird.
+        Die Planung schreibt ihre Ergebnisse danach in einer eigenen, kurzen Transaktion; schlägt
+        sie fehl, bleiben die importierten Daten erhalten und die Routen können neu geplant werden.
         """
         try:
-            # Step 1: Delete existing patient data (keep employees and their planning)
-            print("Step 1: Deleting existing patient data...")
-            ExcelImportService.delete_patient_data()
+            diff = None
+            if incremental:
+                # Step 1: Load existing patient data to diff against
+                print("Step 1: Loading existing patient data for incremental import...")
+                diff = _ImportDiff()
+            else:
+                # Step 1: Delete existing patient data (keep employees and their planning)
+                print("Step 1: Deleting existing patient data...")
+                ExcelImportService.delete_patient_data(commit=False)
             
             # Step 2: Load all sheets from the Excel file
             print("Step 2: Loading all sheets from Excel file...")
@@ -1449,23 +1609,43 @@ class ExcelImportService:
                 print(f"  Calendar weeks in sheet '{sheet_name}': {sorted(kw_values)}")
                 
                 # Process this sheet
-                sheet_result = ExcelImportService._process_single_sheet(df, sheet_name, employees)
+                sheet_result = ExcelImportService._process_single_sheet(df, sheet_name, employees, diff)
                 
                 all_patients.extend(sheet_result['patients'])
                 all_appointments.extend(sheet_result['appointments'])
                 all_routes.extend(sheet_result['routes'])
             
-            # Step 5: Create empty routes for all employees for all calendar weeks
-            print("\nStep 5: Creating empty routes for all employees...")
             # Get all calendar weeks from the data
             calendar_weeks = list(set([p.calendar_week for p in all_patients if p.calendar_week is not None]))
             calendar_weeks.sort()
+
+            if diff is not None:
+                print("\nStep 4b: Removing stale data and matching routes...")
+                ExcelImportService._delete_unmatched_patients(diff)
+                all_routes = ExcelImportService._sync_routes(all_routes, employees, calendar_weeks, diff)
+
+            # Step 5: Create empty routes for all employees for all calendar weeks
+            print("\nStep 5: Creating empty routes for all employees...")
             empty_routes = ExcelImportService._create_empty_routes(employees, calendar_weeks)
             all_routes.extend(empty_routes)
             
-            # Step 6: Plan all routes
+            # Commit the imported rows before planning: the write lock is released while the
+            # routes are planned, planning then commits its results separately
+            if diff is not None:
+                diff.count('routes', 'inserted', len(empty_routes))
+                db.session.flush()
+                route_ids_to_plan = [r.id for r in diff.routes_to_plan] + [r.id for r in empty_routes]
+            db.session.commit()
+            
+            # Step 6: Plan all routes (incremental: only new and changed ones)
             print("\nStep 6: Planning all routes...")
-            ExcelImportService._plan_all_routes(all_routes)
+            # Rows were bulk inserted: load the routes to plan as session objects with one query
+            if diff is not None:
+                routes_to_plan = Route.query.filter(Route.id.in_(route_ids_to_plan)).order_by(Route.id).all() \
+                    if route_ids_to_plan else []
+            else:
+                routes_to_plan = Route.query.order_by(Route.id).all()
+            failed_routes = ExcelImportService._plan_all_routes(routes_to_plan)
             
             # Step 7: Update weekend routes with employee_id from AW assignments
             print("\nStep 7: Updating weekend routes with AW assignments...")
@@ -1490,11 +1670,16 @@ class ExcelImportService:
             
             print(f"\nImport complete: {len(all_patients)} patients, {len(all_appointments)} appointments, {len(all_routes)} routes for calendar weeks: {calendar_weeks_str}")
             
-            return {
+            result = {
                 'patients': all_patients,
                 'appointments': all_appointments,
-                'routes': all_routes
+                'routes': all_routes,
+                'failed_routes': failed_routes
             }
+            if diff is not None:
+                print(f"Incremental changes: {diff.counts}")
+                result['changes'] = diff.counts
+            return result
 
         except Exception as e:
             db.session.rollback()
@@ -0,0 +1,110 @@
+"""
+Small on-disk cache for rendered artifacts (maps, PDFs).
+
+Files are written atomically, so several gunicorn workers can share one directory. Reading
+an entry refreshes its modification time; when a limit is exceeded the least recently used
+files are removed.
+
+Each process keeps a running count of files and bytes from its last directory scan plus its
+own writes and only scans again once that count passes a limit; eviction then trims down to
+EVICT_TO of the limits, so scans stay rare. Writes of other workers are picked up by the next
+scan, so the directory can exceed the limits by what they wrote in the meantime.
+"""
+import os
+import threading
+from typing import List, Optional
+
+# Eviction trims to this fraction of max_files/max_bytes
+EVICT_TO = 0.9
+
+
+class FileCache:
+    def __init__(self, directory: str, suffix: str, max_files: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        # Running size since the last scan (None = not scanned yet)
+        self._files: Optional[int] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self.path(key))
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+            self._count(len(data))
+        except OSError as e:
+            print(f"Error writing cache file {self.path(key)}: {e}")
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """Keys starting with prefix, most recently used first"""
+        return [entry.name[:-len(self.suffix)] for entry in self._entries() if entry.name.startswith(prefix)]
+
+    def mtime(self, key: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path(key))
+        except OSError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def _entries(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(self.suffix)]
+        except OSError:
+            return []
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return entries
+
+    def _over(self, files: int, total_bytes: int, fraction: float = 1.0) -> bool:
+        return (self.max_files is not None and files > self.max_files * fraction) or \
+            (self.max_bytes is not None and total_bytes > self.max_bytes * fraction)
+
+    def _count(self, size: int) -> None:
+        """Add a written file to the running size; scan and evict only once it passes a limit"""
+        if self.max_files is None and self.max_bytes is None:
+            return
+        with self._lock:
+            # Overwritten keys are counted twice; that only makes the next scan come earlier
+            if self._files is not None and not self._over(self._files + 1, self._bytes + size):
+                self._files += 1
+                self._bytes += size
+                return
+            self._evict()
+
+    def _evict(self) -> None:
+        """Scan the directory, remove the least recently used files beyond EVICT_TO of the limits"""
+        files = 0
+        total_bytes = 0
+        for entry in self._entries():
+            size = entry.stat().st_size
+            if files > 0 and self._over(files + 1, total_bytes + size, EVICT_TO):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass  # already removed by another worker
+                continue
+            files += 1
+            total_bytes += size
+        self._files = files
+        self._bytes = total_bytes
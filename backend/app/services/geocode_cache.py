@@ -0,0 +1,124 @@
+"""
+Persistent geocoding cache shared by all workers.
+
+Results are stored in the geocode_cache table, keyed by the normalized
+(street, zip_code, city) tuple, and kept in a per-process LRU in front of it.
+Addresses Google could not resolve are cached as well (negative caching) with
+a shorter TTL, so they are retried eventually but not on every import.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config import Config
+from .. import db
+from ..models.geocode_cache import GeocodeCacheEntry
+
+# (street, zip_code, city), normalized
+AddressKey = Tuple[str, str, str]
+LatLng = Tuple[Optional[float], Optional[float]]
+
+
+def normalize_address(street, zip_code, city) -> AddressKey:
+    """Cache key of an address: lower case, trimmed, whitespace collapsed."""
+    def normalize(value) -> str:
+        return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+    return normalize(street), normalize(zip_code), normalize(city)
+
+
+class GeocodeCache:
+    """Read-through cache of geocoding results (in-memory LRU -> geocode_cache table)."""
+
+    # key -> (latitude, longitude, created_at)
+    _lru: 'OrderedDict[AddressKey, Tuple[Optional[float], Optional[float], datetime]]' = OrderedDict()
+    _lock = threading.Lock()
+    # Rows per upsert statement (stays below SQLite's bound-parameter limit)
+    _write_batch_size = 500
+
+    @staticmethod
+    def _is_fresh(latitude: Optional[float], created_at: Optional[datetime], now: datetime) -> bool:
+        if created_at is None:
+            return False
+        if latitude is None:
+            return now - created_at < timedelta(hours=Config.GEOCODE_NEGATIVE_TTL_HOURS)
+        return now - created_at < timedelta(days=Config.GEOCODE_CACHE_TTL_DAYS)
+
+    @classmethod
+    def _remember(cls, key: AddressKey, latitude: Optional[float], longitude: Optional[float], created_at: datetime) -> None:
+        with cls._lock:
+            cls._lru[key] = (latitude, longitude, created_at)
+            cls._lru.move_to_end(key)
+            while len(cls._lru) > Config.GEOCODE_LRU_SIZE:
+                cls._lru.popitem(last=False)
+
+    @classmethod
+    def get_many(cls, keys: Iterable[AddressKey]) -> Dict[AddressKey, LatLng]:
+        """
+        Cached results for the given keys (missing/expired keys are left out).
+        (None, None) means the address is known to be not geocodable.
+        Must run in a thread with application context (database access).
+        """
+        now = datetime.utcnow()
+        results: Dict[AddressKey, LatLng] = {}
+        missing = set()
+        with cls._lock:
+            for key in set(keys):
+                entry = cls._lru.get(key)
+                if entry is not None and cls._is_fresh(entry[0], entry[2], now):
+                    cls._lru.move_to_end(key)
+                    results[key] = (entry[0], entry[1])
+                else:
+                    missing.add(key)
+        if not missing:
+            return results
+
+        zip_codes = {zip_code for _, zip_code, _ in missing}
+        rows = GeocodeCacheEntry.query.filter(GeocodeCacheEntry.zip_code.in_(zip_codes)).all()
+        for row in rows:
+            key = (row.street, row.zip_code, row.city)
+            if key in missing and cls._is_fresh(row.latitude, row.created_at, now):
+                cls._remember(key, row.latitude, row.longitude, row.created_at)
+                results[key] = (row.latitude, row.longitude)
+        return results
+
+    @classmethod
+    def store(cls, results: Dict[AddressKey, LatLng], provider: str = 'google') -> None:
+        """
+        Upsert geocoding results (caller commits). Concurrent imports in other
+        workers may store the same address; the newer result wins.
+        """
+        if not results:
+            return
+        now = datetime.utcnow()
+        values = []
+        for key, (latitude, longitude) in results.items():
+            cls._remember(key, latitude, longitude, now)
+            values.append({
+                'street': key[0],
+                'zip_code': key[1],
+                'city': key[2],
+                'latitude': latitude,
+                'longitude': longitude,
+                'provider': provider,
+                'created_at': now
+            })
+
+        insert = postgresql_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        for start in range(0, len(values), cls._write_batch_size):
+            statement = insert(GeocodeCacheEntry.__table__).values(values[start:start + cls._write_batch_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=['street', 'zip_code', 'city'],
+                set_={
+                    'latitude': statement.excluded.latitude,
+                    'longitude': statement.excluded.longitude,
+                    'provider': statement.excluded.provider,
+                    'created_at': statement.excluded.created_at
+                }
+            )
+            db.session.execute(statement)
@@ -0,0 +1,386 @@
+"""
+Weekly PDF export (care, doctor and weekend PDFs) with an on-disk artifact cache.
+
+Each PDF is cached under its calendar week, selected weekday, and a hash of the renderer
+(templates and rendering modules) and of all data it shows (routes with their stops,
+appointments, patients, employees and planning). A repeated download with unchanged data is
+served from disk; any change yields a new hash and the PDF is rendered again.
+refresh_cached_pdfs() syncs the Aplano planning and rebuilds recently downloaded weeks whose
+data changed, so the next download is a cache hit again and does not have to wait for Aplano.
+"""
+import hashlib
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from config import Config
+from .. import db
+from ..models.appointment import Appointment
+from ..models.employee import Employee
+from ..models.employee_planning import EmployeePlanning
+from ..models.patient import Patient
+from ..models.route import Route
+from ..models.route_stop import RouteStop
+from .aplano_sync import sync_employee_planning
+from .file_cache import FileCache
+from .pdf_generator import PDFGenerator
+
+PDF_KINDS = ('care', 'doctors', 'weekend')
+PDF_FILENAMES = {
+    'care': 'PalliRoute_Routenplanung_Pflege_KW{calendar_week}.pdf',
+    'doctors': 'PalliRoute_Routenplanung_Aerzte_KW{calendar_week}.pdf',
+    'weekend': 'PalliRoute_Routenplanung_Wochenende_KW{calendar_week}.pdf',
+}
+TEMPLATE_FILES = ('pdf_template_care.html', 'pdf_template_doctor.html', 'pdf_template_weekend.html')
+# Modules that shape the PDF content (besides the templates)
+RENDERER_MODULES = ('pdf_export.py', 'pdf_generator.py', 'pdf_sections.py', 'static_map.py')
+
+_cache = FileCache(Config.PDF_CACHE_DIR, '.pdf', max_bytes=Config.PDF_CACHE_MAX_MB * 1024 * 1024)
+# Empty marker per week; its modification time is the last Aplano planning sync (shared by all workers)
+_sync_markers = FileCache(Config.PDF_CACHE_DIR, '.synced')
+# Empty marker per downloaded week and weekday; its modification time is the last download
+_download_markers = FileCache(Config.PDF_CACHE_DIR, '.downloaded')
+
+
+def _renderer_version() -> bytes:
+    """Template or renderer changes (e.g. a deployment) invalidate all cached PDFs"""
+    digest = hashlib.sha256()
+    service_dir = os.path.dirname(__file__)
+    template_dir = os.path.join(service_dir, '..', 'templates')
+    paths = [os.path.join(template_dir, name) for name in TEMPLATE_FILES]
+    paths += [os.path.join(service_dir, name) for name in RENDERER_MODULES]
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+_RENDERER_VERSION = _renderer_version()
+
+
+def collect_week_pdf_data(calendar_week: int):
+    """
+    Collect the sections of the weekly PDFs
+
+    Returns:
+        (regular_data, doctors_data, weekend_data): lists of dicts with 'employee' (or area
+        group), 'routes' and 'appointments' as expected by PDFGenerator
+    """
+    # Get all employees with their weekday routes for this calendar week
+    weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+
+    # Get all employees, ordered by function and area (Nordkreis first, then Südkreis)
+    employees = Employee.query.filter(
+        Employee.area.in_(['Nordkreis', 'Südkreis'])
+    ).order_by(
+        db.case(
+            (Employee.function == 'Pflegekraft', 1),
+            (Employee.function == 'PDL', 2),
+            (Employee.function == 'Arzt', 3),
+            (Employee.function == 'Honorararzt', 4),
+            (Employee.function == 'Physiotherapie', 5),
+            else_=99
+        ),
+        db.case(
+            (Employee.area == 'Nordkreis', 1),
+            (Employee.area == 'Südkreis', 2),
+            else_=99
+        )
+    ).all()
+
+    # Build employee routes data structure
+    employee_routes_data = []
+
+    # Load routes and appointments of the week for all employees at once, grouped by employee
+    employee_ids = [employee.id for employee in employees]
+    routes_by_employee = {}
+    appointments_by_employee = {}
+    if employee_ids:
+        week_routes = Route.query.filter(
+            Route.employee_id.in_(employee_ids),
+            Route.weekday.in_(weekdays),
+            Route.calendar_week == calendar_week
+        ).order_by(
+            # Custom order for weekdays
+            db.case(
+                (Route.weekday == 'monday', 1),
+                (Route.weekday == 'tuesday', 2),
+                (Route.weekday == 'wednesday', 3),
+                (Route.weekday == 'thursday', 4),
+                (Route.weekday == 'friday', 5),
+                else_=6
+            )
+        ).all()
+        for route in week_routes:
+            routes_by_employee.setdefault(route.employee_id, []).append(route)
+
+        week_appointments = Appointment.query.options(joinedload(Appointment.patient)).filter(
+            Appointment.employee_id.in_(employee_ids),
+            Appointment.calendar_week == calendar_week
+        ).all()
+        for appointment in week_appointments:
+            appointments_by_employee.setdefault(appointment.employee_id, []).append(appointment)
+
+    for employee in employees:
+        routes = routes_by_employee.get(employee.id, [])
+        appointments = appointments_by_employee.get(employee.id, [])
+
+        # Only add employees who have routes OR appointments
+        if routes or appointments:
+            employee_routes_data.append({
+                'employee': employee,
+                'routes': routes,
+                'appointments': appointments
+            })
+
+    # Split employees into regular and doctors groups
+    regular_data = []
+    doctors_data = []
+    for emp_block in employee_routes_data:
+        func = (emp_block['employee'].function or '').strip()
+        if func in ['Arzt', 'Honorararzt']:
+            doctors_data.append(emp_block)
+        else:
+            regular_data.append(emp_block)
+
+    # Build weekend data (Saturday/Sunday routes only)
+    weekend_days = ['saturday', 'sunday']
+    weekend_employee_data = []
+    # Fetch all weekend routes regardless of employee (area-based)
+    weekend_routes = Route.query.filter(
+        Route.weekday.in_(weekend_days),
+        Route.calendar_week == calendar_week
+    ).order_by(
+        db.case(
+            (Route.weekday == 'saturday', 1),
+            (Route.weekday == 'sunday', 2),
+            else_=3
+        )
+    ).all()
+    # Group by area
+    area_to_routes = {}
+    for r in weekend_routes:
+        key = r.area or 'Unbekannt'
+        area_to_routes.setdefault(key, []).append(r)
+    weekend_employee_ids = {r.employee_id for r in weekend_routes if r.employee_id}
+    weekend_employees = {
+        employee.id: employee
+        for employee in Employee.query.filter(Employee.id.in_(weekend_employee_ids))
+    } if weekend_employee_ids else {}
+    for area, routes_in_area in area_to_routes.items():
+        # Get employee name if employee_id is set (from AW assignment)
+        employee_name = None
+        # Check if any route in this area has an employee_id
+        for route in routes_in_area:
+            if route.employee_id:
+                employee = weekend_employees.get(route.employee_id)
+                if employee:
+                    employee_name = f"{employee.first_name} {employee.last_name}"
+                break  # All routes in same area should have same employee_id
+
+        # Build area label with employee name if available
+        area_label = f"AW {area}"
+        if employee_name:
+            area_label = f"AW {area}: {employee_name}"
+
+        weekend_employee_data.append({
+            'group_id': f"area-{area}",
+            'area': area,
+            'area_label': area_label,
+            'routes': routes_in_area,
+            'appointments': []
+        })
+
+
+    return regular_data, doctors_data, weekend_employee_data
+
+
+def week_data_version(calendar_week: int) -> str:
+    """Hash of everything the weekly PDFs show for this calendar week"""
+    week_routes = select(Route.id).where(Route.calendar_week == calendar_week)
+    week_patients = select(Appointment.patient_id).where(Appointment.calendar_week == calendar_week)
+    queries = [
+        select(
+            Route.id, Route.employee_id, Route.weekday, Route.area, Route.total_duration,
+            Route.total_distance, Route.polyline
+        ).where(Route.calendar_week == calendar_week).order_by(Route.id),
+        select(RouteStop.route_id, RouteStop.position, RouteStop.appointment_id)
+        .where(RouteStop.route_id.in_(week_routes)).order_by(RouteStop.route_id, RouteStop.position),
+        select(
+            Appointment.id, Appointment.patient_id, Appointment.employee_id, Appointment.origin_employee_id,
+            Appointment.tour_employee_id, Appointment.weekday, Appointment.time, Appointment.visit_type,
+            Appointment.info, Appointment.area
+        ).where(Appointment.calendar_week == calendar_week).order_by(Appointment.id),
+        select(
+            Patient.id, Patient.first_name, Patient.last_name, Patient.street, Patient.zip_code, Patient.city,
+            Patient.phone1, Patient.phone2, Patient.latitude, Patient.longitude, Patient.area
+        ).where(Patient.id.in_(week_patients)).order_by(Patient.id),
+        select(
+            Employee.id, Employee.first_name, Employee.last_name, Employee.function, Employee.area,
+            Employee.street, Employee.zip_code, Employee.city, Employee.latitude, Employee.longitude
+        ).order_by(Employee.id),
+        select(
+            EmployeePlanning.employee_id, EmployeePlanning.weekday, EmployeePlanning.available,
+            EmployeePlanning.custom_text, EmployeePlanning.replacement_id
+        ).where(EmployeePlanning.calendar_week == calendar_week).order_by(EmployeePlanning.id),
+    ]
+
+    digest = hashlib.sha256(_RENDERER_VERSION)
+    for query in queries:
+        digest.update(b'|')
+        for row in db.session.execute(query):
+            digest.update(repr(tuple(row)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def sync_week_planning(calendar_week: int, max_age_minutes: Optional[float] = None) -> Optional[str]:
+    """
+    Sync the Aplano planning of a week unless that was done within max_age_minutes
+    (default Config.PDF_PLANNING_SYNC_MAX_AGE_MINUTES, 0 = always)
+
+    Returns:
+        Warning message if the sync failed, else None
+    """
+    max_age_minutes = Config.PDF_PLANNING_SYNC_MAX_AGE_MINUTES if max_age_minutes is None else max_age_minutes
+    key = f"kw{calendar_week}"
+    synced_at = _sync_markers.mtime(key)
+    if synced_at is not None and time.time() - synced_at < max_age_minutes * 60:
+        return None
+    try:
+        if not sync_employee_planning(calendar_week):
+            return f'Failed to synchronize planning data for calendar week {calendar_week}'
+    except Exception as e:
+        return f'Failed to synchronize planning data for calendar week {calendar_week}: {e}'
+    _sync_markers.put(key, b'')
+    return None
+
+
+def _cache_key(calendar_week: int, selected_weekday: str, kind: str, version: str) -> str:
+    # The weekend PDF does not depend on the selected weekday
+    weekday = 'all' if kind == 'weekend' else selected_weekday
+    return f"kw{calendar_week}_{weekday}_{kind}_{version}"
+
+
+def build_week_pdfs(
+    calendar_week: int,
+    selected_weekday: str,
+    kinds: Sequence[str] = PDF_KINDS
+) -> Tuple[List[Tuple[str, bytes]], int]:
+    """
+    Weekly PDFs as (filename, content), from the cache where the data is unchanged
+
+    Args:
+        kinds: Which of the PDFs ('care', 'doctors', 'weekend') to build
+
+    Returns:
+        (files, number of PDFs served from the cache)
+    """
+    version = week_data_version(calendar_week)
+    sections = dict(zip(PDF_KINDS, collect_week_pdf_data(calendar_week)))
+    # Without weekday routes or appointments there is nothing to export
+    if not sections['care'] and not sections['doctors']:
+        return [], 0
+
+    files = []
+    hits = 0
+    for kind in kinds:
+        if not sections[kind]:
+            continue
+        key = _cache_key(calendar_week, selected_weekday, kind, version)
+        pdf_bytes = _cache.get(key)
+        if pdf_bytes is None:
+            if kind == 'weekend':
+                buffer = PDFGenerator.generate_weekend_pdf(
+                    employee_routes_data=sections[kind],
+                    calendar_week=calendar_week
+                )
+            else:
+                buffer = PDFGenerator.generate_calendar_week_pdf(
+                    employee_routes_data=sections[kind],
+                    calendar_week=calendar_week,
+                    selected_weekday=selected_weekday
+                )
+            pdf_bytes = buffer.getvalue()
+            _cache.put(key, pdf_bytes)
+            # Older versions of the same PDF are never requested again
+            prefix = key[:-len(version)]
+            for old_key in _cache.keys(prefix):
+                if old_key != key:
+                    _cache.delete(old_key)
+        else:
+            hits += 1
+        files.append((PDF_FILENAMES[kind].format(calendar_week=calendar_week), pdf_bytes))
+    return files, hits
+
+
+def record_download(calendar_week: int, selected_weekday: str) -> None:
+    """Remember a download; refresh_cached_pdfs() keeps the PDFs of recently downloaded weeks fresh"""
+    _download_markers.put(f"kw{calendar_week}_{selected_weekday}", b'')
+
+
+def refresh_cached_pdfs(max_age_hours: Optional[float] = None, max_seconds: Optional[float] = None) -> List[dict]:
+    """
+    Rebuild the cached PDFs of weeks downloaded within max_age_hours whose data changed since.
+
+    Only real downloads (record_download) count, so a week ages out of the window even if its
+    data keeps changing. The most recently downloaded weeks come first; once max_seconds
+    (default Config.PDF_CACHE_REFRESH_MAX_SECONDS) are used up, the remaining weeks are left
+    for the next call.
+
+    Returns:
+        One dict per checked calendar week and weekday with the refresh result
+        ('deferred': True if the time budget was used up before it)
+    """
+    max_age_hours = Config.PDF_CACHE_REFRESH_WINDOW_HOURS if max_age_hours is None else max_age_hours
+    max_seconds = Config.PDF_CACHE_REFRESH_MAX_SECONDS if max_seconds is None else max_seconds
+    started = time.perf_counter()
+    cutoff = time.time() - max_age_hours * 3600
+
+    # Markers are kw{week}_{weekday}; older ones are removed
+    recent = []
+    for key in _download_markers.keys():
+        try:
+            week_part, weekday = key.split('_')
+            calendar_week = int(week_part[2:])
+        except ValueError:
+            continue
+        mtime = _download_markers.mtime(key)
+        if mtime is None or mtime < cutoff:
+            _download_markers.delete(key)
+            continue
+        recent.append((calendar_week, weekday))
+
+    results = []
+    versions = {}
+    for calendar_week, weekday in recent:
+        if time.perf_counter() - started > max_seconds:
+            results.append({'calendar_week': calendar_week, 'weekday': weekday, 'rebuilt': False, 'deferred': True})
+            continue
+        if calendar_week not in versions:
+            # Same planning data as a download would use; downloads skip the sync while it is recent
+            sync_warning = sync_week_planning(calendar_week, max_age_minutes=0)
+            if sync_warning:
+                print(f"[PDF] Warning: {sync_warning}")
+            versions[calendar_week] = week_data_version(calendar_week)
+        # Cached PDFs of this download: the weekday ones and the weekend PDF ('all')
+        cached_versions = {
+            key.rsplit('_', 1)[1]
+            for prefix in (f"kw{calendar_week}_{weekday}_", f"kw{calendar_week}_all_")
+            for key in _cache.keys(prefix)
+        }
+        # Nothing cached (evicted or nothing to export) or already up to date
+        if not cached_versions or cached_versions == {versions[calendar_week]}:
+            results.append({'calendar_week': calendar_week, 'weekday': weekday, 'rebuilt': False})
+            continue
+        week_started = time.perf_counter()
+        build_week_pdfs(calendar_week, weekday)
+        results.append({
+            'calendar_week': calendar_week,
+            'weekday': weekday,
+            'rebuilt': True,
+            'seconds': round(time.perf_counter() - week_started, 2)
+        })
+    return results
@@ -1,16 +1,18 @@
 from io import BytesIO
+from collections import Counter, defaultdict
 from datetime import datetime
+import time
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
 from jinja2 import Environment, FileSystemLoader
 import os
-import requests
-import base64
-from ..models.route import Route
+from sqlalchemy.orm import joinedload
 from ..models.appointment import Appointment
-from ..models.patient import Patient
 from ..models.employee import Employee
 from ..models.employee_planning import EmployeePlanning
+from .pdf_sections import render_sections
+from .static_map import MARKER_COLORS, ROUTE_LINE_COLORS, render_route_map
+from config import Config
 
 class PDFGenerator:
     """Service for generating route PDFs using WeasyPrint"""
@@ -30,20 +32,131 @@ class PDFGenerator:
         return translations.get(weekday.lower(), weekday.capitalize())
     
     @staticmethod
-    def _download_map_image(map_url):
-        """Download Google Maps image and convert to base64"""
-        try:
-            response = requests.get(map_url, timeout=10)
-            response.raise_for_status()
-            
-            # Convert to base64
-            image_base64 = base64.b64encode(response.content).decode('utf-8')
-            return f"data:image/png;base64,{image_base64}"
-        except Exception as e:
-            print(f"Error downloading map image: {e}")
-            return None
-    
-    
+    def _route_map_image(employee, routes, patients):
+        """
+        Local map (SVG data URI) with the employee's route lines of the week and one marker
+        per patient, colored in the order of the map legend
+        """
+        start = None
+        if employee.latitude is not None and employee.longitude is not None:
+            start = (employee.latitude, employee.longitude)
+        colors = list(MARKER_COLORS)
+        markers = [
+            (patient.latitude, patient.longitude, colors[index % len(colors)])
+            for index, patient in enumerate(patients)
+            if patient.latitude is not None and patient.longitude is not None
+        ]
+        polylines = [(route.polyline, route.weekday) for route in routes if route.polyline]
+        return render_route_map(start, markers, polylines)
+
+    @staticmethod
+    def _prefetch_week_data(calendar_week, weekdays, employees, routes):
+        """
+        Load the appointments (with patients) of the given weekdays, the employee planning and
+        all referenced employees of a calendar week in a few grouped queries.
+
+        Returns a dict of in-memory indexes:
+            appointments: list of the week's appointments on the given weekdays
+            appointments_by_id: appointment id -> Appointment (including all route stops)
+            moved_by_origin: employee id -> appointments moved away from that employee
+            planning_by_employee: employee id -> EmployeePlanning entries of the week
+            employees: employee id -> Employee (listed, current, origin, tour and replacement employees)
+        """
+        appointments = Appointment.query.options(joinedload(Appointment.patient)).filter(
+            Appointment.calendar_week == calendar_week,
+            Appointment.weekday.in_(weekdays)
+        ).all()
+        appointments_by_id = {appointment.id: appointment for appointment in appointments}
+
+        # Route stops belong to the same week; anything else is loaded in one extra query
+        missing_ids = {stop.appointment_id for route in routes for stop in route.stops} - appointments_by_id.keys()
+        if missing_ids:
+            for appointment in Appointment.query.options(joinedload(Appointment.patient)).filter(
+                Appointment.id.in_(missing_ids)
+            ):
+                appointments_by_id[appointment.id] = appointment
+
+        moved_by_origin = defaultdict(list)
+        for appointment in appointments:
+            if (appointment.origin_employee_id and appointment.employee_id
+                    and appointment.employee_id != appointment.origin_employee_id):
+                moved_by_origin[appointment.origin_employee_id].append(appointment)
+
+        planning_by_employee = defaultdict(list)
+        employee_ids = [employee.id for employee in employees]
+        if employee_ids:
+            for planning in EmployeePlanning.query.filter(
+                EmployeePlanning.calendar_week == calendar_week,
+                EmployeePlanning.employee_id.in_(employee_ids)
+            ):
+                planning_by_employee[planning.employee_id].append(planning)
+
+        employees_by_id = {employee.id: employee for employee in employees}
+        referenced_ids = {planning.replacement_id for entries in planning_by_employee.values() for planning in entries}
+        for appointment in appointments_by_id.values():
+            referenced_ids.update((appointment.employee_id, appointment.origin_employee_id, appointment.tour_employee_id))
+        referenced_ids -= employees_by_id.keys()
+        referenced_ids.discard(None)
+        if referenced_ids:
+            for employee in Employee.query.filter(Employee.id.in_(referenced_ids)):
+                employees_by_id[employee.id] = employee
+
+        return {
+            'appointments': appointments,
+            'appointments_by_id': appointments_by_id,
+            'moved_by_origin': moved_by_origin,
+            'planning_by_employee': planning_by_employee,
+            'employees': employees_by_id,
+        }
+
+    @staticmethod
+    def _count_visit_types(appointments, group_key):
+        """Count HB/TK/NA appointments per (group, weekday, visit type); group_key maps an appointment to its group"""
+        counts = Counter()
+        for appointment in appointments:
+            visit_type = (appointment.visit_type or '').upper()
+            if visit_type in ('HB', 'TK', 'NA'):
+                counts[(group_key(appointment), appointment.weekday, visit_type)] += 1
+        return counts
+
+    @staticmethod
+    def _visit_counts_for(counts, group, weekdays):
+        """Per-weekday HB/TK/NA counts of one group, in the shape the templates expect"""
+        return { day: { vt: counts[(group, day, vt)] for vt in ('HB', 'TK', 'NA') } for day in weekdays }
+
+    @staticmethod
+    def _write_pdf(template, template_data, section_names, label, parallel=True):
+        """
+        Render the template to a PDF.
+
+        With PDF_RENDER_WORKERS > 1 every entry of employee_routes_data is rendered as its own
+        section in a process pool and the sections are merged; the header (and overview) goes
+        into the first section, the footer into the last one. The template must start each
+        section on a new page.
+        """
+        sections = template_data['employee_routes_data']
+        started = time.perf_counter()
+        if parallel and Config.PDF_RENDER_WORKERS > 1 and len(sections) > 1:
+            section_html = []
+            for index, (emp_data, name) in enumerate(zip(sections, section_names)):
+                section_html.append((name, template.render(**{
+                    **template_data,
+                    'employee_routes_data': [emp_data],
+                    'include_header': index == 0,
+                    'include_footer': index == len(sections) - 1,
+                })))
+            buffer, timings = render_sections(section_html, Config.PDF_RENDER_WORKERS)
+            for name, seconds, pages in timings:
+                print(f"[PDF] {label} - {name}: {seconds:.2f}s ({pages} pages)")
+        else:
+            html_content = template.render(**template_data)
+            buffer = BytesIO()
+            # Configure font settings for better rendering
+            font_config = FontConfiguration()
+            HTML(string=html_content).write_pdf(buffer, font_config=font_config)
+        print(f"[PDF] {label}: {len(sections)} sections in {time.perf_counter() - started:.2f}s")
+        return buffer
+
     @staticmethod
     def generate_calendar_week_pdf(employee_routes_data, calendar_week, selected_weekday='monday'):
         """
@@ -137,8 +250,9 @@ class PDFGenerator:
             'employees': {},
             'employee_planning': {},
             'translate_weekday': PDFGenerator._translate_weekday,
-            'google_maps_api_key': os.getenv('GOOGLE_MAPS_API_KEY', ''),
-            'download_map_image': PDFGenerator._download_map_image,
+            'route_map_image': PDFGenerator._route_map_image,
+            'map_marker_colors': list(MARKER_COLORS),
+            'route_line_colors': ROUTE_LINE_COLORS,
             'selected_weekday': selected_weekday_norm,
             'weekday_order': weekday_order,
             'weekday_labels': [PDFGenerator._translate_weekday(w) for w in weekday_order],
@@ -147,30 +261,31 @@ class PDFGenerator:
             'period_label_weekdays': period_label_weekdays,
             'overview_data': [],
             'overview_planning': {},
+            'include_header': True,
+            'include_footer': True,
         }
         
+        # Load everything the sections need in a few grouped queries
+        week_data = PDFGenerator._prefetch_week_data(
+            calendar_week,
+            weekdays,
+            [emp_data['employee'] for emp_data in employee_routes_list],
+            [route for emp_data in employee_routes_list for route in emp_data['routes']]
+        )
+        visit_counts = PDFGenerator._count_visit_types(
+            week_data['appointments'], lambda appointment: appointment.employee_id
+        )
+        template_data['employees'] = week_data['employees']
+
         # Prepare overview data (summary table)
         for emp_data in employee_routes_list:
             employee = emp_data['employee']
-            overview_counts = { day: {'HB': 0, 'TK': 0, 'NA': 0} for day in weekdays }
+            overview_counts = PDFGenerator._visit_counts_for(visit_counts, employee.id, weekdays)
             # Collect planning for overview (per weekday for this employee/week)
             planning_map = { day: None for day in weekdays }
-            planning_entries_overview = EmployeePlanning.query.filter_by(
-                employee_id=employee.id,
-                calendar_week=calendar_week
-            ).all()
-            for planning in planning_entries_overview:
+            for planning in week_data['planning_by_employee'].get(employee.id, []):
                 if planning.weekday in weekdays:
                     planning_map[planning.weekday] = planning
-            for weekday in weekdays:
-                for vt in ('HB', 'TK', 'NA'):
-                    cnt = Appointment.query.filter(
-                        Appointment.employee_id == employee.id,
-                        Appointment.weekday == weekday,
-                        Appointment.calendar_week == calendar_week,
-                        Appointment.visit_type == vt
-                    ).count()
-                    overview_counts[weekday][vt] = cnt
             template_data['overview_data'].append({
                 'id': employee.id,
                 'name': f"{employee.first_name} {employee.last_name}",
@@ -190,46 +305,49 @@ class PDFGenerator:
         
         template_data['overview_data'].sort(key=sort_overview)
         
-        # Collect all appointments, patients, employees, and planning data for template
+        # Collect all appointments, patients and planning data for template
         consolidated_by_employee = {}
         for emp_data in employee_routes_list:
             employee = emp_data['employee']
-            template_data['employees'][employee.id] = employee
-            
-            # Collect employee planning data for this employee and calendar week
-            planning_entries = EmployeePlanning.query.filter_by(
-                employee_id=employee.id,
-                calendar_week=calendar_week
-            ).all()
-            
-            for planning in planning_entries:
+
+            for planning in week_data['planning_by_employee'].get(employee.id, []):
                 planning_key = f"{employee.id}_{planning.weekday}"
                 template_data['employee_planning'][planning_key] = planning
-                
-                # Also collect replacement employee if exists
-                if planning.replacement_id:
-                    replacement_employee = Employee.query.get(planning.replacement_id)
-                    if replacement_employee:
-                        template_data['employees'][replacement_employee.id] = replacement_employee
-            
+
             # Prepare consolidation structures per employee
             patient_rows = {}
             selected_day_order_ids = []
-            weekday_counts = { day: {'HB': 0, 'TK': 0, 'NA': 0} for day in weekdays }
-            
+
             # Count all appointments for this employee by weekday and visit_type
             # This ensures accurate counts regardless of whether appointments are in routes
-            for weekday in weekdays:
-                appointments_for_day = Appointment.query.filter(
-                    Appointment.employee_id == employee.id,
-                    Appointment.weekday == weekday,
-                    Appointment.calendar_week == calendar_week
-                ).all()
-                
-                for appointment in appointments_for_day:
-                    vt = (appointment.visit_type or '').upper()
-                    if vt in ('HB', 'TK', 'NA'):
-                        weekday_counts[weekday][vt] += 1
+            weekday_counts = PDFGenerator._visit_counts_for(visit_counts, employee.id, weekdays)
+
+            def ensure_row(patient):
+                row = patient_rows.get(patient.id)
+                if not row:
+                    row = {
+                        'patient': patient,
+                        'cells': { day: {'visit_type': '', 'info': '', 'origin_employee_id': None, 'tour_employee_id': None, 'moved': False} for day in weekdays }
+                    }
+                    patient_rows[patient.id] = row
+                return row
+
+            def fill_own_cell(appointment):
+                template_data['appointments'][appointment.id] = appointment
+                patient = appointment.patient
+                if not patient:
+                    return
+                template_data['patients'][appointment.patient_id] = patient
+                row = ensure_row(patient)
+                # Fill cell for this weekday (only for this employee)
+                if appointment.weekday in weekdays and appointment.employee_id == employee.id:
+                    row['cells'][appointment.weekday] = {
+                        'visit_type': appointment.visit_type or '',
+                        'info': appointment.info or '',
+                        'origin_employee_id': appointment.origin_employee_id if appointment.origin_employee_id and appointment.origin_employee_id != appointment.employee_id else None,
+                        'tour_employee_id': appointment.tour_employee_id if appointment.tour_employee_id else None,
+                        'moved': False
+                    }
 
             # Collect appointments from routes
             for route in emp_data['routes']:
@@ -237,120 +355,31 @@ class PDFGenerator:
                 if route.weekday == selected_weekday_norm:
                     selected_day_order_ids = appointment_ids[:]
                 for appointment_id in appointment_ids:
-                    appointment = Appointment.query.get(appointment_id)
+                    appointment = week_data['appointments_by_id'].get(appointment_id)
                     if appointment:
-                        template_data['appointments'][appointment_id] = appointment
-                        
-                        patient = Patient.query.get(appointment.patient_id)
-                        if patient:
-                            template_data['patients'][appointment.patient_id] = patient
-                            # Ensure row exists
-                            row = patient_rows.get(patient.id)
-                            if not row:
-                                row = {
-                                    'patient': patient,
-                                    'cells': { day: {'visit_type': '', 'info': '', 'origin_employee_id': None, 'tour_employee_id': None, 'moved': False} for day in weekdays }
-                                }
-                                patient_rows[patient.id] = row
-                            # Fill cell for this weekday (only for this employee)
-                            if appointment.weekday in weekdays and appointment.employee_id == employee.id:
-                                row['cells'][appointment.weekday] = {
-                                    'visit_type': appointment.visit_type or '',
-                                    'info': appointment.info or '',
-                                    'origin_employee_id': appointment.origin_employee_id if appointment.origin_employee_id and appointment.origin_employee_id != appointment.employee_id else None,
-                                    'tour_employee_id': appointment.tour_employee_id if appointment.tour_employee_id else None,
-                                    'moved': False
-                                }
-                            
-                            # Also collect origin employee if it's a replacement
-                            if appointment.origin_employee_id:
-                                origin_employee = Employee.query.get(appointment.origin_employee_id)
-                                if origin_employee:
-                                    template_data['employees'][origin_employee.id] = origin_employee
-                            if appointment.tour_employee_id:
-                                tour_employee = Employee.query.get(appointment.tour_employee_id)
-                                if tour_employee:
-                                    template_data['employees'][tour_employee.id] = tour_employee
-            
+                        fill_own_cell(appointment)
+
             # Collect direct appointments (not in routes) - like TK appointments
-            if 'appointments' in emp_data:
-                for appointment in emp_data['appointments']:
-                    template_data['appointments'][appointment.id] = appointment
-                    
-                    patient = Patient.query.get(appointment.patient_id)
-                    if patient:
-                        template_data['patients'][appointment.patient_id] = patient
-                        # Ensure row exists
-                        row = patient_rows.get(patient.id)
-                        if not row:
-                            row = {
-                                'patient': patient,
-                                'cells': { day: {'visit_type': '', 'info': '', 'origin_employee_id': None, 'tour_employee_id': None, 'moved': False} for day in weekdays }
-                            }
-                            patient_rows[patient.id] = row
-                        # Fill cell
-                        if appointment.weekday in weekdays and appointment.employee_id == employee.id:
-                            row['cells'][appointment.weekday] = {
-                                'visit_type': appointment.visit_type or '',
-                                'info': appointment.info or '',
-                                'origin_employee_id': appointment.origin_employee_id if appointment.origin_employee_id and appointment.origin_employee_id != appointment.employee_id else None,
-                                'tour_employee_id': appointment.tour_employee_id if appointment.tour_employee_id else None,
-                                'moved': False
-                            }
-                        
-                        # Also collect origin employee if it's a replacement
-                        if appointment.origin_employee_id:
-                            origin_employee = Employee.query.get(appointment.origin_employee_id)
-                            if origin_employee:
-                                template_data['employees'][origin_employee.id] = origin_employee
-                        if appointment.tour_employee_id:
-                            tour_employee = Employee.query.get(appointment.tour_employee_id)
-                            if tour_employee:
-                                template_data['employees'][tour_employee.id] = tour_employee
-            
+            for appointment in emp_data.get('appointments', []):
+                fill_own_cell(appointment)
+
             # Collect appointments that were moved away from this employee (origin_employee_id == employee.id)
             # These are appointments that were originally assigned to this employee but are now assigned to someone else
-            for weekday in weekdays:
-                moved_appointments = Appointment.query.filter(
-                    Appointment.origin_employee_id == employee.id,
-                    Appointment.weekday == weekday,
-                    Appointment.calendar_week == calendar_week,
-                    Appointment.employee_id != employee.id  # Only show if moved to different employee
-                ).all()
-                
-                for appointment in moved_appointments:
-                    template_data['appointments'][appointment.id] = appointment
-                    
-                    patient = Patient.query.get(appointment.patient_id)
-                    if patient:
-                        template_data['patients'][appointment.patient_id] = patient
-                        # Ensure row exists
-                        row = patient_rows.get(patient.id)
-                        if not row:
-                            row = {
-                                'patient': patient,
-                                'cells': { day: {'visit_type': '', 'info': '', 'origin_employee_id': None, 'tour_employee_id': None, 'moved': False} for day in weekdays }
-                            }
-                            patient_rows[patient.id] = row
-                        # Fill cell with moved appointment info
-                        if appointment.weekday in weekdays:
-                            row['cells'][appointment.weekday] = {
-                                'visit_type': appointment.visit_type or '',
-                                'info': appointment.info or '',
-                                'origin_employee_id': appointment.employee_id,  # Show current employee (the replacement)
-                                'tour_employee_id': appointment.tour_employee_id if appointment.tour_employee_id else None,
-                                'moved': True  # Mark as moved
-                            }
-                        
-                        # Collect current employee (replacement)
-                        if appointment.employee_id:
-                            current_employee = Employee.query.get(appointment.employee_id)
-                            if current_employee:
-                                template_data['employees'][current_employee.id] = current_employee
-                        if appointment.tour_employee_id:
-                            tour_employee = Employee.query.get(appointment.tour_employee_id)
-                            if tour_employee:
-                                template_data['employees'][tour_employee.id] = tour_employee
+            for appointment in week_data['moved_by_origin'].get(employee.id, []):
+                template_data['appointments'][appointment.id] = appointment
+                patient = appointment.patient
+                if not patient:
+                    continue
+                template_data['patients'][appointment.patient_id] = patient
+                row = ensure_row(patient)
+                # Fill cell with moved appointment info
+                row['cells'][appointment.weekday] = {
+                    'visit_type': appointment.visit_type or '',
+                    'info': appointment.info or '',
+                    'origin_employee_id': appointment.employee_id,  # Show current employee (the replacement)
+                    'tour_employee_id': appointment.tour_employee_id if appointment.tour_employee_id else None,
+                    'moved': True  # Mark as moved
+                }
 
             # Build patient order based on selected day route; others appended
             selected_positions = {}
@@ -387,20 +416,15 @@ class PDFGenerator:
         env = Environment(loader=FileSystemLoader(template_dir))
         template = env.get_template(template_name)
         
-        # Render HTML
-        html_content = template.render(**template_data)
-        
-        # Generate PDF with WeasyPrint
-        buffer = BytesIO()
-        
-        # Configure font settings for better rendering
-        font_config = FontConfiguration()
-        
-        # Generate PDF
-        html_doc = HTML(string=html_content)
-        html_doc.write_pdf(buffer, font_config=font_config)
-        
-        return buffer
+        # Doctor sections share pages, so that PDF is always rendered as one document
+        section_names = [
+            f"{emp_data['employee'].first_name} {emp_data['employee'].last_name}"
+            for emp_data in employee_routes_list
+        ]
+        return PDFGenerator._write_pdf(
+            template, template_data, section_names, f"{title_text} KW {calendar_week}",
+            parallel=not is_doctor_pdf
+        )
 
     @staticmethod
     def generate_weekend_pdf(employee_routes_data, calendar_week):
@@ -439,8 +463,22 @@ class PDFGenerator:
             'period_label_weekend': period_label_weekend,
             'weekend_counts_by_group': {},
             'overview_data': [],
+            'include_header': True,
+            'include_footer': True,
         }
         
+        # Load the weekend appointments of all groups at once and count them by patient area
+        week_data = PDFGenerator._prefetch_week_data(
+            calendar_week,
+            weekdays,
+            [],
+            [route for emp_data in employee_routes_data for route in emp_data['routes']]
+        )
+        area_counts = PDFGenerator._count_visit_types(
+            week_data['appointments'],
+            lambda appointment: appointment.patient.area if appointment.patient else None
+        )
+
         # Prepare overview data for weekend (by area) with HB/TK/NA per day (Sat-Sun)
         weekdays_overview = ['saturday', 'sunday']
         area_overview = {}
@@ -451,15 +489,7 @@ class PDFGenerator:
                 area_overview[area_label] = { day: {'HB': 0, 'TK': 0, 'NA': 0} for day in weekdays_overview }
             for weekday in weekdays_overview:
                 for vt in ('HB', 'TK', 'NA'):
-                    cnt = Appointment.query.join(
-                        Patient, Appointment.patient_id == Patient.id
-                    ).filter(
-                        Patient.area == area_key,
-                        Appointment.weekday == weekday,
-                        Appointment.calendar_week == calendar_week,
-                        Appointment.visit_type == vt
-                    ).count()
-                    area_overview[area_label][weekday][vt] += cnt
+                    area_overview[area_label][weekday][vt] += area_counts[(area_key, weekday, vt)]
         for area_label, counts in area_overview.items():
             template_data['overview_data'].append({
                 'name': area_label,
@@ -485,11 +515,11 @@ class PDFGenerator:
                 if route.weekday == 'saturday':
                     saturday_order_ids = appointment_ids[:]
                 for appointment_id in appointment_ids:
-                    appointment = Appointment.query.get(appointment_id)
+                    appointment = week_data['appointments_by_id'].get(appointment_id)
                     if not appointment:
                         continue
                     template_data['appointments'][appointment_id] = appointment
-                    patient = Patient.query.get(appointment.patient_id)
+                    patient = appointment.patient
                     if not patient:
                         continue
                     template_data['patients'][patient.id] = patient
@@ -552,8 +582,7 @@ class PDFGenerator:
         env = Environment(loader=FileSystemLoader(template_dir))
         template = env.get_template('pdf_template_weekend.html')
 
-        html_content = template.render(**template_data)
-        buffer = BytesIO()
-        font_config = FontConfiguration()
-        HTML(string=html_content).write_pdf(buffer, font_config=font_config)
-        return buffer
\ No newline at end of file
+        section_names = [emp_data.get('area_label', 'Unbekannt') for emp_data in employee_routes_data]
+        return PDFGenerator._write_pdf(
+            template, template_data, section_names, f"Wochenendtouren KW {calendar_week}"
+        )
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Parallel PDF rendering: every section (employee or area) is a standalone HTML document
+rendered by WeasyPrint in its own process; the section PDFs are merged with pypdf.
+
+Sections must start on a new page (as the care and weekend templates do), so the merged
+PDF paginates like a single document. Links to anchors of another section cannot be
+resolved by WeasyPrint inside one section, they are added again after merging.
+
+The process pool is created on first use and shared by all requests of a (gunicorn) worker,
+so the number of render processes is bounded by workers × PDF_RENDER_WORKERS.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.annotations import Link
+from pypdf.generic import Fit
+
+# WeasyPrint works in CSS pixels (96 per inch), PDF in points (72 per inch)
+PX_TO_PT = 0.75
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Shared process pool with the given size (re-created if the size changed)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: the request process may hold threads and database connections
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken pool (e.g. a render process was killed); the next call creates a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _render_section(html_content):
+    """Render one section; returns the PDF, its anchors and internal links and the render time"""
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    started = time.perf_counter()
+    font_config = FontConfiguration()
+    document = HTML(string=html_content).render(font_config=font_config)
+    buffer = BytesIO()
+    document.write_pdf(buffer)
+
+    # Anchor positions and internal links in CSS pixels from the top-left of their page
+    anchors = {}
+    links = []
+    for page_index, page in enumerate(document.pages):
+        for name, (x, y) in page.anchors.items():
+            anchors.setdefault(name, (page_index, x, y))
+        for link_type, target, rectangle, _box in page.links:
+            if link_type == 'internal':
+                links.append((page_index, target, tuple(rectangle)))
+    page_heights = [page.height for page in document.pages]
+
+    return buffer.getvalue(), anchors, links, page_heights, time.perf_counter() - started
+
+
+def render_sections(sections, workers):
+    """
+    Render the sections in the shared process pool and merge them in the given order.
+
+    Args:
+        sections: List of (name, html_content) tuples
+        workers: Size of the process pool
+
+    Returns:
+        (BytesIO with the merged PDF, list of (name, seconds, pages) per section)
+    """
+    html_contents = [html_content for _, html_content in sections]
+    pool = _get_pool(max(1, workers))
+    try:
+        results = list(pool.map(_render_section, html_contents))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        results = list(_get_pool(max(1, workers)).map(_render_section, html_contents))
+
+    writer = PdfWriter()
+    page_offsets = []
+    all_anchors = {}
+    timings = []
+    for (name, _), (pdf_bytes, anchors, _, page_heights, seconds) in zip(sections, results):
+        offset = len(writer.pages)
+        page_offsets.append(offset)
+        writer.append(PdfReader(BytesIO(pdf_bytes)))
+        for anchor, (page_index, x, y) in anchors.items():
+            all_anchors.setdefault(anchor, (offset + page_index, x, y, page_heights[page_index]))
+        timings.append((name, seconds, len(page_heights)))
+
+    # Re-create links whose target lies in another section
+    for offset, (_, anchors, links, page_heights, _) in zip(page_offsets, results):
+        for page_index, target, (x, y, width, height) in links:
+            if target in anchors or target not in all_anchors:
+                continue
+            target_page, target_x, target_y, target_page_height = all_anchors[target]
+            page_height = page_heights[page_index]
+            writer.add_annotation(
+                page_number=offset + page_index,
+                annotation=Link(
+                    rect=(
+                        x * PX_TO_PT,
+                        (page_height - y - height) * PX_TO_PT,
+                        (x + width) * PX_TO_PT,
+                        (page_height - y) * PX_TO_PT
+                    ),
+                    border=[0, 0, 0],
+                    target_page_index=target_page,
+                    fit=Fit.xyz(left=target_x * PX_TO_PT, top=(target_page_height - target_y) * PX_TO_PT)
+                )
+            )
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return buffer, timings
@@ -0,0 +1,187 @@
+"""
+Asynchronous auto-planning jobs.
+
+A job is a row in planning_jobs; the planning itself runs in a separate (spawned) process, so
+no gunicorn worker is blocked for the Aplano fetch, model build and solver time. Inside that
+process a monitor thread writes the solver progress to the job row every
+PLANNING_JOB_PROGRESS_INTERVAL_SECONDS (also the heartbeat) and forwards cancel requests to
+the running solver. Status and progress can therefore be read from any gunicorn worker.
+"""
+import json
+import logging
+import multiprocessing
+import threading
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from config import Config
+from app import db
+from app.models.scheduling import PlanningJob
+from .auto_planning import SolverProgress
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = 'QUEUED'
+STATUS_RUNNING = 'RUNNING'
+STATUS_COMPLETED = 'COMPLETED'
+STATUS_FAILED = 'FAILED'
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+
+class PlanningJobConflict(Exception):
+    """A queued or running job already plans an overlapping date range"""
+
+    def __init__(self, job: PlanningJob):
+        super().__init__(f'Planning job {job.id} is already running for an overlapping date range')
+        self.job = job
+
+
+def _active_overlapping_job(start_date: date, end_date: date) -> Optional[PlanningJob]:
+    for job in PlanningJob.query.filter(PlanningJob.status.notin_(FINISHED_STATUSES)).all():
+        # Marks jobs without heartbeat as failed
+        job = get_planning_job(job.id)
+        if job.status in FINISHED_STATUSES:
+            continue
+        params = json.loads(job.params)
+        if date.fromisoformat(params['start_date']) <= end_date and start_date <= date.fromisoformat(params['end_date']):
+            return job
+    return None
+
+
+def submit_planning_job(start_date: date, end_date: date, service_options: Dict[str, Any]) -> PlanningJob:
+    """
+    Create a job and start it in a background process.
+
+    Args:
+        service_options: JSON-serializable keyword arguments of AutoPlanningService
+
+    Raises:
+        PlanningJobConflict: A queued or running job covers an overlapping date range (both
+            would delete and rewrite the same assignments)
+    """
+    existing = _active_overlapping_job(start_date, end_date)
+    if existing is not None:
+        raise PlanningJobConflict(existing)
+    job = PlanningJob(
+        id=uuid.uuid4().hex,
+        status=STATUS_QUEUED,
+        params=json.dumps({
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'service': service_options,
+        }),
+        cancel_requested=False,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    # Reap finished job processes of this worker
+    multiprocessing.active_children()
+    # spawn: the request process may hold threads and database connections
+    process = multiprocessing.get_context('spawn').Process(target=run_planning_job, args=(job.id,), daemon=False)
+    process.start()
+    logger.info('Planning job %s started in process %s', job.id, process.pid)
+    return job
+
+
+def get_planning_job(job_id: str) -> Optional[PlanningJob]:
+    """Current state of a job; a running job without heartbeat is marked as failed"""
+    db.session.expire_all()
+    job = db.session.get(PlanningJob, job_id)
+    if job is None or job.status in FINISHED_STATUSES:
+        return job
+    stale_after = timedelta(seconds=Config.PLANNING_JOB_STALE_SECONDS)
+    last_seen = job.updated_at or job.created_at
+    if last_seen and datetime.utcnow() - last_seen > stale_after:
+        job.status = STATUS_FAILED
+        job.error = 'Planungsprozess antwortet nicht mehr (abgebrochen oder Server neu gestartet)'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+def cancel_planning_job(job_id: str) -> Optional[PlanningJob]:
+    """Request cancellation; the job ends with the best solution found so far"""
+    job = get_planning_job(job_id)
+    if job is not None and job.status not in FINISHED_STATUSES:
+        job.cancel_requested = True
+        db.session.commit()
+    return job
+
+
+def _monitor_job(app, job_id: str, progress: SolverProgress, done: threading.Event) -> None:
+    """Write progress (heartbeat) to the job row and forward cancel requests to the solver"""
+    interval = Config.PLANNING_JOB_PROGRESS_INTERVAL_SECONDS
+    with app.app_context():
+        try:
+            while not done.wait(interval):
+                # A failed update (e.g. database locked during the planning's write phase) is
+                # retried in the next interval; heartbeat and cancel forwarding must go on
+                try:
+                    job = db.session.get(PlanningJob, job_id, populate_existing=True)
+                    if job is None:
+                        progress.cancel()
+                        return
+                    if job.cancel_requested and not progress.cancelled.is_set():
+                        logger.info('Planning job %s: cancel requested', job_id)
+                        progress.cancel()
+                    job.progress = json.dumps(progress.snapshot())
+                    job.updated_at = datetime.utcnow()
+                    db.session.commit()
+                except Exception:
+                    logger.exception('Planning job %s: progress update failed', job_id)
+                    db.session.rollback()
+        finally:
+            db.session.remove()
+
+
+def run_planning_job(job_id: str) -> None:
+    """Entry point of the job process"""
+    from app import create_app
+    from .auto_planning_service import AutoPlanningService
+
+    # Fresh interpreter (spawn): logging is not configured by run.py here
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+    with app.app_context():
+        job = db.session.get(PlanningJob, job_id)
+        if job is None:
+            return
+        params = json.loads(job.params)
+        job.status = STATUS_RUNNING
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        progress = SolverProgress()
+        if job.cancel_requested:
+            progress.cancel()
+        done = threading.Event()
+        monitor = threading.Thread(target=_monitor_job, args=(app, job_id, progress, done), daemon=True)
+        monitor.start()
+        try:
+            service = AutoPlanningService(**params['service'])
+            result = service.plan(
+                date.fromisoformat(params['start_date']),
+                date.fromisoformat(params['end_date']),
+                progress=progress,
+            )
+            result['cancelled'] = progress.cancelled.is_set()
+            status, error = STATUS_COMPLETED, None
+        except Exception as e:
+            logger.exception('Planning job %s failed', job_id)
+            db.session.rollback()
+            result, status, error = None, STATUS_FAILED, str(e)
+        finally:
+            done.set()
+            monitor.join()
+
+        progress.phase = 'done'
+        job = db.session.get(PlanningJob, job_id, populate_existing=True)
+        job.status = status
+        job.error = error
+        job.result = json.dumps(result, default=str) if result is not None else None
+        job.progress = json.dumps(progress.snapshot())
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.info('Planning job %s finished: %s', job_id, status)
@@ -1,27 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.orm import joinedload
+from config import Config
 from ..models.employee import Employee
+from ..models.employee_planning import EmployeePlanning
 from ..models.patient import Patient
-from ..models.appointment import Appointment
+from ..models.appointment import Appointment, VISIT_TYPE_DURATIONS
 from ..models.route import Route
 from .. import db
 from .route_utils import (
     get_departure_time,
-    calculate_route_duration,
     calculate_visit_duration,
+    calculate_schedule,
+    calculate_route_fingerprint,
+    get_route_appointments,
+    get_time_window,
     get_gmaps_client,
     get_tour_area_start_location
 )
+from .travel_matrix import Leg, TravelMatrix, summarize_legs, merge_leg_polylines
+from .routing_engine import solve_route_order, solve_vehicle_routes
+from .auto_planning.roles import employee_role, ROLE_NURSING
+from .holiday_service import is_aw_area_assignment_day
+
+# AW-Flächentouren (Sa/So oder Feiertag) starten zentral in der Fläche
+AW_TOUR_AREAS = ('Nord', 'Mitte', 'Süd')
+
+
+def is_area_route(route: Route) -> bool:
+    """Area-based tour (start/end at the area's central location) instead of an employee's home"""
+    if route.employee_id is None:
+        return True
+    return route.area in AW_TOUR_AREAS and is_aw_area_assignment_day(route.calendar_week, route.weekday)
+
+
+@dataclass
+class _RouteJob:
+    """Everything needed to optimize one route without touching the database."""
+    route: Route
+    appointments: List[Appointment]
+    start_location: Dict[str, float]
+    departure_time: datetime
+    waypoints: List[Tuple[float, float]] = field(default_factory=list)
+    service_times: List[int] = field(default_factory=list)  # in seconds
+    time_windows: List[Optional[Tuple[int, int]]] = field(default_factory=list)
+    fingerprint: Optional[str] = None  # Inputs of the optimization (stops in canonical order)
+
+    def __post_init__(self):
+        # Canonical stop order, so re-optimizing an unchanged route yields the same tour
+        self.appointments = sorted(self.appointments, key=lambda a: a.id)
+        self.waypoints = [(a.patient.latitude, a.patient.longitude) for a in self.appointments]
+        self.service_times = [VISIT_TYPE_DURATIONS.get(a.visit_type, 0) * 60 for a in self.appointments]
+        self.time_windows = [get_time_window(a, self.departure_time) for a in self.appointments]
+        self.fingerprint = calculate_route_fingerprint(self.start_location, self.appointments, self.departure_time)
+
 
 class RouteOptimizer:
     def __init__(self):
         self.gmaps = get_gmaps_client()
 
-    def _create_route_order(self, route_result: Dict[str, Any], appointments: List[Appointment]) -> str:
-        """Create JSON array of appointment IDs in optimized order"""
-        waypoint_order = route_result.get('waypoint_order', [])
-        ordered_appointments = [appointments[i].id for i in waypoint_order]
-        return str(ordered_appointments)
+    def _create_route_order(self, waypoint_order: List[int], appointments: List[Appointment]) -> List[int]:
+        """Appointment IDs in optimized order"""
+        return [appointments[i].id for i in waypoint_order]
+
+    def _apply_empty(self, route: Route) -> None:
+        """Reset a route without stops (no API call needed)"""
+        route.polyline = None
+        route.total_distance = 0
+        route.total_duration = 0
+        route.schedule = None
+        route.total_lateness = 0
+        route.fingerprint = None
+        route.optimized_fingerprint = None
+        route.needs_optimization = False
+        route.updated_at = datetime.utcnow()
+
+    def _is_unchanged(self, job: '_RouteJob') -> bool:
+        """Same stops as at the last optimization and the optimized order still in place"""
+        route = job.route
+        if not route.optimized_fingerprint or route.optimized_fingerprint != job.fingerprint:
+            return False
+        appointments_by_id = {a.id: a for a in job.appointments}
+        ordered_appointments = [appointments_by_id[i] for i in route.get_route_order() if i in appointments_by_id]
+        return route.fingerprint == calculate_route_fingerprint(job.start_location, ordered_appointments, job.departure_time)
+
+    def _solve(self, job: '_RouteJob', travel_matrix: TravelMatrix) -> Tuple[List[int], List[Leg]]:
+        """
+        Order the stops of a prepared route and fetch the legs of that order.
+        Touches no database state, so it can run in a worker thread once the
+        travel matrix has been preloaded.
+        """
+        points = [job.start_location] + job.waypoints
+        matrix = travel_matrix.matrix(points, job.departure_time)
+        waypoint_order = solve_route_order(
+            [[leg.duration for leg in row] for row in matrix],
+            service_times=[0] + job.service_times,
+            time_windows=[None] + job.time_windows,
+            hard_windows=Config.ROUTE_TIME_WINDOWS == 'hard'
+        )
+
+        # Legs with polylines for the chosen order (at most one directions request)
+        ordered_waypoints = [job.waypoints[i] for i in waypoint_order]
+        legs = travel_matrix.route_legs(
+            [job.start_location] + ordered_waypoints + [job.start_location],
+            job.departure_time
+        )
+        return waypoint_order, legs
+
+    def _apply(self, job: '_RouteJob', waypoint_order: List[int], legs: List[Leg]) -> None:
+        """Write the optimized order, totals and schedule to the route (caller commits)"""
+        route = job.route
+        total_distance, total_duration = summarize_legs(legs)
+        total_visit_duration = calculate_visit_duration(job.appointments)
+        ordered_appointments = [job.appointments[i] for i in waypoint_order]
+        schedule, total_lateness = calculate_schedule(ordered_appointments, legs, job.departure_time)
+
+        route.polyline = merge_leg_polylines(legs)
+        route.total_distance = total_distance
+        route.total_duration = total_duration + total_visit_duration
+        route.set_route_order(self._create_route_order(waypoint_order, job.appointments))
+        route.set_schedule(schedule)
+        route.set_stop_legs(dict(zip([a.id for a in ordered_appointments], legs)), schedule)
+        route.total_lateness = total_lateness
+        route.fingerprint = calculate_route_fingerprint(job.start_location, ordered_appointments, job.departure_time)
+        route.optimized_fingerprint = job.fingerprint
+        route.needs_optimization = False
+        route.updated_at = datetime.utcnow()
 
     def optimize_route(self, weekday: str, employee_id: int = None, area: str = None, calendar_week: int = None) -> None:
         """
@@ -34,9 +140,9 @@ class RouteOptimizer:
         """
         try:
             # Area-based tour (weekend or holiday AW): area + no employee_id in request
-            is_area_route = bool(area) and employee_id is None
+            area_tour = bool(area) and employee_id is None
 
-            if not is_area_route and not employee_id:
+            if not area_tour and not employee_id:
                 raise ValueError("Employee ID is required for employee routes")
             
             # Get calendar week from any patient
@@ -45,7 +151,7 @@ class RouteOptimizer:
                 raise ValueError("No patients found with calendar week information")
                         
             # Get route from database
-            if is_area_route:
+            if area_tour:
                 # Area routes (Sa/So or holiday Mon–Fri): match weekday, area, calendar_week;
                 # employee_id may be set later from AW assignment.
                 query = Route.query.filter_by(
@@ -70,22 +176,18 @@ class RouteOptimizer:
 
             # If route order is empty, set distance and duration to 0
             if not route.get_route_order():
-                route.polyline = None
-                route.total_distance = 0
-                route.total_duration = 0
-                route.updated_at = datetime.utcnow()
+                self._apply_empty(route)
                 db.session.commit()
                 return
 
-            # Get appointments from route order
-            appointment_ids = eval(route.route_order)
-            appointments = Appointment.query.filter(Appointment.id.in_(appointment_ids)).all()
+            # Get appointments in route order
+            appointments = get_route_appointments(route)
             
             if not appointments:
-                raise ValueError(f"No appointments found for the IDs in route order: {appointment_ids}")
+                raise ValueError(f"No appointments found for the IDs in route order: {route.get_route_order()}")
 
             # Get coordinates for all locations
-            if is_area_route:
+            if area_tour:
                 # Central start/end in tour area
                 start_location = get_tour_area_start_location(area)
             else:
@@ -95,12 +197,6 @@ class RouteOptimizer:
                     raise ValueError(f"Employee with ID {employee_id} not found")
                 start_location = {'lat': employee.latitude, 'lng': employee.longitude}
 
-            # Get coordinates for appointments
-            waypoints = []
-            for appointment in appointments:
-                patient = appointment.patient
-                waypoints.append((patient.latitude, patient.longitude))
-
             # Calculate departure time - use calendar_week from route or parameter
             route_calendar_week = calendar_week or route.calendar_week
             if not route_calendar_week:
@@ -110,37 +206,369 @@ class RouteOptimizer:
             
             departure_time = get_departure_time(weekday, route_calendar_week)
 
-            # Calculate optimized route
-            result = self.gmaps.directions(
-                origin=start_location,
-                destination=start_location,
-                waypoints=waypoints,
-                optimize_waypoints=True,  # Enable optimization
-                departure_time=departure_time,
-                mode="driving"
-            )
-
-            if not result:
-                raise Exception("Failed to calculate optimized route")
-
-            # Get route information
-            route_info = result[0]
-            
-            # Calculate durations
-            total_distance, total_duration = calculate_route_duration(route_info['legs'])
-            total_visit_duration = calculate_visit_duration(appointments)
-            
-            # Update route with new information
-            route.polyline = route_info['overview_polyline']['points']
-            route.total_distance = total_distance
-            route.total_duration = total_duration + total_visit_duration
-            route.route_order = self._create_route_order(route_info, appointments)
-            route.updated_at = datetime.utcnow()
+            job = _RouteJob(route, appointments, start_location, departure_time)
+            if self._is_unchanged(job):
+                if route.needs_optimization:
+                    route.needs_optimization = False
+                    db.session.commit()
+                return
+
+            travel_matrix = TravelMatrix(self.gmaps)
+            waypoint_order, legs = self._solve(job, travel_matrix)
+            travel_matrix.flush()
+
+            self._apply(job, waypoint_order, legs)
             db.session.commit()
 
         except Exception as e:
             print(e)
             db.session.rollback()
-            if is_area_route:
+            if area_tour:
                 raise Exception(f'Failed to optimize area route for {area}: {str(e)}') from e
-            raise Exception(f'Failed to optimize route for employee {employee_id}: {str(e)}') from e 
\ No newline at end of file
+            raise Exception(f'Failed to optimize route for employee {employee_id}: {str(e)}') from e
+
+    def optimize_routes_batch(self, routes: List[Route], max_workers: int = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Optimize many routes at once (weekday and AW tour-area routes).
+        Stops, start locations and cached legs are loaded up front in the calling thread;
+        a bounded thread pool then only does the Google requests and solver runs.
+        Results are written back in one transaction. Empty routes need no API call.
+        Autoflush is off until then, so no write lock is taken while routes are being planned.
+        Args:
+            routes: Routes to optimize
+            max_workers: Size of the worker pool, defaults to Config.ROUTE_OPTIMIZATION_WORKERS
+        Returns:
+            (number of optimized routes, failed routes with error message)
+        """
+        optimized = 0
+        failures = []
+
+        def record_failure(route: Route, error: Exception) -> None:
+            failures.append({
+                'route_id': route.id,
+                'employee_id': route.employee_id,
+                'area': route.area,
+                'weekday': route.weekday,
+                'calendar_week': route.calendar_week,
+                'error': str(error)
+            })
+
+        # Pending changes are flushed only by the final commit
+        with db.session.no_autoflush:
+            # Load all stops and employees with one query each
+            orders = {route.id: route.get_route_order() for route in routes}
+            appointment_ids = {i for order in orders.values() for i in order}
+            appointments = {
+                a.id: a for a in Appointment.query.options(joinedload(Appointment.patient))
+                .filter(Appointment.id.in_(appointment_ids)).all()
+            } if appointment_ids else {}
+            employee_ids = {route.employee_id for route in routes if not is_area_route(route)}
+            employees = {
+                e.id: e for e in Employee.query.filter(Employee.id.in_(employee_ids)).all()
+            } if employee_ids else {}
+            fallback_week = None
+
+            jobs = []
+            for route in routes:
+                try:
+                    order = orders[route.id]
+                    if not order:
+                        self._apply_empty(route)
+                        optimized += 1
+                        continue
+
+                    route_appointments = [appointments[i] for i in order if i in appointments]
+                    if not route_appointments:
+                        raise ValueError(f"No appointments found for the IDs in route order: {order}")
+
+                    if is_area_route(route):
+                        start_location = get_tour_area_start_location(route.area)
+                    else:
+                        employee = employees.get(route.employee_id)
+                        if not employee:
+                            raise ValueError(f"Employee with ID {route.employee_id} not found")
+                        start_location = {'lat': employee.latitude, 'lng': employee.longitude}
+
+                    route_calendar_week = route.calendar_week
+                    if not route_calendar_week:
+                        if fallback_week is None:
+                            patient = Patient.query.filter(Patient.calendar_week.isnot(None)).first()
+                            fallback_week = patient.calendar_week if patient else 0
+                        route_calendar_week = fallback_week or None
+
+                    departure_time = get_departure_time(route.weekday, route_calendar_week)
+                    job = _RouteJob(route, route_appointments, start_location, departure_time)
+                    if self._is_unchanged(job):
+                        route.needs_optimization = False
+                        optimized += 1
+                        continue
+                    jobs.append(job)
+                except Exception as e:
+                    record_failure(route, e)
+
+            travel_matrix = TravelMatrix(self.gmaps)
+            travel_matrix.preload(([job.start_location] + job.waypoints, job.departure_time) for job in jobs)
+
+            if jobs:
+                with ThreadPoolExecutor(max_workers=max_workers or Config.ROUTE_OPTIMIZATION_WORKERS) as executor:
+                    futures = {executor.submit(self._solve, job, travel_matrix): job for job in jobs}
+                    for future in as_completed(futures):
+                        job = futures[future]
+                        try:
+                            waypoint_order, legs = future.result()
+                            self._apply(job, waypoint_order, legs)
+                            optimized += 1
+                        except Exception as e:
+                            record_failure(job.route, e)
+
+        try:
+            travel_matrix.flush()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f'Failed to save optimized routes: {str(e)}') from e
+
+        return optimized, failures
+
+    def _stop_context(self, route: Route, appointment: Appointment) -> Tuple[Dict[str, float], datetime, Dict[int, Appointment]]:
+        """Start location, departure time and current stops of a route (for incremental changes)"""
+        if is_area_route(route):
+            start_location = get_tour_area_start_location(route.area)
+        else:
+            employee = Employee.query.filter_by(id=route.employee_id).first()
+            if not employee:
+                raise ValueError(f"Employee with ID {route.employee_id} not found")
+            start_location = {'lat': employee.latitude, 'lng': employee.longitude}
+        departure_time = get_departure_time(route.weekday, route.calendar_week or appointment.calendar_week)
+        stops = {a.id: a for a in get_route_appointments(route)}
+        return start_location, departure_time, stops
+
+    def _mark_changed(
+        self,
+        route: Route,
+        travel_matrix: TravelMatrix,
+        points: List,
+        legs: List[Leg],
+        stops: Dict[int, Appointment],
+        departure_time: datetime
+    ) -> None:
+        """
+        Store the legs of the new stop order, recompute the totals from them (like a full
+        optimization does) and flag the route for optimization
+        """
+        order = route.get_route_order()
+        total_distance, total_duration = summarize_legs(legs)
+        route.total_distance = total_distance
+        route.total_duration = total_duration + calculate_visit_duration([stops[i] for i in order])
+        # ETAs only after the next planning
+        route.set_stop_legs(dict(zip(order, legs)))
+        polyline_legs = travel_matrix.cached_route_legs(points, departure_time)
+        if polyline_legs is not None:
+            route.polyline = merge_leg_polylines(polyline_legs)
+        route.schedule = None
+        route.total_lateness = None
+        route.fingerprint = None
+        route.needs_optimization = True
+        route.updated_at = datetime.utcnow()
+        travel_matrix.flush()
+
+    def insert_stop(self, route: Route, appointment: Appointment) -> None:
+        """
+        Insert an appointment at its cheapest position (cached leg costs) and recompute the
+        totals from the legs of the new order. Full optimization is deferred (needs_optimization).
+        Caller commits.
+        """
+        order = route.get_route_order()
+        if appointment.id in order:
+            return
+        start_location, departure_time, stops = self._stop_context(route, appointment)
+        order = [i for i in order if i in stops]
+        points = [start_location] + [(stops[i].patient.latitude, stops[i].patient.longitude) for i in order] + [start_location]
+        new_point = (appointment.patient.latitude, appointment.patient.longitude)
+
+        # Detour of inserting between points[i] and points[i + 1], from one batch of leg lookups
+        n = len(points) - 1
+        travel_matrix = TravelMatrix(self.gmaps)
+        legs = travel_matrix.lookup(
+            [(points[i], new_point) for i in range(n)]
+            + [(new_point, points[i + 1]) for i in range(n)]
+            + [(points[i], points[i + 1]) for i in range(n)],
+            departure_time
+        )
+        to_new, from_new, direct = legs[:n], legs[n:2 * n], legs[2 * n:]
+        position = min(range(n), key=lambda i: to_new[i].duration + from_new[i].duration - direct[i].duration)
+
+        order.insert(position, appointment.id)
+        stops[appointment.id] = appointment
+        route.set_route_order(order)
+        new_legs = direct[:position] + [to_new[position], from_new[position]] + direct[position + 1:]
+        new_points = points[:position + 1] + [new_point] + points[position + 1:]
+        self._mark_changed(route, travel_matrix, new_points, new_legs, stops, departure_time)
+
+    def remove_stop(self, route: Route, appointment: Appointment) -> None:
+        """
+        Splice an appointment out of a route and recompute the totals from the legs of the new
+        order (cached leg costs). Full optimization is deferred (needs_optimization). Caller commits.
+        """
+        order = route.get_route_order()
+        if appointment.id not in order:
+            return
+        if len(order) == 1:
+            route.set_route_order([])
+            self._apply_empty(route)
+            return
+        start_location, departure_time, stops = self._stop_context(route, appointment)
+        order = [i for i in order if i in stops]
+        points = [start_location] + [(stops[i].patient.latitude, stops[i].patient.longitude) for i in order] + [start_location]
+        position = order.index(appointment.id) + 1
+        new_points = points[:position] + points[position + 1:]
+
+        travel_matrix = TravelMatrix(self.gmaps)
+        new_legs = travel_matrix.lookup(
+            [(new_points[i], new_points[i + 1]) for i in range(len(new_points) - 1)],
+            departure_time
+        )
+
+        order.remove(appointment.id)
+        route.set_route_order(order)
+        self._mark_changed(route, travel_matrix, new_points, new_legs, stops, departure_time)
+
+    def rebalance_weekday(
+        self,
+        weekday: str,
+        calendar_week: int,
+        area: str = None,
+        role: str = ROLE_NURSING,
+        employee_ids: List[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Propose a balanced distribution of all HB/NA visits of a weekday over the employees
+        working that day (one vehicle per employee, start/end at home). Other appointments
+        (e.g. TK, visits without coordinates) stay with their current employee and are appended
+        to that employee's proposed route. Nothing is saved.
+        Args:
+            weekday: Day of the week
+            calendar_week: Calendar week of the routes
+            area: Only routes of this area (e.g. Nordkreis), optional
+            role: Scheduling role of the employees (NURSING / DOCTOR)
+            employee_ids: Only these employees, optional
+        Returns:
+            Proposed route order per employee, reassigned appointments, visits the solver could
+            not plan (unassigned) and kept appointments of employees without a proposed route
+            (not_rebalanced)
+        """
+        weekday = weekday.lower()
+        # Employees (role, home, work hours) are needed for every route
+        query = Route.query.options(joinedload(Route.employee)).filter(
+            Route.weekday == weekday,
+            Route.calendar_week == calendar_week,
+            Route.employee_id.isnot(None)
+        )
+        if area:
+            query = query.filter(Route.area == area)
+        if employee_ids:
+            query = query.filter(Route.employee_id.in_(employee_ids))
+        routes = [r for r in query.all() if employee_role(r.employee) == role]
+        if not routes:
+            raise ValueError(f"No routes found for {weekday} (KW {calendar_week})")
+
+        # Employees marked unavailable keep no visits; their stops are redistributed
+        unavailable = {
+            entry.employee_id for entry in EmployeePlanning.query.filter_by(
+                weekday=weekday, calendar_week=calendar_week, available=False
+            ).all()
+        }
+        vehicles = [
+            r.employee for r in routes
+            if r.employee_id not in unavailable
+            and r.employee.latitude is not None and r.employee.longitude is not None
+        ]
+        if not vehicles:
+            raise ValueError(f"No available employees with coordinates on {weekday} (KW {calendar_week})")
+
+        current_employee = {}
+        for route in routes:
+            for appointment_id in route.get_route_order():
+                current_employee[appointment_id] = route.employee_id
+        appointments = Appointment.query.options(joinedload(Appointment.patient)).filter(
+            Appointment.id.in_(list(current_employee))
+        ).all() if current_employee else []
+        stops = [
+            a for a in appointments
+            if a.visit_type in ('HB', 'NA')
+            and a.patient.latitude is not None and a.patient.longitude is not None
+        ]
+        stop_ids = {a.id for a in stops}
+        # Not rebalanced: stays with the current employee, in the current order
+        route_position = {
+            appointment_id: position
+            for route in routes for position, appointment_id in enumerate(route.get_route_order())
+        }
+        kept: Dict[int, List[Appointment]] = {}
+        for appointment in sorted(appointments, key=lambda a: route_position[a.id]):
+            if appointment.id not in stop_ids:
+                kept.setdefault(current_employee[appointment.id], []).append(appointment)
+
+        # Nodes: one depot per employee, then one node per visit
+        points = [(e.latitude, e.longitude) for e in vehicles] + [(a.patient.latitude, a.patient.longitude) for a in stops]
+        departure_time = get_departure_time(weekday, calendar_week)
+        travel_matrix = TravelMatrix(self.gmaps)
+        matrix = travel_matrix.matrix(points, departure_time)
+        travel_matrix.flush()
+        db.session.commit()
+
+        durations = [[leg.duration for leg in row] for row in matrix]
+        service_times = [0] * len(vehicles) + [VISIT_TYPE_DURATIONS.get(a.visit_type, 0) * 60 for a in stops]
+        max_minutes = [int(e.work_hours / 100 * Config.FULL_TIME_DAILY_MINUTES) for e in vehicles]
+        # Time of the kept appointments is not available for the rebalanced visits
+        kept_minutes = [calculate_visit_duration(kept.get(e.id, [])) for e in vehicles]
+        tours = solve_vehicle_routes(
+            durations,
+            service_times,
+            depots=list(range(len(vehicles))),
+            max_durations=[max(m - k, 0) * 60 for m, k in zip(max_minutes, kept_minutes)]
+        )
+
+        proposed_routes = []
+        reassignments = []
+        planned = set()
+        for vehicle, (employee, tour) in enumerate(zip(vehicles, tours)):
+            nodes = [vehicle] + tour + [vehicle]
+            route_legs = [matrix[nodes[i]][nodes[i + 1]] for i in range(len(nodes) - 1)]
+            total_distance, total_duration = summarize_legs(route_legs)
+            tour_appointments = [stops[node - len(vehicles)] for node in tour]
+            for appointment in tour_appointments:
+                planned.add(appointment.id)
+                if current_employee.get(appointment.id) != employee.id:
+                    reassignments.append({
+                        'appointment_id': appointment.id,
+                        'patient_id': appointment.patient_id,
+                        'from_employee_id': current_employee.get(appointment.id),
+                        'to_employee_id': employee.id
+                    })
+            kept_appointments = kept.pop(employee.id, [])
+            proposed_routes.append({
+                'employee_id': employee.id,
+                'route_order': [a.id for a in tour_appointments + kept_appointments],
+                'kept': [a.id for a in kept_appointments],
+                'total_distance': total_distance,
+                'total_duration': total_duration + calculate_visit_duration(tour_appointments + kept_appointments),
+                'max_duration': max_minutes[vehicle]
+            })
+        # Only visits the solver dropped (no tour within the daily limits)
+        unassigned = sorted(a.id for a in stops if a.id not in planned)
+        not_rebalanced = [
+            {'appointment_id': a.id, 'employee_id': employee_id}
+            for employee_id, kept_appointments in sorted(kept.items())
+            for a in kept_appointments
+        ]
+
+        return {
+            'weekday': weekday,
+            'calendar_week': calendar_week,
+            'area': area,
+            'routes': proposed_routes,
+            'reassignments': reassignments,
+            'unassigned': unassigned,
+            'not_rebalanced': not_rebalanced
+        }
@@ -4,16 +4,18 @@ from typing import List, Dict, Any, Optional
 import googlemaps
 from ..models.employee import Employee
 from ..models.patient import Patient
-from ..models.appointment import Appointment
 from ..models.route import Route
 from .. import db
 from .route_utils import (
     get_departure_time,
-    calculate_route_duration,
     calculate_visit_duration,
+    calculate_schedule,
+    calculate_route_fingerprint,
+    get_route_appointments,
     get_gmaps_client,
     get_tour_area_start_location
 )
+from .travel_matrix import TravelMatrix, merge_leg_polylines, summarize_legs
 
 class RoutePlanner:
     def __init__(self):
@@ -69,16 +71,19 @@ class RoutePlanner:
                 route.polyline = None
                 route.total_distance = 0
                 route.total_duration = 0
+                route.schedule = None
+                route.total_lateness = 0
+                route.fingerprint = None
+                route.optimized_fingerprint = None
                 route.updated_at = datetime.utcnow()
                 db.session.commit()
                 return
 
-            # Get appointments from route order
-            appointment_ids = eval(route.route_order)
-            appointments = Appointment.query.filter(Appointment.id.in_(appointment_ids)).all()
+            # Get appointments in route order
+            appointments = get_route_appointments(route)
             
             if not appointments:
-                raise ValueError(f"No appointments found for the IDs in route order: {appointment_ids}")
+                raise ValueError(f"No appointments found for the IDs in route order: {route.get_route_order()}")
 
             # Get coordinates for all locations
             if is_area_route:
@@ -105,30 +110,31 @@ class RoutePlanner:
             
             departure_time = get_departure_time(weekday, route_calendar_week)
 
-            # Calculate route - use waypoints as list of tuples
-            result = self.gmaps.directions(
-                origin=start_location,
-                destination=start_location,
-                waypoints=waypoints,  # Use list of tuples
-                optimize_waypoints=False,  # Don't optimize, use existing order
-                departure_time=departure_time,
-                mode="driving"
-            )
+            # Nothing changed since the last planning: keep stored totals, polyline and schedule
+            fingerprint = calculate_route_fingerprint(start_location, appointments, departure_time)
+            if route.fingerprint == fingerprint:
+                return
 
-            if not result:
-                raise Exception("Failed to calculate route")
+            # Leg costs come from the travel-time cache; Google is only asked for missing legs
+            travel_matrix = TravelMatrix(self.gmaps)
+            legs = travel_matrix.route_legs([start_location] + waypoints + [start_location], departure_time)
+            travel_matrix.flush()
 
-            # Get route information
-            route_info = result[0]
-            
             # Calculate durations
-            total_distance, total_duration = calculate_route_duration(route_info['legs'])
+            total_distance, total_duration = summarize_legs(legs)
             total_visit_duration = calculate_visit_duration(appointments)
+            schedule, total_lateness = calculate_schedule(appointments, legs, departure_time)
             
             # Update route with new information
-            route.polyline = route_info['overview_polyline']['points']
+            route.polyline = merge_leg_polylines(legs)
             route.total_distance = total_distance
             route.total_duration = total_duration + total_visit_duration
+            route.set_schedule(schedule)
+            route.set_stop_legs(dict(zip([a.id for a in appointments], legs)), schedule)
+            route.total_lateness = total_lateness
+            route.fingerprint = fingerprint
+            # Order may differ from the optimized one (e.g. manual reorder): next optimize runs again
+            route.optimized_fingerprint = None
             route.updated_at = datetime.utcnow()
             db.session.commit()
 
@@ -1,9 +1,16 @@
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple
 import googlemaps
+from googlemaps.convert import normalize_lat_lng
+import hashlib
+import json
 import math
 import os
-from app.models.appointment import VISIT_TYPE_DURATIONS
+from sqlalchemy.orm import joinedload
+from app.models.appointment import Appointment, VISIT_TYPE_DURATIONS
+from app.models.route_stop import RouteStop
+from config import Config
+from .travel_matrix import departure_bucket
 
 
 def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -89,6 +96,83 @@ def calculate_visit_duration(appointments: List) -> int:
         for appointment in appointments
     )
 
+def get_time_window(appointment, departure_time: datetime) -> Optional[Tuple[int, int]]:
+    """
+    Arrival window for an appointment with a fixed time (Appointment.time),
+    as (earliest, latest) seconds after departure; None if the visit has no time.
+    """
+    if appointment.time is None or Config.ROUTE_TIME_WINDOWS == 'off':
+        return None
+    target = datetime.combine(departure_time.date(), appointment.time)
+    offset = int((target - departure_time).total_seconds())
+    tolerance = Config.ROUTE_TIME_WINDOW_TOLERANCE_MINUTES * 60
+    return max(offset - tolerance, 0), max(offset + tolerance, 0)
+
+def calculate_schedule(appointments: List, legs: List, departure_time: datetime) -> Tuple[List[Dict], int]:
+    """
+    Arrival time and lateness per stop when driving the legs in order and staying
+    VISIT_TYPE_DURATIONS at each stop. Early arrivals wait for the time window.
+    Returns: (schedule entries in route order, total lateness in minutes)
+    """
+    schedule = []
+    total_lateness = 0
+    current = departure_time
+    for appointment, leg in zip(appointments, legs):
+        current += timedelta(seconds=leg.duration)
+        window = get_time_window(appointment, departure_time)
+        lateness = 0
+        if window:
+            earliest = departure_time + timedelta(seconds=window[0])
+            latest = departure_time + timedelta(seconds=window[1])
+            if current < earliest:
+                current = earliest
+            lateness = max(int((current - latest).total_seconds()) // 60, 0)
+        total_lateness += lateness
+        schedule.append({
+            'appointment_id': appointment.id,
+            'eta': current.strftime('%H:%M'),
+            'lateness': lateness
+        })
+        current += timedelta(minutes=VISIT_TYPE_DURATIONS.get(appointment.visit_type, 0))
+    return schedule, total_lateness
+
+def get_route_appointments(route) -> List[Appointment]:
+    """
+    Appointments of a route (with their patients) in stored stop order, from one query.
+    An IN query on the ids would return them in arbitrary order.
+    """
+    return (
+        Appointment.query.options(joinedload(Appointment.patient))
+        .join(RouteStop, RouteStop.appointment_id == Appointment.id)
+        .filter(RouteStop.route_id == route.id)
+        .order_by(RouteStop.position)
+        .all()
+    )
+
+def calculate_route_fingerprint(start_location, appointments: List, departure_time: datetime) -> str:
+    """
+    Content hash of everything a planned route depends on: start point, departure bucket,
+    time-window settings and the stops (id, coordinates, visit type, fixed time) in the
+    given order. Equal fingerprints mean the stored totals, polyline and schedule are still valid.
+    """
+    lat, lng = normalize_lat_lng(start_location)
+    payload = {
+        'start': [lat, lng],
+        'departure': departure_bucket(departure_time),
+        'time_windows': [Config.ROUTE_TIME_WINDOWS, Config.ROUTE_TIME_WINDOW_TOLERANCE_MINUTES],
+        'stops': [
+            [
+                a.id,
+                a.patient.latitude,
+                a.patient.longitude,
+                a.visit_type,
+                a.time.strftime('%H:%M') if a.time else None
+            ]
+            for a in appointments
+        ]
+    }
+    return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()
+
 def get_tour_area_start_location(area: str) -> Dict[str, float]:
     """
     Zentraler Startpunkt für AW-Flächenrouten (Nord / Mitte / Süd), analog Touren-Wochenende.
@@ -0,0 +1,176 @@
+"""
+In-process stop ordering with the OR-Tools routing library.
+
+Works on a precomputed travel-time matrix (see travel_matrix.TravelMatrix), so ordering
+a route needs no network round trip and is not limited to Google's 25 waypoints.
+For single routes, node 0 of the matrix is the start/end location of the route.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cost of one second of lateness at a soft time window, relative to one second of driving
+_LATENESS_COST = 10
+
+
+def _search_parameters(time_limit_ms: Optional[int]) -> pywrapcp.DefaultRoutingSearchParameters:
+    """
+    Cheapest-arc start followed by local search. Without a time limit the search stops at
+    the first local optimum (milliseconds for typical tours); with a limit, guided local
+    search keeps improving until the limit is reached.
+    """
+    if time_limit_ms is None:
+        time_limit_ms = Config.ROUTE_SOLVER_TIME_LIMIT_MS
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    if time_limit_ms and time_limit_ms > 0:
+        params.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+        params.time_limit.FromMilliseconds(int(time_limit_ms))
+    else:
+        params.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GREEDY_DESCENT
+    return params
+
+
+def _add_time_windows(
+    routing: pywrapcp.RoutingModel,
+    manager: pywrapcp.RoutingIndexManager,
+    working: List[List[int]],
+    time_windows: Sequence[Optional[Tuple[int, int]]],
+    hard: bool
+) -> None:
+    """
+    Time dimension starting at 0 (departure). Arriving before a window waits until it opens;
+    arriving after it closes is forbidden (hard) or penalized per second (soft).
+    """
+    horizon = max(
+        sum(max(row) for row in working),
+        max((window[1] for window in time_windows if window), default=0)
+    )
+    routing.AddDimension(routing.RegisterTransitMatrix(working), horizon, horizon, True, 'Time')
+    time_dimension = routing.GetDimensionOrDie('Time')
+    for node, window in enumerate(time_windows):
+        if not window or node == 0:
+            continue
+        index = manager.NodeToIndex(node)
+        earliest, latest = max(int(window[0]), 0), max(int(window[1]), 0)
+        time_dimension.CumulVar(index).SetMin(min(earliest, latest))
+        if hard:
+            time_dimension.CumulVar(index).SetMax(latest)
+        else:
+            time_dimension.SetCumulVarSoftUpperBound(index, latest, _LATENESS_COST)
+
+
+def solve_route_order(
+    cost_matrix: Sequence[Sequence[int]],
+    time_limit_ms: Optional[int] = None,
+    service_times: Optional[Sequence[int]] = None,
+    time_windows: Optional[Sequence[Optional[Tuple[int, int]]]] = None,
+    hard_windows: bool = False
+) -> List[int]:
+    """
+    Order the stops of a single round trip so that the summed arc costs are minimal.
+
+    Args:
+        cost_matrix: square matrix of integer arc costs (e.g. seconds); node 0 is start and end
+        time_limit_ms: optional search time limit, defaults to Config.ROUTE_SOLVER_TIME_LIMIT_MS
+        service_times: time spent at each node in seconds, needed for time windows
+        time_windows: (earliest, latest) arrival in seconds after departure per node, or None
+        hard_windows: forbid late arrivals instead of penalizing them; falls back to soft
+            windows if no order satisfies all of them
+
+    Returns:
+        Stop positions (0-based, i.e. matrix node - 1) in visiting order
+    """
+    num_stops = len(cost_matrix) - 1
+    if num_stops <= 1:
+        return list(range(num_stops))
+
+    travel = [[int(c) for c in row] for row in cost_matrix]
+    manager = pywrapcp.RoutingIndexManager(len(travel), 1, 0)
+    routing = pywrapcp.RoutingModel(manager)
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitMatrix(travel))
+
+    if time_windows and any(time_windows[1:]):
+        services = service_times or [0] * len(travel)
+        working = [[travel[i][j] + int(services[i]) for j in range(len(travel))] for i in range(len(travel))]
+        _add_time_windows(routing, manager, working, time_windows, hard_windows)
+
+    solution = routing.SolveWithParameters(_search_parameters(time_limit_ms))
+    if solution is None:
+        if hard_windows:
+            logger.warning('No route order satisfies all time windows, falling back to soft time windows')
+            return solve_route_order(cost_matrix, time_limit_ms, service_times, time_windows, hard_windows=False)
+        raise Exception("Routing solver found no solution")
+
+    order = []
+    index = solution.Value(routing.NextVar(routing.Start(0)))
+    while not routing.IsEnd(index):
+        order.append(manager.IndexToNode(index) - 1)
+        index = solution.Value(routing.NextVar(index))
+    return order
+
+
+def solve_vehicle_routes(
+    cost_matrix: Sequence[Sequence[int]],
+    service_times: Sequence[int],
+    depots: Sequence[int],
+    max_durations: Sequence[int],
+    time_limit_ms: Optional[int] = None,
+    balance_coefficient: int = 10
+) -> List[List[int]]:
+    """
+    Distribute stops over several vehicles (one round trip each) and order them.
+
+    Args:
+        cost_matrix: square matrix of travel times in seconds over depots and stops
+        service_times: time spent at each node in seconds (0 for depots)
+        depots: node of each vehicle's start/end location
+        max_durations: maximum working time (travel + service) per vehicle in seconds
+        time_limit_ms: search time limit, defaults to Config.ROUTE_REBALANCE_TIME_LIMIT_MS
+        balance_coefficient: weight of the longest-minus-shortest tour term; keeps days balanced
+
+    Returns:
+        Visited stop nodes per vehicle in visiting order. Stops that do not fit into any
+        vehicle's limit are left out of all lists.
+    """
+    num_nodes = len(cost_matrix)
+    depot_nodes = set(depots)
+    travel = [[int(c) for c in row] for row in cost_matrix]
+    working = [[travel[i][j] + int(service_times[i]) for j in range(num_nodes)] for i in range(num_nodes)]
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, len(depots), list(depots), list(depots))
+    routing = pywrapcp.RoutingModel(manager)
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitMatrix(travel))
+
+    routing.AddDimensionWithVehicleCapacity(
+        routing.RegisterTransitMatrix(working), 0, [int(d) for d in max_durations], True, 'Time'
+    )
+    routing.GetDimensionOrDie('Time').SetGlobalSpanCostCoefficient(balance_coefficient)
+
+    # Dropping a stop is allowed but more expensive than any feasible assignment
+    drop_penalty = (max(max(row) for row in working) + 1) * num_nodes * max(balance_coefficient, 1)
+    for node in range(num_nodes):
+        if node not in depot_nodes:
+            routing.AddDisjunction([manager.NodeToIndex(node)], drop_penalty)
+
+    if time_limit_ms is None:
+        time_limit_ms = Config.ROUTE_REBALANCE_TIME_LIMIT_MS
+    solution = routing.SolveWithParameters(_search_parameters(time_limit_ms))
+    if solution is None:
+        raise Exception("Routing solver found no solution")
+
+    tours = []
+    for vehicle in range(len(depots)):
+        tour = []
+        index = solution.Value(routing.NextVar(routing.Start(vehicle)))
+        while not routing.IsEnd(index):
+            tour.append(manager.IndexToNode(index))
+            index = solution.Value(routing.NextVar(index))
+        tours.append(tour)
+    return tours
@@ -0,0 +1,174 @@
+"""
+Column-wise parsing of imported Excel sheets.
+
+Every function normalizes a whole DataFrame column with vectorized pandas operations and
+returns one plain Python value per row, so the import loops only have to build ORM objects.
+Values are normalized the same way as in the former row-by-row import, e.g. zip codes
+arriving as 51597.0 become "51597".
+"""
+
+from datetime import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Numbers that arrive as text, e.g. "51597" or "51597.0"
+_NUMERIC_TEXT = r"\d+(?:\.0+)?"
+# Häufige Excel-Platzhalter für „kein Besuch“
+_NO_VISIT_PLACEHOLDERS = ("--", "–", "—", "−")
+# "HH:MM" at the start of an info cell; anything after a second colon is ignored
+_TIME_PREFIX = r"^\s*\+?(\d+)\s*:\s*\+?(\d+)\s*(?::|$)"
+
+
+def _is_text(series: pd.Series) -> pd.Series:
+    """Mask of cells holding strings (numeric columns have none)"""
+    if series.dtype != object:
+        return pd.Series(False, index=series.index)
+    return series.map(lambda value: isinstance(value, str))
+
+
+def _none_where(values: pd.Series, mask: pd.Series) -> pd.Series:
+    """Object copy of values with None where mask is set"""
+    result = values.astype(object)
+    result[mask] = None
+    return result
+
+
+def text_column(series: pd.Series) -> List[str]:
+    """str(value).strip() per cell (NaN becomes 'nan', like the row-wise import)"""
+    return series.astype(str).str.strip().tolist()
+
+
+def optional_text_column(series: pd.Series) -> List[Optional[str]]:
+    """Stripped text, None for missing cells"""
+    return _none_where(series.astype(str).str.strip(), series.isna()).tolist()
+
+
+def _integer_text(series: pd.Series, pad: int = 0) -> pd.Series:
+    """
+    Integer representation of numeric cells and numeric-looking text cells, other cells
+    stripped; the shared core of the zip code and phone normalization.
+    """
+    missing = series.isna()
+    is_text = _is_text(series)
+    text = series.astype(str).str.strip()
+    result = text.copy()
+
+    numeric_text = is_text & text.str.fullmatch(_NUMERIC_TEXT).fillna(False)
+    if numeric_text.any():
+        digits = text[numeric_text].str.replace(r"\.0+$", "", regex=True).str.lstrip("0").replace("", "0")
+        result[numeric_text] = digits.str.zfill(pad) if pad else digits
+
+    candidates = ~is_text & ~missing
+    if candidates.any():
+        numbers = pd.to_numeric(series[candidates], errors="coerce")
+        finite = numbers[np.isfinite(numbers.astype(float))]
+        integers = np.trunc(finite.astype(float)).astype("int64").astype(str)
+        result[finite.index] = integers.str.zfill(pad) if pad else integers
+
+    result[missing] = ""
+    return result
+
+
+def zip_code_column(series: pd.Series) -> List[str]:
+    """
+    Zip codes as 5-digit strings (51597.0 -> "51597"), other values stripped,
+    "" for missing cells
+    """
+    return _integer_text(series, pad=5).tolist()
+
+
+def phone_column(series: pd.Series) -> List[Optional[str]]:
+    """Phone numbers without a trailing '.0', None for missing or empty cells"""
+    result = _integer_text(series)
+    return _none_where(result, result == "").tolist()
+
+
+def calendar_week_column(series: pd.Series) -> Tuple[List[Optional[int]], List[bool]]:
+    """
+    Calendar weeks (KW) as int, None for missing cells.
+    Returns (weeks, invalid) where invalid marks filled cells that are not a week 1–53.
+    """
+    filled = series.notna()
+    numbers = pd.to_numeric(series.astype(str).str.strip().where(filled), errors="coerce")
+    numbers = numbers.where(np.isfinite(numbers))
+    weeks = np.trunc(numbers)
+    invalid = filled & ~weeks.between(1, 53)
+    return _none_where(weeks.astype("Int64"), weeks.isna()).tolist(), invalid.tolist()
+
+
+def visit_type_column(series: pd.Series) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+    """
+    Visit types of a weekday column: 'HB', 'NA' or 'TK', None for „kein Termin“
+    (empty, missing or placeholder cells). Returns (visit_types, raw) where raw is the
+    upper-cased cell for filled cells that contain no valid visit type and None otherwise.
+    """
+    text = series.astype(str).str.strip()
+    no_visit = series.isna() | (text == "") | text.isin(_NO_VISIT_PLACEHOLDERS)
+    upper = text.str.upper()
+    visit_types = pd.Series(
+        np.select(
+            [upper.str.contains("HB", regex=False), upper.str.contains("NA", regex=False),
+             upper.str.contains("TK", regex=False)],
+            ["HB", "NA", "TK"],
+            default=""
+        ),
+        index=series.index
+    )
+    invalid = ~no_visit & (visit_types == "")
+    return (
+        _none_where(visit_types, no_visit | invalid).tolist(),
+        _none_where(upper, ~invalid).tolist()
+    )
+
+
+def time_info_column(series: pd.Series) -> Tuple[List[Optional[str]], List[Optional[time]]]:
+    """
+    Returns (info, times): the cell text (None for missing cells) and the appointment time
+    parsed from a leading "HH:MM", None if there is none or it is not a valid time of day.
+    """
+    missing = series.isna()
+    info = series.astype(str)
+    parts = info.where(~missing).str.extract(_TIME_PREFIX)
+    hours = pd.to_numeric(parts[0], errors="coerce")
+    minutes = pd.to_numeric(parts[1], errors="coerce")
+    valid = hours.between(0, 23) & minutes.between(0, 59)
+    times = [
+        time(int(hour), int(minute)) if ok else None
+        for hour, minute, ok in zip(hours.tolist(), minutes.tolist(), valid.tolist())
+    ]
+    return _none_where(info, missing).tolist(), times
+
+
+def tour_area_column(series: pd.Series) -> List[Optional[str]]:
+    """AW tour area (Nord/Mitte/Süd) from the Touren-Wochenende column, None if unset"""
+    lower = series.astype(str).str.strip().str.lower()
+    areas = np.select(
+        [lower.str.contains("nord", regex=False), lower.str.contains("mitte", regex=False),
+         lower.str.contains("süd", regex=False) | lower.str.contains("sued", regex=False)],
+        ["Nord", "Mitte", "Süd"],
+        default=""
+    )
+    areas = pd.Series(areas, index=series.index)
+    return _none_where(areas, series.isna() | (areas == "")).tolist()
+
+
+def alias_list_column(series: pd.Series) -> List[List[str]]:
+    """Comma separated aliases per cell, stripped and without empty entries"""
+    split = series.astype(str).str.split(",").where(series.notna())
+    return [
+        [alias.strip() for alias in aliases if alias.strip()] if isinstance(aliases, list) else []
+        for aliases in split.tolist()
+    ]
+
+
+def optional_number_column(series: pd.Series) -> Tuple[List[Optional[float]], List[bool]]:
+    """
+    Numbers of an optional column, None for missing cells.
+    Returns (numbers, invalid) where invalid marks filled cells that are not numeric.
+    """
+    filled = series.notna()
+    numbers = pd.to_numeric(series.astype(str).str.strip().where(filled), errors="coerce")
+    invalid = filled & numbers.isna()
+    return _none_where(numbers, numbers.isna()).tolist(), invalid.tolist()
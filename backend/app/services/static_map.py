@@ -0,0 +1,175 @@
+"""
+Local map rendering for the PDF export.
+
+Draws the stored route polylines (Route.polyline) and the stop markers as SVG on a plain
+background instead of downloading Google Static Maps images. Rendered maps are cached on
+disk under a hash of their input, so regenerating an unchanged week reuses them.
+"""
+import base64
+import hashlib
+import json
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from googlemaps.convert import decode_polyline
+
+from config import Config
+from .file_cache import FileCache
+
+# Same colors as the legend classes in pdf_template_care.html
+MARKER_COLORS = {
+    'red': '#dc3545',
+    'blue': '#007bff',
+    'green': '#28a745',
+    'orange': '#fd7e14',
+    'purple': '#6f42c1',
+    'yellow': '#ffc107',
+    'pink': '#e83e8c',
+    'brown': '#795548',
+    'gray': '#6c757d',
+    'black': '#212529',
+}
+START_COLOR = '#2196f3'
+
+# One line color per weekday, darker than the marker colors
+ROUTE_LINE_COLORS = {
+    'monday': '#0d47a1',
+    'tuesday': '#1b5e20',
+    'wednesday': '#4a148c',
+    'thursday': '#bf360c',
+    'friday': '#006064',
+    'saturday': '#3e2723',
+    'sunday': '#263238',
+}
+
+PADDING_PX = 40
+# Smallest map extent (Web Mercator units, ≈ 10 km in NRW) so a single stop is not zoomed in to street level
+MIN_SPAN = 0.0004
+EARTH_CIRCUMFERENCE_M = 40075016.686
+
+
+def _project(lat: float, lng: float) -> Tuple[float, float]:
+    """Web Mercator projection to unit coordinates (0..1, y pointing down)"""
+    sin_lat = math.sin(math.radians(max(min(lat, 85.0), -85.0)))
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+
+def _scale_bar(meters_per_px: float, max_px: float = 160) -> Tuple[float, str]:
+    """Longest 1/2/5·10^n meter length that fits into max_px; returns (length in px, label)"""
+    max_meters = meters_per_px * max_px
+    magnitude = 10 ** math.floor(math.log10(max_meters))
+    for factor in (5, 2, 1):
+        meters = factor * magnitude
+        if meters <= max_meters:
+            break
+    label = f"{meters / 1000:g} km" if meters >= 1000 else f"{meters:g} m"
+    return meters / meters_per_px, label
+
+
+def _build_svg(
+    start: Optional[Tuple[float, float]],
+    markers: Sequence[Tuple[float, float, str]],
+    polylines: Sequence[Tuple[str, str]],
+    width: int,
+    height: int
+) -> Optional[str]:
+    lines = [
+        (ROUTE_LINE_COLORS.get(weekday, '#455a64'), [_project(point['lat'], point['lng']) for point in decode_polyline(encoded)])
+        for encoded, weekday in polylines
+    ]
+    points = [point for _, line in lines for point in line]
+    points += [_project(lat, lng) for lat, lng, _ in markers]
+    if start:
+        points.append(_project(*start))
+    if not points:
+        return None
+
+    min_x = min(x for x, _ in points)
+    max_x = max(x for x, _ in points)
+    min_y = min(y for _, y in points)
+    max_y = max(y for _, y in points)
+    span_x = max(max_x - min_x, MIN_SPAN)
+    span_y = max(max_y - min_y, MIN_SPAN)
+    scale = min((width - 2 * PADDING_PX) / span_x, (height - 2 * PADDING_PX) / span_y)
+    center_x = (min_x + max_x) / 2
+    center_y = (min_y + max_y) / 2
+
+    def to_px(point):
+        return (width / 2 + (point[0] - center_x) * scale, height / 2 + (point[1] - center_y) * scale)
+
+    svg = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" fill="#f4f6f8"/>',
+    ]
+    for color, line in lines:
+        if len(line) < 2:
+            continue
+        coords = ' '.join(f"{x:.1f},{y:.1f}" for x, y in map(to_px, line))
+        svg.append(
+            f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="4" '
+            f'stroke-opacity="0.75" stroke-linejoin="round" stroke-linecap="round"/>'
+        )
+    for lat, lng, color in markers:
+        x, y = to_px(_project(lat, lng))
+        svg.append(
+            f'<circle cx="{x:.1f}" cy="{y:.1f}" r="10" fill="{MARKER_COLORS.get(color, color)}" '
+            f'stroke="#ffffff" stroke-width="3"/>'
+        )
+    if start:
+        x, y = to_px(_project(*start))
+        svg.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="16" fill="{START_COLOR}" stroke="#ffffff" stroke-width="3"/>')
+        svg.append(
+            f'<text x="{x:.1f}" y="{y + 7:.1f}" text-anchor="middle" font-family="Helvetica, Arial, sans-serif" '
+            f'font-size="20" font-weight="bold" fill="#ffffff">S</text>'
+        )
+
+    # Scale bar (bottom left); Mercator distances shrink with cos(latitude)
+    center_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * center_y))))
+    meters_per_px = EARTH_CIRCUMFERENCE_M * math.cos(math.radians(center_lat)) / scale
+    bar_px, bar_label = _scale_bar(meters_per_px)
+    bar_y = height - 20
+    svg.append(
+        f'<path d="M 20 {bar_y - 8} V {bar_y} H {20 + bar_px:.1f} V {bar_y - 8}" fill="none" stroke="#333333" stroke-width="3"/>'
+    )
+    svg.append(
+        f'<text x="{28 + bar_px:.1f}" y="{bar_y}" font-family="Helvetica, Arial, sans-serif" '
+        f'font-size="18" fill="#333333">{bar_label}</text>'
+    )
+    svg.append('</svg>')
+    return '\n'.join(svg)
+
+
+_cache = FileCache(Config.MAP_CACHE_DIR, '.svg', max_files=Config.MAP_CACHE_MAX_FILES)
+
+
+def render_route_map(
+    start: Optional[Tuple[float, float]],
+    markers: List[Tuple[float, float, str]],
+    polylines: List[Tuple[str, str]],
+    width: int = 1600,
+    height: int = 800
+) -> Optional[str]:
+    """
+    Render a map with route lines and stop markers as SVG data URI.
+
+    Args:
+        start: (lat, lng) of the start marker (employee address) or None
+        markers: (lat, lng, color name) per stop; color names as in MARKER_COLORS
+        polylines: (encoded polyline, weekday) per route; the weekday selects the line color
+
+    Returns:
+        data:image/svg+xml URI, or None if nothing has coordinates
+    """
+    key = hashlib.sha256(
+        json.dumps([start, markers, polylines, width, height], separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+    svg = _cache.get(key)
+    if svg is None:
+        svg_text = _build_svg(start, markers, polylines, width, height)
+        if svg_text is None:
+            return None
+        svg = svg_text.encode('utf-8')
+        _cache.put(key, svg)
+    return f"data:image/svg+xml;base64,{base64.b64encode(svg).decode('ascii')}"
@@ -0,0 +1,338 @@
+"""
+Pairwise travel-time cache for route planning.
+
+Driving distance/duration between two stops is stored in the travel_times table,
+keyed by rounded coordinates and a departure-time bucket. Route totals are summed
+from these legs; Google is only asked for legs that are missing or expired.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from googlemaps.convert import decode_polyline, encode_polyline, normalize_lat_lng
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config import Config
+from .. import db
+from ..models.travel_time import TravelTime
+
+# (origin_key, destination_key, departure_bucket)
+LegKey = Tuple[str, str, str]
+
+
+@dataclass
+class Leg:
+    """Driving cost from one stop to the next."""
+    distance: int  # in meters
+    duration: int  # in seconds
+    polyline: Optional[str] = None  # Encoded polyline of this leg
+
+
+def departure_bucket(departure_time: datetime) -> str:
+    """
+    Bucket a departure time for cache lookups: weekday vs. weekend and full hour.
+    Routes always start at 8:00, so legs are shared across calendar weeks.
+    """
+    day_type = 'we' if departure_time.isoweekday() >= 6 else 'wd'
+    return f"{day_type}-{departure_time.hour:02d}"
+
+
+def summarize_legs(legs: Iterable[Leg]) -> Tuple[float, int]:
+    """
+    Calculate total distance and duration from cached legs
+    Returns: (distance in km, duration in minutes)
+    """
+    legs = list(legs)
+    total_distance = sum(leg.distance for leg in legs) / 1000  # Convert to kilometers
+    total_duration = sum(leg.duration for leg in legs) // 60  # Convert to minutes
+    return total_distance, total_duration
+
+
+def _merge_encoded_polylines(encoded_polylines: Iterable[Optional[str]]) -> Optional[str]:
+    """Concatenate consecutive encoded polylines, dropping duplicated junction points."""
+    points = []
+    for encoded in encoded_polylines:
+        if not encoded:
+            continue
+        decoded = decode_polyline(encoded)
+        if points and decoded and points[-1] == decoded[0]:
+            decoded = decoded[1:]
+        points.extend(decoded)
+    return encode_polyline(points) if points else None
+
+
+def merge_leg_polylines(legs: Iterable[Leg]) -> Optional[str]:
+    """Concatenate the polylines of consecutive legs into one route polyline."""
+    return _merge_encoded_polylines(leg.polyline for leg in legs)
+
+
+def _leg_from_directions(leg: Dict) -> Leg:
+    """Convert a leg of a Google directions result into a cache leg."""
+    return Leg(
+        distance=leg['distance']['value'],
+        duration=leg['duration']['value'],
+        polyline=_merge_encoded_polylines(
+            step.get('polyline', {}).get('points') for step in leg.get('steps', [])
+        ),
+    )
+
+
+class TravelMatrix:
+    """
+    Read-through cache of driving legs between stops.
+
+    Lookups are served from memory, then from the travel_times table; only the rest
+    goes to Google. New legs are kept in memory until flush() writes them to the
+    session (the caller commits). Use one instance per planning run.
+    """
+
+    # Google Directions requests are limited to 25 intermediate waypoints
+    _max_waypoints = 25
+    # Google Distance Matrix requests are limited to 100 elements (10 x 10 block)
+    _matrix_block = 10
+
+    # Rows per upsert statement in flush()
+    _write_batch_size = 500
+
+    # Expired rows are purged at most once per interval and process
+    _purge_interval = timedelta(hours=1)
+    _last_purge: Optional[datetime] = None
+
+    def __init__(self, gmaps, ttl_hours: Optional[float] = None, precision: Optional[int] = None):
+        self.gmaps = gmaps
+        self.ttl = timedelta(hours=ttl_hours if ttl_hours is not None else Config.TRAVEL_MATRIX_TTL_HOURS)
+        self.precision = precision if precision is not None else Config.TRAVEL_MATRIX_COORD_PRECISION
+        self._legs: Dict[LegKey, Leg] = {}
+        self._looked_up: set = set()
+        self._pending: Dict[LegKey, Leg] = {}
+        self._lock = threading.Lock()
+
+    def point_key(self, location) -> str:
+        """Cache key of a location (dict with lat/lng or (lat, lng) tuple)."""
+        lat, lng = normalize_lat_lng(location)
+        return f"{round(float(lat), self.precision)},{round(float(lng), self.precision)}"
+
+    def _load(self, keys: Iterable[LegKey]) -> None:
+        """Load the given legs from the database unless already looked up."""
+        with self._lock:
+            missing = [k for k in keys if k not in self._legs and k not in self._looked_up]
+        if not missing:
+            return
+        cutoff = datetime.utcnow() - self.ttl
+        by_bucket: Dict[str, set] = {}
+        for origin, destination, bucket in missing:
+            by_bucket.setdefault(bucket, set()).update((origin, destination))
+        wanted = set(missing)
+        loaded: Dict[LegKey, Leg] = {}
+        for bucket, point_keys in by_bucket.items():
+            rows = TravelTime.query.filter(
+                TravelTime.departure_bucket == bucket,
+                TravelTime.origin.in_(point_keys),
+                TravelTime.destination.in_(point_keys),
+                TravelTime.created_at >= cutoff
+            ).all()
+            for row in rows:
+                key = (row.origin, row.destination, row.departure_bucket)
+                if key in wanted:
+                    loaded[key] = Leg(row.distance, row.duration, row.polyline)
+        with self._lock:
+            self._legs.update(loaded)
+            self._looked_up.update(missing)
+
+    def _remember(self, key: LegKey, leg: Leg) -> None:
+        with self._lock:
+            # Never replace a leg with polyline by a matrix-only one (concurrent requests)
+            known = self._legs.get(key)
+            if known is not None and known.polyline and not leg.polyline:
+                return
+            self._legs[key] = leg
+            self._pending[key] = leg
+
+    def _route_keys(self, points: Sequence, bucket: str) -> List[LegKey]:
+        point_keys = [self.point_key(p) for p in points]
+        return [(point_keys[i], point_keys[i + 1], bucket) for i in range(len(point_keys) - 1)]
+
+    def _matrix_keys(self, points: Sequence, bucket: str) -> List[List[LegKey]]:
+        point_keys = [self.point_key(p) for p in points]
+        return [[(origin, destination, bucket) for destination in point_keys] for origin in point_keys]
+
+    def preload(self, point_sets: Iterable[Tuple[Sequence, datetime]]) -> None:
+        """
+        Load all cached legs between the points of each (points, departure_time) set at once.
+        Afterwards matrix() and route_legs() on these points need no database access,
+        so they can be called from worker threads.
+        """
+        keys = []
+        for points, departure_time in point_sets:
+            for row in self._matrix_keys(points, departure_bucket(departure_time)):
+                keys.extend(row)
+        self._load(keys)
+
+    def _cached_leg(self, key: LegKey, require_polyline: bool) -> Optional[Leg]:
+        origin, destination, _ = key
+        if origin == destination:
+            return Leg(0, 0, None)
+        with self._lock:
+            leg = self._legs.get(key)
+        if leg is None or (require_polyline and not leg.polyline):
+            return None
+        return leg
+
+    def route_legs(self, points: Sequence, departure_time: datetime) -> List[Leg]:
+        """
+        Legs for driving through points in the given order (first point = start).
+        Cached legs are reused; if any leg is missing, the route is requested from
+        Google (one request per 25 waypoints) and all of its legs are cached.
+        """
+        bucket = departure_bucket(departure_time)
+        keys = self._route_keys(points, bucket)
+        self._load(keys)
+        legs = [self._cached_leg(key, require_polyline=True) for key in keys]
+        if all(leg is not None for leg in legs):
+            return legs
+
+        # Google allows at most 25 waypoints per request; split longer routes into
+        # consecutive sections sharing their end points and skip fully cached ones
+        size = self._max_waypoints + 1
+        for start in range(0, len(keys), size):
+            if all(leg is not None for leg in legs[start:start + size]):
+                continue
+            section = points[start:start + size + 1]
+            result = self.gmaps.directions(
+                origin=section[0],
+                destination=section[-1],
+                waypoints=list(section[1:-1]),
+                optimize_waypoints=False,
+                departure_time=departure_time,
+                mode="driving"
+            )
+            if not result:
+                raise Exception("Failed to calculate route")
+            legs[start:start + size] = self.record_route(section, result[0]['legs'], departure_time)
+        return legs
+
+    def lookup(self, pairs: Sequence[Tuple], departure_time: datetime) -> List[Leg]:
+        """
+        Legs (without polylines) for arbitrary (origin, destination) pairs.
+        Only pairs missing from the cache are requested via the Google Distance Matrix API.
+        """
+        bucket = departure_bucket(departure_time)
+        keys = [(self.point_key(origin), self.point_key(destination), bucket) for origin, destination in pairs]
+        self._load(keys)
+        missing = [n for n, key in enumerate(keys) if self._cached_leg(key, require_polyline=False) is None]
+        if missing:
+            self._fetch_matrix([pairs[n] for n in missing], [keys[n] for n in missing], departure_time)
+        return [self._cached_leg(key, require_polyline=False) for key in keys]
+
+    def _fetch_matrix(self, pairs: Sequence[Tuple], keys: Sequence[LegKey], departure_time: datetime) -> None:
+        """Request the given legs in blocks of origins x destinations, skipping blocks without wanted legs."""
+        origins: Dict[str, object] = {}
+        destinations: Dict[str, object] = {}
+        for (origin, destination), (origin_key, destination_key, _) in zip(pairs, keys):
+            origins.setdefault(origin_key, origin)
+            destinations.setdefault(destination_key, destination)
+        wanted = set(keys)
+        bucket = keys[0][2]
+        origin_keys = list(origins)
+        destination_keys = list(destinations)
+        size = self._matrix_block
+        for o in range(0, len(origin_keys), size):
+            origin_block = origin_keys[o:o + size]
+            for d in range(0, len(destination_keys), size):
+                destination_block = destination_keys[d:d + size]
+                if not any((ok, dk, bucket) in wanted for ok in origin_block for dk in destination_block):
+                    continue
+                result = self.gmaps.distance_matrix(
+                    origins=[origins[k] for k in origin_block],
+                    destinations=[destinations[k] for k in destination_block],
+                    mode="driving",
+                    departure_time=departure_time
+                )
+                for row, origin_key in zip(result['rows'], origin_block):
+                    for element, destination_key in zip(row['elements'], destination_block):
+                        key = (origin_key, destination_key, bucket)
+                        if key not in wanted:
+                            continue
+                        if element.get('status') != 'OK':
+                            raise Exception(f"No driving route between {origin_key} and {destination_key}")
+                        self._remember(key, Leg(element['distance']['value'], element['duration']['value']))
+
+    def matrix(self, points: Sequence, departure_time: datetime) -> List[List[Leg]]:
+        """
+        Full n x n matrix of legs between all points (without polylines).
+        Only pairs missing from the cache are requested, in blocks via the
+        Google Distance Matrix API.
+        """
+        n = len(points)
+        legs = self.lookup([(origin, destination) for origin in points for destination in points], departure_time)
+        return [legs[i * n:(i + 1) * n] for i in range(n)]
+
+    def cached_route_legs(self, points: Sequence, departure_time: datetime) -> Optional[List[Leg]]:
+        """Legs with polylines for driving through points in order if all are cached, else None (no API call)."""
+        keys = self._route_keys(points, departure_bucket(departure_time))
+        self._load(keys)
+        legs = [self._cached_leg(key, require_polyline=True) for key in keys]
+        return legs if all(leg is not None for leg in legs) else None
+
+    def record_route(self, points: Sequence, directions_legs: List[Dict], departure_time: datetime) -> List[Leg]:
+        """Cache the legs of a Google directions result for points in driven order."""
+        bucket = departure_bucket(departure_time)
+        keys = self._route_keys(points, bucket)
+        if len(keys) != len(directions_legs):
+            raise ValueError(f"Expected {len(keys)} legs from directions result, got {len(directions_legs)}")
+        legs = []
+        for key, raw_leg in zip(keys, directions_legs):
+            leg = _leg_from_directions(raw_leg)
+            if key[0] != key[1]:
+                self._remember(key, leg)
+            legs.append(leg)
+        return legs
+
+    def flush(self) -> None:
+        """
+        Upsert newly fetched legs (caller commits). Planning runs in other workers
+        may fetch the same leg; the newer result wins.
+        """
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+        if pending:
+            now = datetime.utcnow()
+            values = [
+                {
+                    'origin': origin,
+                    'destination': destination,
+                    'departure_bucket': bucket,
+                    'distance': leg.distance,
+                    'duration': leg.duration,
+                    'polyline': leg.polyline,
+                    'created_at': now
+                }
+                for (origin, destination, bucket), leg in pending.items()
+            ]
+            insert = postgresql_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+            for start in range(0, len(values), self._write_batch_size):
+                statement = insert(TravelTime.__table__).values(values[start:start + self._write_batch_size])
+                statement = statement.on_conflict_do_update(
+                    index_elements=['origin', 'destination', 'departure_bucket'],
+                    set_={
+                        'distance': statement.excluded.distance,
+                        'duration': statement.excluded.duration,
+                        'polyline': statement.excluded.polyline,
+                        'created_at': statement.excluded.created_at
+                    }
+                )
+                db.session.execute(statement)
+        self.purge_expired()
+
+    def purge_expired(self, force: bool = False) -> int:
+        """Delete expired cache rows (throttled unless force=True). Returns number of rows deleted."""
+        now = datetime.utcnow()
+        last = TravelMatrix._last_purge
+        if not force and last is not None and now - last < self._purge_interval:
+            return 0
+        TravelMatrix._last_purge = now
+        return TravelTime.query.filter(TravelTime.created_at < now - self.ttl).delete(synchronize_session=False)
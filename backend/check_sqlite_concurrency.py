@@ -0,0 +1,218 @@
+"""
+Script to check that reads stay responsive while an import writes to SQLite.
+
+Creates a temporary database (never the configured one) with the migrations and sample
+patients and appointments, then runs, each in its own process with the app's connection settings (WAL, busy timeout):
+  - an import-like writer: one transaction that deletes the week and bulk-inserts it
+    again in batches, held open for --import-seconds
+  - --readers readers that request GET /api/patients/ and GET /api/appointments/ in a loop
+  - a second writer (like a route move) that commits a small update during the import
+
+Fails (exit status 1) if a read during the import takes longer than --max-read-ms (default:
+half the import time, i.e. reads do not wait for the import), if any request fails, or if the
+second writer gets "database is locked" instead of waiting for the import.
+
+Usage:
+    python check_sqlite_concurrency.py [--readers 4] [--import-seconds 5] [--max-read-ms 500]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+CALENDAR_WEEK = 10
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+
+
+def _create_app():
+    from app import create_app
+    return create_app()
+
+
+def _patient_rows(count):
+    return [
+        {
+            'id': i, 'first_name': f'Vorname {i}', 'last_name': f'Nachname {i}', 'street': 'Hauptstraße 1',
+            'zip_code': '51643', 'city': 'Gummersbach', 'latitude': 51.0, 'longitude': 7.5,
+            'calendar_week': CALENDAR_WEEK, 'area': 'Nordkreis' if i % 2 else 'Südkreis',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _appointment_rows(patient_ids):
+    return [
+        {
+            'patient_id': patient_id, 'weekday': weekday, 'visit_type': 'HB', 'duration': 25,
+            'area': 'Nordkreis' if patient_id % 2 else 'Südkreis', 'calendar_week': CALENDAR_WEEK,
+        }
+        for patient_id in patient_ids
+        for weekday in WEEKDAYS
+    ]
+
+
+def seed(patients):
+    from flask_migrate import upgrade
+    from app import db
+    from app.models.patient import Patient
+    from app.models.appointment import Appointment
+
+    migrations_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'migrations')
+    app = _create_app()
+    with app.app_context():
+        upgrade(directory=migrations_dir)
+        rows = _patient_rows(patients)
+        db.session.execute(db.insert(Patient), rows)
+        db.session.execute(db.insert(Appointment), _appointment_rows([row['id'] for row in rows]))
+        db.session.commit()
+
+
+def run_import(patients, seconds, started, results):
+    """Delete and re-insert the week in one transaction, like the Excel import"""
+    from app import db
+    from app.models.patient import Patient
+    from app.models.appointment import Appointment
+
+    app = _create_app()
+    with app.app_context():
+        begin = time.time()
+        try:
+            db.session.execute(db.delete(Appointment).where(Appointment.calendar_week == CALENDAR_WEEK))
+            db.session.execute(db.delete(Patient).where(Patient.calendar_week == CALENDAR_WEEK))
+            started.set()
+            rows = _patient_rows(patients)
+            batches = 10
+            batch_size = max(1, len(rows) // batches)
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                db.session.execute(db.insert(Patient), batch)
+                db.session.execute(db.insert(Appointment), _appointment_rows([row['id'] for row in batch]))
+                time.sleep(seconds / batches)
+            db.session.commit()
+            results.put(('import', 'ok', (begin, time.time())))
+        except Exception as e:
+            db.session.rollback()
+            results.put(('import', 'error', str(e)))
+
+
+def run_reader(stop, results):
+    app = _create_app()
+    client = app.test_client()
+    latencies = []
+    errors = []
+    while not stop.is_set():
+        for url in (f'/api/patients/?calendar_week={CALENDAR_WEEK}', f'/api/appointments/?calendar_week={CALENDAR_WEEK}'):
+            begin = time.time()
+            t0 = time.perf_counter()
+            response = client.get(url)
+            latencies.append((begin, (time.perf_counter() - t0) * 1000))
+            if response.status_code != 200:
+                errors.append(f'{url}: HTTP {response.status_code}')
+    results.put(('reader', latencies, errors))
+
+
+def run_move(started, results):
+    """Small write during the import; must wait for the import instead of failing"""
+    from app import db
+    from app.models.appointment import Appointment
+
+    app = _create_app()
+    with app.app_context():
+        started.wait()
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        try:
+            db.session.execute(
+                db.update(Appointment).where(Appointment.calendar_week != CALENDAR_WEEK).values(info='move')
+            )
+            db.session.commit()
+            results.put(('move', 'ok', (time.perf_counter() - t0) * 1000))
+        except Exception as e:
+            db.session.rollback()
+            results.put(('move', 'error', str(e)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check SQLite read latency during an import')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--patients', type=int, default=500)
+    parser.add_argument('--import-seconds', type=float, default=5.0)
+    parser.add_argument('--max-read-ms', type=float, default=None)
+    args = parser.parse_args()
+    max_read_ms = args.max_read_ms if args.max_read_ms is not None else args.import_seconds * 1000 / 2
+
+    ctx = multiprocessing.get_context('spawn')
+    started = ctx.Event()
+    stop = ctx.Event()
+    results = ctx.Queue()
+
+    seed(args.patients)
+    readers = [ctx.Process(target=run_reader, args=(stop, results)) for _ in range(args.readers)]
+    for reader in readers:
+        reader.start()
+    # Give the readers time to start before the import begins
+    time.sleep(2)
+    importer = ctx.Process(target=run_import, args=(args.patients, args.import_seconds, started, results))
+    mover = ctx.Process(target=run_move, args=(started, results))
+    importer.start()
+    mover.start()
+    importer.join()
+    mover.join()
+    stop.set()
+
+    failed = False
+    reads = []
+    import_window = None
+    for _ in range(len(readers) + 2):
+        kind, value, detail = results.get()
+        if kind == 'reader':
+            reads.extend(value)
+            for error in detail:
+                print(f'Read failed: {error}')
+                failed = True
+        elif value != 'ok':
+            print(f'{kind} failed: {detail}')
+            failed = True
+        elif kind == 'move':
+            print(f'Write during import committed after {detail:.0f} ms')
+        else:
+            import_window = detail
+    for reader in readers:
+        reader.join()
+
+    if import_window:
+        begin, end = import_window
+        # A read counts as "during" if it overlaps the import transaction
+        before = sorted(latency for started_at, latency in reads if started_at + latency / 1000 < begin)
+        during = sorted(
+            latency for started_at, latency in reads
+            if started_at <= end and started_at + latency / 1000 >= begin
+        )
+        for label, latencies in (('before import', before), ('during import', during)):
+            if latencies:
+                print(f'{len(latencies)} reads {label}: median {latencies[len(latencies) // 2]:.1f} ms, '
+                      f'max {latencies[-1]:.1f} ms')
+        if not during:
+            print('No reads completed during the import')
+            failed = True
+        elif during[-1] > max_read_ms:
+            print(f'Slowest read during the import exceeds {max_read_ms:.0f} ms')
+            failed = True
+    print('FAILED' if failed else 'OK')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    # Always a temporary database (the check deletes and rewrites data); inherited by the
+    # spawned processes through the environment
+    tmp_dir = tempfile.mkdtemp(prefix='palliroute_concurrency_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'check.db')}"
+    try:
+        status = main()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    sys.exit(status)
@@ -17,12 +17,108 @@ class Config:
     # Create data directory if it doesn't exist
     os.makedirs(data_dir, exist_ok=True)
     db_path = os.path.join(data_dir, 'palliroute.db')
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+    # DATABASE_URL (e.g. postgresql+psycopg://user:password@db:5432/palliroute) replaces the SQLite file.
+    # Only psycopg (v3) is installed; postgres:// and postgresql:// without driver would mean
+    # psycopg2 on SQLAlchemy 2.0, so they are mapped to postgresql+psycopg://
+    DATABASE_URL = os.environ.get('DATABASE_URL')
+    if DATABASE_URL and DATABASE_URL.split('://', 1)[0] in ('postgres', 'postgresql'):
+        DATABASE_URL = 'postgresql+psycopg://' + DATABASE_URL.split('://', 1)[1]
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL or f'sqlite:///{db_path}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # Connection pool per worker process (PostgreSQL only; SQLite uses its default pool)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    # Additional connections allowed above the pool size under load
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    # Seconds to wait for a free connection before failing
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    # Reconnect connections older than this many seconds (server/firewall idle timeouts)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+    # SQLite connection tuning, applied to every new connection (see app/__init__.py)
+    # WAL lets the gunicorn workers keep reading while an import or planning run writes
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    # NORMAL is durable in WAL mode except for the last commits on power loss
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    # Wait this long for a write lock instead of failing with "database is locked"
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 30000))
+    # Memory-mapped I/O in bytes (0 = off)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    # Page cache per connection; negative values are KiB (-64000 ≈ 64 MB)
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))
+    # Enforce foreign keys (SQLite ignores them unless enabled per connection)
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', 'true').lower() == 'true'
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_pre_ping': True,
+            # sqlite3 waits for locks itself as well (seconds)
+            'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000}
+        }
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_pre_ping': True,
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            'pool_recycle': DB_POOL_RECYCLE
+        }
+
     # Google Maps configuration
     GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY')
-    
+
+    # Travel-time cache (pairwise driving distance/duration between stops)
+    # Entries older than the TTL are ignored and refetched from Google
+    TRAVEL_MATRIX_TTL_HOURS = float(os.environ.get('TRAVEL_MATRIX_TTL_HOURS', 24 * 14))
+    # Coordinates are rounded to this many decimals for the cache key (5 ≈ 1 m)
+    TRAVEL_MATRIX_COORD_PRECISION = int(os.environ.get('TRAVEL_MATRIX_COORD_PRECISION', 5))
+
+    # Route optimization (OR-Tools); 0 = stop at first local optimum,
+    # > 0 = keep improving with guided local search for this many milliseconds
+    ROUTE_SOLVER_TIME_LIMIT_MS = int(os.environ.get('ROUTE_SOLVER_TIME_LIMIT_MS', 0))
+    # Fixed appointment times (Appointment.time): 'soft' penalizes late arrival,
+    # 'hard' forbids it where possible, 'off' ignores appointment times
+    ROUTE_TIME_WINDOWS = os.environ.get('ROUTE_TIME_WINDOWS', 'soft').lower()
+    # Allowed deviation from the appointment time in minutes (both directions)
+    ROUTE_TIME_WINDOW_TOLERANCE_MINUTES = int(os.environ.get('ROUTE_TIME_WINDOW_TOLERANCE_MINUTES', 15))
+    # Worker threads for batch route optimization (Google requests + solver runs)
+    ROUTE_OPTIMIZATION_WORKERS = int(os.environ.get('ROUTE_OPTIMIZATION_WORKERS', 8))
+    # Rebalancing of all routes of a weekday (multi-vehicle, guided local search)
+    ROUTE_REBALANCE_TIME_LIMIT_MS = int(os.environ.get('ROUTE_REBALANCE_TIME_LIMIT_MS', 5000))
+    # Working minutes of a full-time employee per day; scaled by Employee.work_hours (%)
+    FULL_TIME_DAILY_MINUTES = int(os.environ.get('FULL_TIME_DAILY_MINUTES', 480))
+
+    # Geocoding cache (geocode_cache table + in-memory LRU per worker)
+    GEOCODE_CACHE_TTL_DAYS = float(os.environ.get('GEOCODE_CACHE_TTL_DAYS', 365))
+    # Addresses that could not be geocoded are retried after this time
+    GEOCODE_NEGATIVE_TTL_HOURS = float(os.environ.get('GEOCODE_NEGATIVE_TTL_HOURS', 24))
+    GEOCODE_LRU_SIZE = int(os.environ.get('GEOCODE_LRU_SIZE', 10000))
+
+    # PDF export: render processes per app worker for employee/area sections (1 = one document in-process).
+    # Every gunicorn worker keeps its own pool, so keep this small
+    PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', min(2, os.cpu_count() or 1)))
+    # Locally rendered route maps (SVG), keyed by a hash of polylines and markers
+    MAP_CACHE_DIR = os.environ.get('MAP_CACHE_DIR') or os.path.join(data_dir, 'map_cache')
+    MAP_CACHE_MAX_FILES = int(os.environ.get('MAP_CACHE_MAX_FILES', 5000))
+    # Rendered weekly PDFs, keyed by calendar week, weekday and a hash of the shown data
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR') or os.path.join(data_dir, 'pdf_cache')
+    PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', 500))
+    # Scheduler: rebuild stale cached PDFs of weeks downloaded within the window (0 minutes = disabled)
+    PDF_CACHE_REFRESH_MINUTES = int(os.environ.get('PDF_CACHE_REFRESH_MINUTES', 10))
+    PDF_CACHE_REFRESH_WINDOW_HOURS = float(os.environ.get('PDF_CACHE_REFRESH_WINDOW_HOURS', 24))
+    # Time budget of one refresh call (below the gunicorn worker timeout); remaining weeks follow next time
+    PDF_CACHE_REFRESH_MAX_SECONDS = float(os.environ.get('PDF_CACHE_REFRESH_MAX_SECONDS', 120))
+    # PDF download: sync the Aplano planning of the week only if the last sync is older (0 = always)
+    PDF_PLANNING_SYNC_MAX_AGE_MINUTES = float(os.environ.get('PDF_PLANNING_SYNC_MAX_AGE_MINUTES', 10))
+
+    # Auto-planning: default CP-SAT solver profile (fast | balanced | thorough); workers empty = per profile
+    AUTO_PLANNING_SOLVER_PROFILE = os.environ.get('AUTO_PLANNING_SOLVER_PROFILE', 'balanced')
+    AUTO_PLANNING_SOLVER_WORKERS = int(os.environ['AUTO_PLANNING_SOLVER_WORKERS']) if os.environ.get('AUTO_PLANNING_SOLVER_WORKERS') else None
+    # Independent parts of the planning (e.g. nursing and doctors) as separate models, solved in parallel
+    AUTO_PLANNING_DECOMPOSE = os.environ.get('AUTO_PLANNING_DECOMPOSE', 'true').lower() == 'true'
+    # Asynchronous planning jobs: progress/heartbeat interval, job failed without heartbeat
+    PLANNING_JOB_PROGRESS_INTERVAL_SECONDS = float(os.environ.get('PLANNING_JOB_PROGRESS_INTERVAL_SECONDS', 1.0))
+    PLANNING_JOB_STALE_SECONDS = int(os.environ.get('PLANNING_JOB_STALE_SECONDS', 120))
+
     # CORS configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
@@ -55,6 +151,8 @@ class Config:
     AUTO_IMPORT_ENABLED = os.environ.get('AUTO_IMPORT_ENABLED', 'true').lower() == 'true'
     # Feste Importzeiten, kommasepariert im Format HH:MM, z.B. "08:00,12:30,16:00"
     AUTO_IMPORT_TIMES = os.environ.get('AUTO_IMPORT_TIMES', '')
+    # Automatic imports only write the differences to the previous import
+    AUTO_IMPORT_INCREMENTAL = os.environ.get('AUTO_IMPORT_INCREMENTAL', 'true').lower() == 'true'
     BACKEND_API_URL = os.environ.get('BACKEND_API_URL', 'http://backend-api:9000')
 
     # Aplano API configuration
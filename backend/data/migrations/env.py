@@ -97,6 +97,14 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # Batch migrations recreate tables on SQLite; with foreign keys enforced,
+        # dropping a table that other tables reference would fail or cascade
+        is_sqlite = connection.dialect.name == 'sqlite'
+        if is_sqlite:
+            foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -106,6 +114,11 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+        # The connection goes back to the pool, restore the per-connection setting
+        if is_sqlite:
+            connection.exec_driver_sql(f'PRAGMA foreign_keys={int(foreign_keys)}')
+            connection.commit()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -85,8 +85,8 @@ def downgrade():
     sa.Column('duty_type', sa.VARCHAR(length=50), nullable=False),
     sa.Column('area', sa.VARCHAR(length=50), nullable=True),
     sa.Column('calendar_week', sa.INTEGER(), nullable=True),
-    sa.Column('created_at', sa.DATETIME(), nullable=True),
-    sa.Column('updated_at', sa.DATETIME(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
     sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
     sa.PrimaryKeyConstraint('id'),
     sa.UniqueConstraint('date', 'duty_type', 'area', name=op.f('unique_date_duty_area'))
@@ -0,0 +1,60 @@
+"""normalize route stop positions
+
+Revision ID: b7d41e2f9a63
+Revises: 9a3f6c1d2e80
+Create Date: 2026-10-17 19:05:52.418306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e2f9a63'
+down_revision = '9a3f6c1d2e80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Stops of a route get contiguous positions 0..n-1 in their stored order;
+    # an appointment listed twice in the same route keeps only its first stop
+    connection = op.get_bind()
+    route_stops = sa.table(
+        'route_stops',
+        sa.column('id', sa.Integer),
+        sa.column('route_id', sa.Integer),
+        sa.column('position', sa.Integer),
+        sa.column('appointment_id', sa.Integer)
+    )
+
+    duplicate_ids = []
+    updates = []
+    current_route = None
+    seen = set()
+    for stop_id, route_id, position, appointment_id in connection.execute(
+        sa.select(route_stops.c.id, route_stops.c.route_id, route_stops.c.position, route_stops.c.appointment_id)
+        .order_by(route_stops.c.route_id, route_stops.c.position, route_stops.c.id)
+    ):
+        if route_id != current_route:
+            current_route = route_id
+            seen = set()
+        if appointment_id in seen:
+            duplicate_ids.append(stop_id)
+            continue
+        seen.add(appointment_id)
+        if position != len(seen) - 1:
+            updates.append({'b_id': stop_id, 'b_position': len(seen) - 1})
+
+    if duplicate_ids:
+        connection.execute(route_stops.delete().where(route_stops.c.id.in_(duplicate_ids)))
+    if updates:
+        connection.execute(
+            route_stops.update().where(route_stops.c.id == sa.bindparam('b_id')).values(position=sa.bindparam('b_position')),
+            updates
+        )
+
+
+def downgrade():
+    # Normalized positions are valid for the previous revision as well
+    pass
@@ -1,6 +1,7 @@
 import os
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.memory import MemoryJobStore
 import requests
@@ -32,12 +33,37 @@ class SimpleScheduler:
             
         # Initialize config
         config = Config()
-            
-        # Check if auto import is enabled
-        if not config.AUTO_IMPORT_ENABLED:
+
+        self._add_pdf_cache_job(config)
+        if config.AUTO_IMPORT_ENABLED:
+            self._add_import_jobs(config)
+        else:
             print("INFO: Auto import is disabled in configuration")
+
+        if not self.scheduler.get_jobs():
+            print("INFO: No scheduler jobs configured")
+            return
+
+        self.scheduler.start()
+        self.is_running = True
+
+    def _add_pdf_cache_job(self, config):
+        """Periodically rebuild cached PDFs of recently downloaded weeks whose data changed"""
+        minutes = config.PDF_CACHE_REFRESH_MINUTES
+        if minutes <= 0:
+            print("INFO: PDF cache refresh is disabled in configuration")
             return
+        self.scheduler.add_job(
+            func=self._scheduled_pdf_cache_refresh,
+            trigger=IntervalTrigger(minutes=minutes),
+            id="pdf_cache_refresh",
+            name="PDF Cache Refresh",
+            replace_existing=True
+        )
+        print(f"INFO: PDF cache refresh will run every {minutes} minutes")
 
+    def _add_import_jobs(self, config):
+        """Add one import job per configured time of day"""
         # Get fixed times from environment / config (comma separated HH:MM, e.g. "08:00,12:30,16:00")
         times_str = os.environ.get('AUTO_IMPORT_TIMES', getattr(config, 'AUTO_IMPORT_TIMES', '') or '')
         times_str = times_str.strip()
@@ -75,11 +101,9 @@ class SimpleScheduler:
                 name=f"Automatic Patient Import at {hour:02d}:{minute:02d}",
                 replace_existing=True
             )
-        
-        self.scheduler.start()
-        self.is_running = True
+
         times_readable = ', '.join(f"{h:02d}:{m:02d}" for h, m in times)
-        print(f"INFO: Scheduler started - automatic import will run at fixed times: {times_readable}")
+        print(f"INFO: Automatic import will run at fixed times: {times_readable}")
         
     def stop(self):
         if self.scheduler and self.is_running:
@@ -123,7 +147,11 @@ class SimpleScheduler:
             # Make API call to backend-api
             api_base_url = config.BACKEND_API_URL
             
-            response = requests.post(f"{api_base_url}/api/patients/import", timeout=600)
+            response = requests.post(
+                f"{api_base_url}/api/patients/import",
+                json={"incremental": config.AUTO_IMPORT_INCREMENTAL},
+                timeout=600
+            )
             if response.status_code == 200:
                 print("INFO: Import completed successfully via API")
                 
@@ -148,19 +176,28 @@ class SimpleScheduler:
         except Exception as e:
             print(f"ERROR: Error during scheduled import: {str(e)}")
 
+    def _scheduled_pdf_cache_refresh(self):
+        """Execute the PDF cache refresh job"""
+        try:
+            config = Config()
+            response = requests.post(f"{config.BACKEND_API_URL}/api/routes/pdf-cache/refresh", timeout=600)
+            if response.status_code == 200:
+                print(f"INFO: {response.json().get('message')}")
+            else:
+                print(f"ERROR: PDF cache refresh failed with status {response.status_code}: {response.text}")
+        except Exception as e:
+            print(f"ERROR: Error during PDF cache refresh: {str(e)}")
+
 # Initialize and start scheduler
 scheduler = SimpleScheduler()
 
 if __name__ == '__main__':
     scheduler.init_scheduler()
     
-    # Start the scheduler for automatic imports if enabled
-    config = Config()
-    if config.AUTO_IMPORT_ENABLED:
-        scheduler.start()
+    # Start the scheduler (automatic imports if enabled, PDF cache refresh)
+    scheduler.start()
+    if scheduler.is_running:
         print("INFO: Scheduler service started successfully")
-    else:
-        print("INFO: Auto import is disabled in configuration")
     
     print("INFO: Scheduler service is running. Press Ctrl+C to stop.")
     try:
@@ -88,6 +88,12 @@ export interface PatientImportResponse {
     calendar_weeks_str?: string;  // Formatted string for display
 }
 
+export interface RouteStop {
+    appointment_id: number;
+    eta: string;  // HH:MM
+    lateness: number;  // in minutes
+}
+
 export interface Route {
     id: number;
     employee_id: number | null;
@@ -97,6 +103,9 @@ export interface Route {
     total_distance: number;
     polyline: string;
     area: string; // u. a. AW-Tourbereiche 'Nord', 'Mitte', 'Süd'
+    schedule?: RouteStop[];  // ETA and lateness per stop in route order
+    total_lateness?: number | null;  // Minutes late at fixed appointment times
+    needs_optimization?: boolean;  // Changed incrementally, full optimization pending
     calendar_week?: number;  // Added for easier filtering
     created_at: string;
     updated_at: string;
@@ -157,6 +157,9 @@ export const EmployeeSidebar: React.FC<EmployeeSidebarProps> = ({
             if (summary.removed > 0) {
                 parts.push(`${summary.removed} entfernt`);
             }
+            if (summary.kept > 0) {
+                parts.push(`${summary.kept} wegen Dienst-Historie behalten`);
+            }
             
             if (parts.length > 0) {
                 message += parts.join(', ');
@@ -16,7 +16,7 @@ import {
 } from '../../services/queries/useScheduling';
 import { useEmployees } from '../../services/queries/useEmployees';
 import { Assignment, DutyType, OnCallArea, Employee, ShiftDefinition, AssignmentSource } from '../../types/models';
-import { AssignmentsQueryParams, CreateAssignmentData, schedulingApi } from '../../services/api/scheduling';
+import { AssignmentsQueryParams, CreateAssignmentData, PlanningJob, schedulingApi } from '../../services/api/scheduling';
 import { CalendarHeader } from './calendar/CalendarHeader';
 import { CalendarGrid } from './calendar/CalendarGrid';
 import { AssignmentDialog } from './dialogs/AssignmentDialog';
@@ -36,6 +36,7 @@ export const OnCallPlanningView: React.FC = () => {
   const [assignmentDialogOpen, setAssignmentDialogOpen] = useState(false);
   const [capacityDialogOpen, setCapacityDialogOpen] = useState(false);
   const [autoPlanningDialogOpen, setAutoPlanningDialogOpen] = useState(false);
+  const [autoPlanJob, setAutoPlanJob] = useState<PlanningJob | null>(null);
   const [unplannedDialogOpen, setUnplannedDialogOpen] = useState(false);
 
   // Get dates to display
@@ -211,21 +212,38 @@ export const OnCallPlanningView: React.FC = () => {
         existing_assignments_handling: settings.existingAssignmentsHandling,
         allow_overplanning: settings.allowOverplanning,
         include_aplano: settings.includeAplano,
+        onProgress: setAutoPlanJob,
       });
 
-      // Backend returns 200 with solver_status/error for business errors (e.g. Aplano unavailable)
-      const data = result as { solver_status?: string; error?: string; message?: string };
-      if (data.solver_status === 'ERROR' && data.error === 'APLANO_UNAVAILABLE') {
-        setNotification(data.message ?? 'Aplano ist nicht verfügbar.', 'error');
+      // Job result contains solver_status/error for business errors (e.g. Aplano unavailable)
+      if (result.solver_status === 'ERROR' && result.error === 'APLANO_UNAVAILABLE') {
+        setNotification(result.message ?? 'Aplano ist nicht verfügbar.', 'error');
         return;
       }
-      if (data.solver_status === 'ERROR') {
-        setNotification(data.message ?? 'Fehler bei der automatischen Planung', 'error');
+      if (result.solver_status === 'ERROR') {
+        setNotification(result.message ?? 'Fehler bei der automatischen Planung', 'error');
+        return;
+      }
+
+      if (result.cancelled && result.solver_status === 'UNKNOWN') {
+        setNotification('Planung gestoppt, es wurde noch keine Lösung gefunden', 'error');
         return;
       }
 
       // Show success notification
-      setNotification('Automatische Planung erfolgreich abgeschlossen', 'success');
+      if (result.unsolved_components) {
+        setNotification(
+          `Planung nur teilweise übernommen: ${result.unsolved_components} Teilbereich(e) ohne Lösung blieben unverändert`,
+          'error'
+        );
+      } else {
+        setNotification(
+          result.cancelled
+            ? 'Planung gestoppt, bestes bisheriges Ergebnis übernommen'
+            : 'Automatische Planung erfolgreich abgeschlossen',
+          'success'
+        );
+      }
 
       // Close dialog only after successful completion
       setAutoPlanningDialogOpen(false);
@@ -237,9 +255,22 @@ export const OnCallPlanningView: React.FC = () => {
       setNotification(errorMessage, 'error');
 
       // Dialog stays open on error so user can retry
+    } finally {
+      setAutoPlanJob(null);
     }
   }, [currentDate, autoPlan, generateShiftInstances, setNotification]);
 
+  // Stop the running planning job; it finishes with the best solution found so far
+  const handleAutoPlanningStop = useCallback(async () => {
+    if (!autoPlanJob) return;
+    try {
+      await schedulingApi.cancelAutoPlanJob(autoPlanJob.id);
+    } catch (error: any) {
+      const errorMessage = error?.response?.data?.error || error?.message || 'Fehler beim Stoppen der Planung';
+      setNotification(errorMessage, 'error');
+    }
+  }, [autoPlanJob, setNotification]);
+
   // Reset planning for a date range
   const handleResetPlanning = useCallback(async () => {
     try {
@@ -447,6 +478,8 @@ export const OnCallPlanningView: React.FC = () => {
           onReset={handleResetPlanning}
           currentDate={currentDate}
           isLoading={autoPlan.isPending}
+          progress={autoPlanJob?.progress ?? null}
+          onStop={autoPlanJob && !autoPlanJob.cancel_requested ? handleAutoPlanningStop : undefined}
           isResetting={resetPlanning.isPending}
           viewMode={viewMode}
         />
@@ -23,6 +23,7 @@ import {
 import { AutoAwesome as AutoAwesomeIcon, UploadFile as UploadFileIcon } from '@mui/icons-material';
 import { formatMonthYear } from '../../../utils/oncall/dateUtils';
 import { configApi } from '../../../services/api';
+import type { PlanningJobProgress } from '../../../services/api/scheduling';
 
 export interface AutoPlanningSettings {
   // Existing assignments handling
@@ -39,10 +40,28 @@ interface AutoPlanningDialogProps {
   onReset?: () => void;
   currentDate: Date;
   isLoading?: boolean;
+  progress?: PlanningJobProgress | null; // Fortschritt des laufenden Planungsjobs
+  onStop?: () => void; // Laufende Planung stoppen (bestes bisheriges Ergebnis wird übernommen)
   isResetting?: boolean;
   viewMode?: 'month' | 'week';
 }
 
+const PHASE_LABELS: Record<PlanningJobProgress['phase'], string> = {
+  queued: 'Wartet...',
+  loading: 'Daten laden...',
+  building: 'Modell aufbauen...',
+  solving: 'Suche läuft...',
+  writing: 'Speichern...',
+  done: 'Abschließen...',
+};
+
+const formatProgress = (progress?: PlanningJobProgress | null): string => {
+  if (!progress) return 'Planung läuft...';
+  if (progress.phase !== 'solving' || !progress.solutions) return PHASE_LABELS[progress.phase];
+  const gap = progress.gap != null ? `, Abstand zum Optimum ≤ ${Math.round(progress.gap * 100)} %` : '';
+  return `Suche läuft (${progress.solutions} Lösungen${gap})`;
+};
+
 export const AutoPlanningDialog: React.FC<AutoPlanningDialogProps> = ({
   open,
   onClose,
@@ -50,6 +69,8 @@ export const AutoPlanningDialog: React.FC<AutoPlanningDialogProps> = ({
   onReset,
   currentDate,
   isLoading = false,
+  progress = null,
+  onStop,
   isResetting = false,
   viewMode = 'month',
 }) => {
@@ -407,8 +428,8 @@ export const AutoPlanningDialog: React.FC<AutoPlanningDialogProps> = ({
         </Button>
         <Box sx={{ display: 'flex', gap: 1.5 }}>
           <Button
-            onClick={handleCancel}
-            disabled={isLoading || isResetting}
+            onClick={isLoading ? onStop : handleCancel}
+            disabled={isLoading ? !onStop : isResetting}
             sx={{
               textTransform: 'none',
               fontWeight: 500,
@@ -421,7 +442,7 @@ export const AutoPlanningDialog: React.FC<AutoPlanningDialogProps> = ({
               },
             }}
           >
-            Abbrechen
+            {isLoading ? 'Planung stoppen' : 'Abbrechen'}
           </Button>
           <Button
             onClick={handleStart}
@@ -451,7 +472,7 @@ export const AutoPlanningDialog: React.FC<AutoPlanningDialogProps> = ({
               },
             }}
           >
-            {isLoading ? 'Planung läuft...' : 'Planung starten'}
+            {isLoading ? formatProgress(progress) : 'Planung starten'}
           </Button>
         </Box>
       </DialogActions>
@@ -110,6 +110,39 @@ export interface AutoPlanData {
     include_aplano?: boolean;
 }
 
+export type PlanningJobStatus = 'QUEUED' | 'RUNNING' | 'COMPLETED' | 'FAILED';
+
+export interface PlanningJobProgress {
+    phase: 'queued' | 'loading' | 'building' | 'solving' | 'writing' | 'done';
+    solutions: number;
+    objective: number | null;
+    best_bound: number | null;
+    gap: number | null;  // relative gap to the bound, 0.01 = 1 %
+    elapsed_seconds: number;
+}
+
+export interface AutoPlanResult {
+    message: string;
+    assignments_created?: number;
+    total_planned?: number;
+    solver_status?: string;
+    error?: string;
+    cancelled?: boolean;  // stopped early; best solution found so far was saved
+    unsolved_components?: number;  // components without solution; their assignments were not changed
+}
+
+export interface PlanningJob {
+    id: string;
+    status: PlanningJobStatus;
+    progress: PlanningJobProgress | null;
+    result: AutoPlanResult | null;
+    error: string | null;
+    cancel_requested: boolean;
+}
+
+// Poll interval for running planning jobs
+const AUTO_PLAN_POLL_INTERVAL_MS = 1000;
+
 export interface ResetPlanningData {
     start_date: string;  // YYYY-MM-DD
     end_date: string;    // YYYY-MM-DD
@@ -249,13 +282,39 @@ export const schedulingApi = {
         return response.data;
     },
 
-    // Auto Plan
-    async autoPlan(data: AutoPlanData): Promise<{ message: string; assignments_created?: number; total_planned?: number }> {
+    // Auto Plan: runs as background job on the server; polls until the job has finished
+    async autoPlan(data: AutoPlanData, onProgress?: (job: PlanningJob) => void): Promise<AutoPlanResult> {
         try {
-            const response = await api.post('/scheduling/auto-plan', data);
-            return response.data;
+            const response = await api.post('/scheduling/auto-plan/jobs', data);
+            const jobId: string = response.data.job_id;
+            for (;;) {
+                await new Promise((resolve) => setTimeout(resolve, AUTO_PLAN_POLL_INTERVAL_MS));
+                const job = await schedulingApi.getAutoPlanJob(jobId);
+                onProgress?.(job);
+                if (job.status === 'FAILED') {
+                    throw new Error(job.error || 'Fehler bei der automatischen Planung');
+                }
+                if (job.status === 'COMPLETED' && job.result) {
+                    return job.result;
+                }
+            }
+        } catch (error) {
+            console.error('Failed to run auto planning:', error);
+            throw error;
+        }
+    },
+
+    async getAutoPlanJob(jobId: string): Promise<PlanningJob> {
+        const response = await api.get(`/scheduling/auto-plan/jobs/${jobId}`);
+        return response.data;
+    },
+
+    // Stop a running planning job; the best solution found so far is saved
+    async cancelAutoPlanJob(jobId: string): Promise<void> {
+        try {
+            await api.post(`/scheduling/auto-plan/jobs/${jobId}/cancel`);
         } catch (error) {
-            console.error('Failed to start auto planning:', error);
+            console.error(`Failed to cancel planning job ${jobId}:`, error);
             throw error;
         }
     },
@@ -18,6 +18,7 @@ import {
     CreateAssignmentData,
     UpdateAssignmentData,
     AutoPlanData,
+    PlanningJob,
     ResetPlanningData,
 } from '../api/scheduling';
 import { routeKeys } from './useRoutes';
@@ -191,7 +192,8 @@ export const useAutoPlan = () => {
     const queryClient = useQueryClient();
 
     return useMutation({
-        mutationFn: (data: AutoPlanData) => schedulingApi.autoPlan(data),
+        mutationFn: ({ onProgress, ...data }: AutoPlanData & { onProgress?: (job: PlanningJob) => void }) =>
+            schedulingApi.autoPlan(data, onProgress),
         onSuccess: () => {
             // Invalidate all assignment lists to refetch after planning
             queryClient.invalidateQueries({ queryKey: schedulingKeys.assignments.lists() });
@@ -41,10 +41,12 @@ export interface EmployeeImportResponse {
         added: number;
         updated: number;
         removed: number;
+        kept: number;  // not in the sheet, kept because of past shift assignments
     };
     added_employees: Employee[];
     updated_employees: Employee[];
     removed_employees: Employee[];
+    kept_employees: Employee[];
 }
 
 export interface Pflegeheim {
@@ -122,6 +124,12 @@ export interface PatientImportResponse {
     calendar_weeks_str?: string;  // Formatted string for display
 }
 
+export interface RouteStop {
+    appointment_id: number;
+    eta: string;  // HH:MM
+    lateness: number;  // in minutes
+}
+
 export interface Route {
     id: number;
     employee_id: number;
@@ -131,6 +139,9 @@ export interface Route {
     total_distance: number;
     polyline: string;
     area: Area;
+    schedule?: RouteStop[];  // ETA and lateness per stop in route order
+    total_lateness?: number | null;  // Minutes late at fixed appointment times
+    needs_optimization?: boolean;  // Changed incrementally, full optimization pending
     calendar_week?: number;  // Added for easier filtering
     created_at: string;
     updated_at: string;